@@ -0,0 +1,328 @@
+#This program simulates a booking system of hotels for the analytics of the hotels.
+import doctest, datetime, random, weakref
+from room import Room, MONTHS
+from reservation import Reservation
+from hotel import Hotel
+from availability import days_in_month
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    from matplotlib.figure import Figure
+except ImportError:
+    Figure = None
+
+
+class Analytics:
+    """ Represents the occupancy rate, ADR(average daily rate, the revenue per room\
+    night sold) and RevPAR(revenue per available room night) of a list of hotels.
+
+    The figures of a hotel for a month are computed from the nights of that month of\
+    the rooms set up for it, so they cost the same whatever the number of reservations\
+    in the other months. They are kept until a reservation of that month is made or\
+    cancelled, or the rooms of the hotel change. Setting up new months for rooms which\
+    are already in a hotel is not noticed, call clear() after doing it. The cache\
+    holds the hotels weakly, the figures of a hotel go with it.
+
+    Instance attributes: hotels(list), cache(weakref.WeakKeyDictionary) """
+
+    def __init__(self, hotels):
+        """ (list) -> Analytics
+        Initializes the analytics of the hotels with an empty cache.
+        """
+        if numpy is None:
+            raise ImportError("The analytics require numpy.")
+
+        self.hotels = hotels
+        self.cache = weakref.WeakKeyDictionary()
+
+
+
+    def clear(self):
+        """ (None) -> None
+        Forgets every cached result.
+        """
+        self.cache = weakref.WeakKeyDictionary()
+
+
+
+    def compute_month(self, hotel, year, month):
+        """ (Hotel,int,int) -> dict
+        Returns the daily figures of the hotel for the month, as a dictionary from each\
+        room type(and None for all of them) to a dictionary with the arrays 'available',\
+        'sold' and 'revenue', one entry per day of the month. The nights are read from\
+        the occupancy matrix of the hotel if it covers the month, from the rooms if not,\
+        a month at a time(see the month_array of the availability backends).
+
+        >>> random.seed(987)
+        >>> Reservation.booking_numbers = []
+        >>> rooms = [Room("Queen", 101, 80.0), Room("Queen", 102, 100.0)]
+        >>> for r in rooms:
+        ...     r.set_up_room_availability(['May'], 2021)
+        >>> h = Hotel("Secret Nugget Hotel", rooms)
+        >>> num = h.make_reservation("Jack", "Queen", datetime.date(2021, 5, 2),\
+                                     datetime.date(2021, 5, 4))
+        >>> daily = Analytics([h]).compute_month(h, 2021, 5)
+        >>> daily['Queen']['sold'][:5].tolist(), daily['Queen']['revenue'][:5].tolist()
+        ([0, 1, 1, 0, 0], [0.0, 80.0, 80.0, 0.0, 0.0])
+        >>> h.enable_occupancy_matrix()
+        >>> bool((Analytics([h]).compute_month(h, 2021, 5)[None]['sold'] == daily[None]['sold']).all())
+        True
+
+        >>> from availability import PackedAvailability
+        >>> rooms = [Room("Queen", num, price, PackedAvailability)\
+                     for num, price in [(101, 80.0), (102, 100.0)]]
+        >>> for r in rooms:
+        ...     r.set_up_room_availability(['May'], 2021)
+        >>> h = Hotel("Secret Nugget Hotel", rooms)
+        >>> num = h.make_reservation("Judy", "Queen", datetime.date(2021, 5, 2),\
+                                     datetime.date(2021, 5, 4))
+        >>> packed = Analytics([h]).compute_month(h, 2021, 5)
+        >>> packed['Queen']['sold'][:5].tolist(), packed['Queen']['revenue'][:5].tolist()
+        ([0, 1, 1, 0, 0], [0.0, 80.0, 80.0, 0.0, 0.0])
+        """
+        num_days = days_in_month(year, month)
+        start = datetime.date(year, month, 1).toordinal()
+        end = start + num_days
+
+        #the occupancy matrix is only used if it has every night of the month
+        occupancy = hotel.occupancy
+        if occupancy is not None and (start < occupancy.first_night or
+                                      end > occupancy.first_night + occupancy.free.shape[1]):
+            occupancy = None
+
+        #every room set up for the month is available every day of it, and sold on the
+        #days it is booked
+        room_types = []
+        prices = []
+        booked = []
+        for room in hotel.rooms:
+            if occupancy is not None and room.room_num in occupancy.row_of_room:
+                if (year, month) not in room.availability:
+                    continue
+                row = occupancy.row_of_room[room.room_num]
+                nights = ~occupancy.free[row, start - occupancy.first_night:
+                                         end - occupancy.first_night]
+            else:
+                #the backend gives the whole month at once, not one night at a time
+                try:
+                    nights = numpy.frombuffer(room.backend.month_array((year, month)),
+                                              dtype = numpy.uint8)
+                except KeyError:
+                    continue
+            room_types.append(room.room_type)
+            prices.append(room.price)
+            booked.append(nights)
+
+        booked = numpy.array(booked, dtype = int).reshape(len(booked), num_days)
+        room_types = numpy.array(room_types)
+        prices = numpy.array(prices, dtype = float)
+
+        figures = {}
+        for room_type in sorted(set(room_types.tolist())):
+            rows = room_types == room_type
+            figures[room_type] = {'available': numpy.full(num_days, int(rows.sum())),
+                                  'sold': booked[rows].sum(axis = 0),
+                                  'revenue': numpy.dot(prices[rows], booked[rows])}
+
+        figures[None] = {'available': numpy.full(num_days, len(prices)),
+                         'sold': booked.sum(axis = 0),
+                         'revenue': numpy.dot(prices, booked)}
+        return figures
+
+
+
+    def get_daily(self, hotel, year, month):
+        """ (Hotel,int,int) -> dict
+        Returns the daily figures of compute_month, from the cache if no reservation of\
+        the month has changed since they were computed.
+
+        >>> random.seed(987)
+        >>> Reservation.booking_numbers = []
+        >>> r1 = Room("Queen", 101, 80.0)
+        >>> r1.set_up_room_availability(['May'], 2021)
+        >>> h = Hotel("Secret Nugget Hotel", [r1])
+        >>> analytics = Analytics([])
+        >>> analytics.get_daily(h, 2021, 5) is analytics.get_daily(h, 2021, 5)
+        True
+        >>> len(analytics.cache)
+        1
+        >>> del h
+        >>> len(analytics.cache)
+        0
+        """
+        months = self.cache.get(hotel)
+        if months == None:
+            months = {}
+            self.cache[hotel] = months
+
+        version = (hotel.month_versions.get((year, month), 0), hotel.rooms_version)
+        entry = months.get((year, month))
+        if entry == None or entry[0] != version:
+            entry = (version, self.compute_month(hotel, year, month))
+            months[(year, month)] = entry
+        return entry[1]
+
+
+
+    @staticmethod
+    def rates(available, sold, revenue):
+        """ (number,number,number) -> dict
+        Returns a dictionary with the occupancy rate, ADR and RevPAR, 0.0 when there is\
+        nothing to divide by.
+        """
+        available = int(available)
+        sold = int(sold)
+        revenue = float(revenue)
+        return {'available': available, 'sold': sold, 'revenue': round(revenue, 2),
+                'occupancy': sold / available if available else 0.0,
+                'adr': round(revenue / sold, 2) if sold else 0.0,
+                'revpar': round(revenue / available, 2) if available else 0.0}
+
+
+
+    def month_stats(self, hotel, year, month):
+        """ (Hotel,int,int) -> dict
+        Returns a dictionary from each room type(and None for the whole hotel) to the\
+        room nights available and sold, the revenue, the occupancy rate, ADR and RevPAR\
+        of the month.
+
+        >>> random.seed(987)
+        >>> Reservation.booking_numbers = []
+        >>> rooms = [Room("Queen", 101, 80.0), Room("Queen", 102, 100.0), Room("Twin", 103, 55.0)]
+        >>> for r in rooms:
+        ...     r.set_up_room_availability(['Apr', 'May'], 2021)
+        >>> h = Hotel("Secret Nugget Hotel", rooms)
+        >>> num = h.make_reservation("Jack", "Queen", datetime.date(2021, 4, 29),\
+                                     datetime.date(2021, 5, 4))
+        >>> analytics = Analytics([h])
+        >>> analytics.month_stats(h, 2021, 5)['Queen']
+        {'available': 62, 'sold': 3, 'revenue': 240.0, 'occupancy': 0.04838709677419355, 'adr': 80.0, 'revpar': 3.87}
+        >>> analytics.month_stats(h, 2021, 5)[None]['available']
+        93
+        >>> num2 = h.make_reservation("Judy", "Twin", datetime.date(2021, 5, 1),\
+                                      datetime.date(2021, 5, 3))
+        >>> analytics.month_stats(h, 2021, 5)[None]['revenue']
+        350.0
+        >>> analytics.month_stats(h, 2021, 4)[None]['sold']
+        2
+        """
+        stats = {}
+        for room_type, daily in self.get_daily(hotel, year, month).items():
+            stats[room_type] = Analytics.rates(daily['available'].sum(), daily['sold'].sum(),
+                                               daily['revenue'].sum())
+        return stats
+
+
+
+    def daily_stats(self, hotel, year, month, room_type = None):
+        """ (Hotel,int,int,str) -> dict
+        Returns a dictionary with the arrays 'occupancy', 'adr' and 'revpar', one entry\
+        per day of the month, for the rooms of the given type or of the whole hotel.
+
+        >>> random.seed(987)
+        >>> Reservation.booking_numbers = []
+        >>> rooms = [Room("Queen", 101, 80.0), Room("Queen", 102, 100.0)]
+        >>> for r in rooms:
+        ...     r.set_up_room_availability(['May'], 2021)
+        >>> h = Hotel("Secret Nugget Hotel", rooms)
+        >>> num = h.make_reservation("Jack", "Queen", datetime.date(2021, 5, 1),\
+                                     datetime.date(2021, 5, 3))
+        >>> num = h.make_reservation("Judy", "Queen", datetime.date(2021, 5, 2),\
+                                     datetime.date(2021, 5, 3))
+        >>> daily = Analytics([h]).daily_stats(h, 2021, 5)
+        >>> daily['occupancy'][:3].tolist(), daily['adr'][:3].tolist(), daily['revpar'][:3].tolist()
+        ([0.5, 1.0, 0.0], [80.0, 90.0, 0.0], [40.0, 90.0, 0.0])
+        """
+        daily = self.get_daily(hotel, year, month).get(room_type)
+        if daily == None:
+            num_days = days_in_month(year, month)
+            return {'occupancy': numpy.zeros(num_days), 'adr': numpy.zeros(num_days),
+                    'revpar': numpy.zeros(num_days)}
+
+        available = daily['available'].astype(float)
+        sold = daily['sold'].astype(float)
+        revenue = daily['revenue']
+        return {'occupancy': numpy.divide(sold, available, out = numpy.zeros_like(sold),
+                                          where = available > 0),
+                'adr': numpy.divide(revenue, sold, out = numpy.zeros_like(sold), where = sold > 0),
+                'revpar': numpy.divide(revenue, available, out = numpy.zeros_like(sold),
+                                       where = available > 0)}
+
+
+
+    def report(self, year, month):
+        """ (int,int) -> dict
+        Returns a dictionary from the name of each hotel to the figures of the whole\
+        hotel for the month.
+        """
+        stats = {}
+        for hotel in self.hotels:
+            stats[hotel.name] = self.month_stats(hotel, year, month)[None]
+        return stats
+
+
+
+    def plot_daily(self, hotel, year, month, filename, room_type = None):
+        """ (Hotel,int,int,str,str) -> None
+        Saves a chart of the daily occupancy rate, ADR and RevPAR of the month in the\
+        file. Requires matplotlib.
+        """
+        if Figure is None:
+            raise ImportError("The charts require matplotlib.")
+
+        daily = self.daily_stats(hotel, year, month, room_type)
+        days = numpy.arange(1, len(daily['occupancy']) + 1)
+
+        figure = Figure(figsize = (10, 6))
+        occupancy_axes, rate_axes = figure.subplots(2, 1, sharex = True)
+        occupancy_axes.bar(days, daily['occupancy'] * 100)
+        occupancy_axes.set_ylabel("Occupancy (%)")
+        occupancy_axes.set_ylim(0, 100)
+        rate_axes.plot(days, daily['adr'], label = "ADR")
+        rate_axes.plot(days, daily['revpar'], label = "RevPAR")
+        rate_axes.set_xlabel("Day")
+        rate_axes.set_ylabel("Price")
+        rate_axes.legend()
+
+        title = hotel.name + ", " + MONTHS[month - 1] + " " + str(year)
+        if room_type != None:
+            title += ", " + room_type
+        figure.suptitle(title)
+        figure.savefig(filename)
+
+
+
+    def plot_report(self, year, month, filename):
+        """ (int,int,str) -> None
+        Saves a chart comparing the occupancy rate, ADR and RevPAR of the hotels for the\
+        month in the file. Requires matplotlib.
+        """
+        if Figure is None:
+            raise ImportError("The charts require matplotlib.")
+
+        stats = self.report(year, month)
+        names = list(stats)
+        positions = numpy.arange(len(names))
+
+        figure = Figure(figsize = (10, 8))
+        axes_list = figure.subplots(3, 1, sharex = True)
+        for axes, key, label in zip(axes_list, ['occupancy', 'adr', 'revpar'],
+                                    ["Occupancy (%)", "ADR", "RevPAR"]):
+            values = [stats[name][key] for name in names]
+            if key == 'occupancy':
+                values = [value * 100 for value in values]
+            axes.bar(positions, values)
+            axes.set_ylabel(label)
+        axes_list[-1].set_xticks(positions)
+        axes_list[-1].set_xticklabels(names, rotation = 20)
+        figure.suptitle(MONTHS[month - 1] + " " + str(year))
+        figure.savefig(filename)
+
+
+
+if __name__ == "__main__":
+    doctest.testmod()
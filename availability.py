@@ -0,0 +1,1036 @@
+#This program simulates a booking system of hotels for the availability of rooms.
+import doctest, datetime
+from bisect import bisect_left, bisect_right
+from collections.abc import MutableMapping, Sequence
+
+
+def days_in_month(year, month):
+    """ (int,int) -> int
+    Returns the number of days of the given month(1-12) in the given year.
+
+    >>> days_in_month(2021, 6)
+    30
+    >>> days_in_month(2000, 2)
+    29
+    >>> days_in_month(1700, 2)
+    28
+    """
+    days = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31][month - 1]
+
+    #if leap year, change the days of February to 29
+    if month == 2:
+        if year % 4 == 0:
+            days = 29
+            if year % 100 == 0 and year % 400 != 0:
+                days = 28
+
+    return days
+
+
+
+def month_spans(first_date, second_date):
+    """ (date,date) -> list
+    Returns a list of tuples (year, month, first_day, end_day) covering every night\
+    from the first date(included) to the second date(excluded), one tuple per month.
+    The end_day is excluded.
+
+    >>> month_spans(datetime.date(2021, 5, 25), datetime.date(2021, 6, 10))
+    [(2021, 5, 25, 32), (2021, 6, 1, 10)]
+    >>> month_spans(datetime.date(2021, 5, 3), datetime.date(2021, 5, 10))
+    [(2021, 5, 3, 10)]
+    """
+    spans = []
+    year = first_date.year
+    month = first_date.month
+    day = first_date.day
+
+    #walk month by month until the month of the second date is reached
+    while (year, month) < (second_date.year, second_date.month):
+        spans.append((year, month, day, days_in_month(year, month) + 1))
+        month += 1
+        if month == 13:
+            year += 1
+            month = 1
+        day = 1
+
+    if day < second_date.day:
+        spans.append((year, month, day, second_date.day))
+
+    return spans
+
+
+
+class DictAvailability:
+    """ Represents the availability of a room as a dictionary of month lists
+
+    Instance attributes: months(dict) """
+
+    __slots__ = ('months',)
+
+    def __init__(self):
+        self.months = {}
+
+
+    def view(self):
+        """ (None) -> dict
+        Returns the dictionary of (year, month) -> [None, True, ...] of the room.
+        """
+        return self.months
+
+
+    def set_up_month(self, year, month):
+        """ (int,int) -> None
+        Makes the room available every night of the given month.
+        """
+        value = [None]
+        value.extend([True] * days_in_month(year, month))
+        self.months[(year, month)] = value
+
+
+    def reserve(self, reserve_date):
+        """ (date) -> None
+        Marks the given night as booked.
+        """
+        month_list = self.months[(reserve_date.year, reserve_date.month)]
+        if month_list[reserve_date.day] == False:
+            raise AssertionError("The room is not available at the given date")
+        month_list[reserve_date.day] = False
+
+
+    def release(self, available_date):
+        """ (date) -> None
+        Marks the given night as available.
+        """
+        self.months[(available_date.year, available_date.month)][available_date.day] = True
+
+
+    def month_array(self, key):
+        """ (tuple) -> bytes
+        Returns one byte per night of the (year, month), 1 if it is booked and 0 if not,\
+        raises KeyError if it has not been set up.
+
+        >>> a = DictAvailability()
+        >>> a.set_up_month(2021, 5)
+        >>> a.reserve(datetime.date(2021, 5, 2))
+        >>> list(a.month_array((2021, 5))[:4])
+        [0, 1, 0, 0]
+        """
+        return bytes([day == False for day in self.months[key][1:]])
+
+
+    def is_available(self, first_date, second_date):
+        """ (date,date) -> bool
+        Returns True if every night from the first date(included) to the second\
+        date(excluded) has been set up and is not booked.
+
+        >>> a = DictAvailability()
+        >>> a.set_up_month(2021, 5)
+        >>> a.months[(2021, 5)][28] = False
+        >>> a.is_available(datetime.date(2021, 5, 3), datetime.date(2021, 5, 28))
+        True
+        >>> a.is_available(datetime.date(2021, 5, 3), datetime.date(2021, 5, 29))
+        False
+        >>> a.is_available(datetime.date(2021, 5, 30), datetime.date(2021, 6, 2))
+        False
+        """
+        #check the nights one month at a time instead of one date at a time
+        for year, month, first_day, end_day in month_spans(first_date, second_date):
+            month_list = self.months.get((year, month))
+            if month_list is None:
+                return False
+            if False in month_list[first_day:end_day]:
+                return False
+
+        return True
+
+
+    def reserve_stay(self, first_date, second_date):
+        """ (date,date) -> None
+        Marks every night from the first date(included) to the second date(excluded)\
+        as booked.
+        """
+        if not self.is_available(first_date, second_date):
+            raise AssertionError("The room is not available at the given date")
+
+        for year, month, first_day, end_day in month_spans(first_date, second_date):
+            self.months[(year, month)][first_day:end_day] = [False] * (end_day - first_day)
+
+
+    def release_stay(self, first_date, second_date):
+        """ (date,date) -> None
+        Marks every night from the first date(included) to the second date(excluded)\
+        as available. Months which have not been set up are skipped.
+        """
+        for year, month, first_day, end_day in month_spans(first_date, second_date):
+            if (year, month) in self.months:
+                self.months[(year, month)][first_day:end_day] = [True] * (end_day - first_day)
+
+
+
+class IntervalSet:
+    """ Represents a set of integers as sorted, non-overlapping half-open intervals
+
+    Instance attributes: starts(list), ends(list) """
+
+    __slots__ = ('starts', 'ends')
+
+    def __init__(self):
+        self.starts = []
+        self.ends = []
+
+
+    def __len__(self):
+        return len(self.starts)
+
+
+    def __iter__(self):
+        return iter(zip(self.starts, self.ends))
+
+
+    def overlaps(self, first, end):
+        """ (int,int) -> bool
+        Returns True if any integer in [first, end) is in the set.
+
+        >>> s = IntervalSet()
+        >>> s.add(10, 15)
+        >>> s.overlaps(5, 10), s.overlaps(14, 20), s.overlaps(15, 20)
+        (False, True, False)
+        """
+        #the first interval ending after first is the only candidate
+        i = bisect_right(self.ends, first)
+        return i < len(self.starts) and self.starts[i] < end
+
+
+    def covers(self, first, end):
+        """ (int,int) -> bool
+        Returns True if every integer in [first, end) is in the set.
+
+        >>> s = IntervalSet()
+        >>> s.add(10, 15)
+        >>> s.add(15, 20)
+        >>> s.covers(12, 20), s.covers(9, 12), list(s)
+        (True, False, [(10, 20)])
+        """
+        i = bisect_right(self.starts, first) - 1
+        return i >= 0 and self.ends[i] >= end
+
+
+    def add(self, first, end):
+        """ (int,int) -> None
+        Adds every integer in [first, end) to the set, merging touching intervals.
+
+        >>> s = IntervalSet()
+        >>> s.add(1, 3)
+        >>> s.add(8, 9)
+        >>> s.add(5, 6)
+        >>> s.add(2, 5)
+        >>> list(s)
+        [(1, 6), (8, 9)]
+        """
+        #intervals that end at or after first and start at or before end are merged
+        lo = bisect_left(self.ends, first)
+        hi = bisect_right(self.starts, end)
+        if lo < hi:
+            first = min(first, self.starts[lo])
+            end = max(end, self.ends[hi - 1])
+
+        self.starts[lo:hi] = [first]
+        self.ends[lo:hi] = [end]
+
+
+    def remove(self, first, end):
+        """ (int,int) -> None
+        Removes every integer in [first, end) from the set, splitting intervals.
+
+        >>> s = IntervalSet()
+        >>> s.add(1, 10)
+        >>> s.add(12, 14)
+        >>> s.remove(3, 5)
+        >>> s.remove(9, 13)
+        >>> list(s)
+        [(1, 3), (5, 9), (13, 14)]
+        """
+        #intervals that end after first and start before end are affected
+        lo = bisect_right(self.ends, first)
+        hi = bisect_left(self.starts, end)
+        if lo >= hi:
+            return
+
+        new_starts = []
+        new_ends = []
+        if self.starts[lo] < first:
+            new_starts.append(self.starts[lo])
+            new_ends.append(first)
+        if self.ends[hi - 1] > end:
+            new_starts.append(end)
+            new_ends.append(self.ends[hi - 1])
+
+        self.starts[lo:hi] = new_starts
+        self.ends[lo:hi] = new_ends
+
+
+
+class IntervalAvailability:
+    """ Represents the availability of a room as booked intervals of day ordinals
+
+    Instance attributes: days(dict), open_nights(IntervalSet), booked_nights(IntervalSet) """
+
+    __slots__ = ('days', 'open_nights', 'booked_nights')
+
+    def __init__(self):
+        self.days = {}
+        self.open_nights = IntervalSet()
+        self.booked_nights = IntervalSet()
+
+
+    def view(self):
+        """ (None) -> AvailabilityView
+        Returns a dictionary-like view of (year, month) -> [None, True, ...] of the room.
+        """
+        return AvailabilityView(self)
+
+
+    def set_up_month(self, year, month):
+        """ (int,int) -> None
+        Makes the room available every night of the given month.
+        """
+        days = days_in_month(year, month)
+        first = datetime.date(year, month, 1).toordinal()
+
+        self.days[(year, month)] = days
+        self.open_nights.add(first, first + days)
+        self.booked_nights.remove(first, first + days)
+
+
+    def remove_month(self, year, month):
+        """ (int,int) -> None
+        Removes the given month from the availability of the room.
+        """
+        days = self.days.pop((year, month))
+        first = datetime.date(year, month, 1).toordinal()
+
+        self.open_nights.remove(first, first + days)
+        self.booked_nights.remove(first, first + days)
+
+
+    def has_month(self, key):
+        """ (tuple) -> bool
+        Returns True if the (year, month) has been set up.
+        """
+        return key in self.days
+
+
+    def month_keys(self):
+        """ (None) -> list
+        Returns the list of (year, month) which have been set up.
+        """
+        return list(self.days)
+
+
+    def month_length(self, key):
+        """ (tuple) -> int
+        Returns the number of days of the (year, month), raises KeyError if it has not\
+        been set up.
+        """
+        return self.days[key]
+
+
+    def month_array(self, key):
+        """ (tuple) -> bytes
+        Returns one byte per night of the (year, month), 1 if it is booked and 0 if not,\
+        raises KeyError if it has not been set up.
+
+        >>> a = IntervalAvailability()
+        >>> a.set_up_month(2021, 5)
+        >>> a.reserve_stay(datetime.date(2021, 5, 2), datetime.date(2021, 5, 4))
+        >>> a.reserve_stay(datetime.date(2021, 5, 30), datetime.date(2021, 6, 1))
+        >>> nights = a.month_array((2021, 5))
+        >>> list(nights[:5]), list(nights[-3:])
+        ([0, 1, 1, 0, 0], [0, 1, 1])
+        """
+        days = self.days[key]
+        first = datetime.date(key[0], key[1], 1).toordinal()
+        end = first + days
+        nights = bytearray(days)
+
+        #only the booked intervals ending after the first night can overlap the month
+        booked = self.booked_nights
+        i = bisect_right(booked.ends, first)
+        while i < len(booked.starts) and booked.starts[i] < end:
+            start = max(booked.starts[i], first)
+            stop = min(booked.ends[i], end)
+            nights[start - first:stop - first] = b'\x01' * (stop - start)
+            i += 1
+        return bytes(nights)
+
+
+    def mark_booked(self, a_date):
+        """ (date) -> None
+        Marks the given night as booked, even if it is booked already.
+        """
+        night = a_date.toordinal()
+        self.booked_nights.add(night, night + 1)
+
+
+    def is_booked(self, a_date):
+        """ (date) -> bool
+        Returns True if the given night is booked, raises KeyError if its month has\
+        not been set up.
+        """
+        if (a_date.year, a_date.month) not in self.days:
+            raise KeyError((a_date.year, a_date.month))
+
+        night = a_date.toordinal()
+        return self.booked_nights.overlaps(night, night + 1)
+
+
+    def reserve(self, reserve_date):
+        """ (date) -> None
+        Marks the given night as booked.
+        """
+        if self.is_booked(reserve_date):
+            raise AssertionError("The room is not available at the given date")
+
+        night = reserve_date.toordinal()
+        self.booked_nights.add(night, night + 1)
+
+
+    def release(self, available_date):
+        """ (date) -> None
+        Marks the given night as available.
+        """
+        if (available_date.year, available_date.month) not in self.days:
+            raise KeyError((available_date.year, available_date.month))
+
+        night = available_date.toordinal()
+        self.booked_nights.remove(night, night + 1)
+
+
+    def is_available(self, first_date, second_date):
+        """ (date,date) -> bool
+        Returns True if every night from the first date(included) to the second\
+        date(excluded) has been set up and is not booked.
+
+        >>> a = IntervalAvailability()
+        >>> a.set_up_month(2021, 5)
+        >>> a.reserve(datetime.date(2021, 5, 28))
+        >>> a.is_available(datetime.date(2021, 5, 3), datetime.date(2021, 5, 28))
+        True
+        >>> a.is_available(datetime.date(2021, 5, 3), datetime.date(2021, 5, 29))
+        False
+        >>> a.is_available(datetime.date(2021, 5, 30), datetime.date(2021, 6, 2))
+        False
+        """
+        first = first_date.toordinal()
+        end = second_date.toordinal()
+
+        return self.open_nights.covers(first, end) and \
+               not self.booked_nights.overlaps(first, end)
+
+
+    def reserve_stay(self, first_date, second_date):
+        """ (date,date) -> None
+        Marks every night from the first date(included) to the second date(excluded)\
+        as booked.
+        """
+        if not self.is_available(first_date, second_date):
+            raise AssertionError("The room is not available at the given date")
+
+        self.booked_nights.add(first_date.toordinal(), second_date.toordinal())
+
+
+    def release_stay(self, first_date, second_date):
+        """ (date,date) -> None
+        Marks every night from the first date(included) to the second date(excluded)\
+        as available. Months which have not been set up are skipped.
+        """
+        self.booked_nights.remove(first_date.toordinal(), second_date.toordinal())
+
+
+
+class PackedAvailability:
+    """ Represents the availability of a room as one bytearray per year. The first two\
+    bytes hold one bit per month set up, the other 46 bytes one bit per day of the\
+    year, set if the night is booked.
+
+    Instance attribute: years(dict)
+
+    >>> a = PackedAvailability()
+    >>> a.set_up_month(2021, 12)
+    >>> a.set_up_month(2022, 1)
+    >>> a.reserve_stay(datetime.date(2021, 12, 30), datetime.date(2022, 1, 2))
+    >>> a.is_available(datetime.date(2021, 12, 28), datetime.date(2021, 12, 30))
+    True
+    >>> a.is_available(datetime.date(2021, 12, 28), datetime.date(2021, 12, 31))
+    False
+    >>> a.is_available(datetime.date(2022, 1, 2), datetime.date(2022, 2, 1))
+    True
+    >>> a.is_available(datetime.date(2022, 1, 2), datetime.date(2022, 2, 2))
+    False
+    >>> a.view()[(2022, 1)][:4]
+    [None, False, True, True]
+    >>> a.release_stay(datetime.date(2021, 12, 31), datetime.date(2022, 1, 2))
+    >>> a.is_available(datetime.date(2021, 12, 31), datetime.date(2022, 1, 5))
+    True
+    >>> len(a.years[2021])
+    48
+    """
+
+    __slots__ = ('years',)
+
+    MONTH_BYTES = 2
+    DAY_BYTES = 46
+
+    #turns the digits '0' and '1' into the bytes 0 and 1
+    DIGIT_BYTES = bytes.maketrans(b'01', b'\x00\x01')
+
+    def __init__(self):
+        self.years = {}
+
+
+    def view(self):
+        """ (None) -> AvailabilityView
+        Returns a dictionary-like view of (year, month) -> [None, True, ...] of the room.
+        """
+        return AvailabilityView(self)
+
+
+    @staticmethod
+    def day_of_year(a_date):
+        """ (date) -> int
+        Returns the number of days from the first of January to the date.
+        """
+        return a_date.toordinal() - datetime.date(a_date.year, 1, 1).toordinal()
+
+
+    def get_months(self, year):
+        """ (int) -> int
+        Returns the bits of the months set up in the year.
+        """
+        year_bytes = self.years.get(year)
+        if year_bytes is None:
+            return 0
+        return int.from_bytes(year_bytes[:self.MONTH_BYTES], 'little')
+
+
+    def get_days(self, year):
+        """ (int) -> int
+        Returns the bits of the nights booked in the year.
+        """
+        return int.from_bytes(self.years[year][self.MONTH_BYTES:], 'little')
+
+
+    def set_days(self, year, days):
+        """ (int,int) -> None
+        Stores the bits of the nights booked in the year.
+        """
+        self.years[year][self.MONTH_BYTES:] = days.to_bytes(self.DAY_BYTES, 'little')
+
+
+    def set_months(self, year, months):
+        """ (int,int) -> None
+        Stores the bits of the months set up in the year, dropping the year if none is.
+        """
+        if months == 0:
+            del self.years[year]
+        else:
+            self.years[year][:self.MONTH_BYTES] = months.to_bytes(self.MONTH_BYTES, 'little')
+
+
+    @staticmethod
+    def month_mask(year, month):
+        """ (int,int) -> int
+        Returns the day bits of every night of the month.
+        """
+        first = datetime.date(year, month, 1).toordinal() - datetime.date(year, 1, 1).toordinal()
+        return ((1 << days_in_month(year, month)) - 1) << first
+
+
+    def has_month(self, key):
+        """ (tuple) -> bool
+        Returns True if the (year, month) has been set up.
+        """
+        return self.get_months(key[0]) >> (key[1] - 1) & 1 == 1
+
+
+    def month_keys(self):
+        """ (None) -> list
+        Returns the list of (year, month) which have been set up.
+        """
+        keys = []
+        for year in self.years:
+            months = self.get_months(year)
+            for month in range(1, 13):
+                if months >> (month - 1) & 1:
+                    keys.append((year, month))
+        return keys
+
+
+    def month_length(self, key):
+        """ (tuple) -> int
+        Returns the number of days of the (year, month), raises KeyError if it has not\
+        been set up.
+        """
+        if not self.has_month(key):
+            raise KeyError(key)
+        return days_in_month(key[0], key[1])
+
+
+    def month_array(self, key):
+        """ (tuple) -> bytes
+        Returns one byte per night of the (year, month), 1 if it is booked and 0 if not,\
+        raises KeyError if it has not been set up.
+
+        >>> a = PackedAvailability()
+        >>> a.set_up_month(2021, 5)
+        >>> a.reserve_stay(datetime.date(2021, 5, 2), datetime.date(2021, 5, 4))
+        >>> list(a.month_array((2021, 5))[:5])
+        [0, 1, 1, 0, 0]
+        """
+        days = self.month_length(key)
+        first = datetime.date(key[0], key[1], 1).toordinal() - datetime.date(key[0], 1, 1).toordinal()
+        bits = self.get_days(key[0]) >> first & ((1 << days) - 1)
+
+        #the binary digits of the nights, the first night last
+        return format(bits, '0' + str(days) + 'b')[::-1].encode().translate(
+            PackedAvailability.DIGIT_BYTES)
+
+
+    def set_up_month(self, year, month):
+        """ (int,int) -> None
+        Makes the room available every night of the given month.
+        """
+        if year not in self.years:
+            self.years[year] = bytearray(self.MONTH_BYTES + self.DAY_BYTES)
+        self.set_months(year, self.get_months(year) | 1 << (month - 1))
+        self.set_days(year, self.get_days(year) & ~PackedAvailability.month_mask(year, month))
+
+
+    def remove_month(self, year, month):
+        """ (int,int) -> None
+        Removes the given month from the availability of the room.
+        """
+        if not self.has_month((year, month)):
+            raise KeyError((year, month))
+        self.set_days(year, self.get_days(year) & ~PackedAvailability.month_mask(year, month))
+        self.set_months(year, self.get_months(year) & ~(1 << (month - 1)))
+
+
+    def is_booked(self, a_date):
+        """ (date) -> bool
+        Returns True if the given night is booked, raises KeyError if its month has\
+        not been set up.
+        """
+        if not self.has_month((a_date.year, a_date.month)):
+            raise KeyError((a_date.year, a_date.month))
+
+        day = PackedAvailability.day_of_year(a_date)
+        return self.years[a_date.year][self.MONTH_BYTES + day // 8] >> (day % 8) & 1 == 1
+
+
+    def mark_booked(self, a_date):
+        """ (date) -> None
+        Marks the given night as booked, even if it is booked already.
+        """
+        day = PackedAvailability.day_of_year(a_date)
+        self.years[a_date.year][self.MONTH_BYTES + day // 8] |= 1 << (day % 8)
+
+
+    def reserve(self, reserve_date):
+        """ (date) -> None
+        Marks the given night as booked.
+        """
+        if self.is_booked(reserve_date):
+            raise AssertionError("The room is not available at the given date")
+        self.mark_booked(reserve_date)
+
+
+    def release(self, available_date):
+        """ (date) -> None
+        Marks the given night as available.
+        """
+        if not self.has_month((available_date.year, available_date.month)):
+            raise KeyError((available_date.year, available_date.month))
+
+        day = PackedAvailability.day_of_year(available_date)
+        self.years[available_date.year][self.MONTH_BYTES + day // 8] &= ~(1 << (day % 8)) & 255
+
+
+    def year_spans(self, first_date, second_date):
+        """ (date,date) -> list
+        Returns a list of tuples (year, first day, end day) covering every night from\
+        the first date(included) to the second date(excluded), one tuple per year,\
+        with the days counted from the first of January.
+        """
+        spans = []
+        first = first_date.toordinal()
+        end = second_date.toordinal()
+        for year in range(first_date.year, second_date.year + 1):
+            new_year = datetime.date(year, 1, 1).toordinal()
+            first_day = max(first, new_year) - new_year
+            end_day = min(end, datetime.date(year + 1, 1, 1).toordinal()) - new_year
+            if first_day < end_day:
+                spans.append((year, first_day, end_day))
+        return spans
+
+
+    def is_available(self, first_date, second_date):
+        """ (date,date) -> bool
+        Returns True if every night from the first date(included) to the second\
+        date(excluded) has been set up and is not booked.
+        """
+        for year, first_day, end_day in self.year_spans(first_date, second_date):
+            #every month of the nights must be set up
+            new_year = datetime.date(year, 1, 1).toordinal()
+            first_month = datetime.date.fromordinal(new_year + first_day).month
+            last_month = datetime.date.fromordinal(new_year + end_day - 1).month
+            needed = ((1 << (last_month - first_month + 1)) - 1) << (first_month - 1)
+            if self.get_months(year) & needed != needed:
+                return False
+
+            #and none of the nights booked
+            if self.get_days(year) >> first_day & ((1 << (end_day - first_day)) - 1):
+                return False
+
+        return True
+
+
+    def reserve_stay(self, first_date, second_date):
+        """ (date,date) -> None
+        Marks every night from the first date(included) to the second date(excluded)\
+        as booked.
+        """
+        if not self.is_available(first_date, second_date):
+            raise AssertionError("The room is not available at the given date")
+
+        for year, first_day, end_day in self.year_spans(first_date, second_date):
+            nights = ((1 << (end_day - first_day)) - 1) << first_day
+            self.set_days(year, self.get_days(year) | nights)
+
+
+    def release_stay(self, first_date, second_date):
+        """ (date,date) -> None
+        Marks every night from the first date(included) to the second date(excluded)\
+        as available. Months which have not been set up are skipped.
+        """
+        for year, month, first_day, end_day in month_spans(first_date, second_date):
+            if self.has_month((year, month)):
+                new_year = datetime.date(year, 1, 1).toordinal()
+                first = datetime.date(year, month, first_day).toordinal() - new_year
+                nights = ((1 << (end_day - first_day)) - 1) << first
+                self.set_days(year, self.get_days(year) & ~nights)
+
+
+
+class SparseAvailability:
+    """ Represents the availability of a room as a dictionary of months, where a month\
+    without any booked night is only its number of days. The list of the month is made\
+    when a night of it is first booked, and dropped when its last booked night is\
+    released, so that the months far in the future cost almost nothing.
+
+    Instance attributes: months(dict)
+
+    >>> a = SparseAvailability()
+    >>> a.set_up_month(2021, 5)
+    >>> a.set_up_month(2021, 6)
+    >>> a.months
+    {(2021, 5): 31, (2021, 6): 30}
+    >>> a.reserve_stay(datetime.date(2021, 5, 30), datetime.date(2021, 6, 2))
+    >>> a.months[(2021, 6)][:4]
+    [None, False, True, True]
+    >>> a.is_available(datetime.date(2021, 6, 2), datetime.date(2021, 7, 1))
+    True
+    >>> a.is_available(datetime.date(2021, 6, 2), datetime.date(2021, 7, 2))
+    False
+    >>> a.release_stay(datetime.date(2021, 6, 1), datetime.date(2021, 6, 2))
+    >>> a.months[(2021, 6)]
+    30
+    >>> a.view()[(2021, 6)][:3]
+    [None, True, True]
+    """
+
+    __slots__ = ('months',)
+
+    #every room uses the same (year, month) tuples as keys
+    MONTH_KEYS = {}
+
+    def __init__(self):
+        self.months = {}
+
+
+    def view(self):
+        """ (None) -> AvailabilityView
+        Returns a dictionary-like view of (year, month) -> [None, True, ...] of the room.
+        """
+        return AvailabilityView(self)
+
+
+    def get_month_list(self, key):
+        """ (tuple) -> list
+        Returns the list [None, True, False, ...] of the (year, month), making it if the\
+        month has no booked night yet. Raises KeyError if it has not been set up.
+        """
+        month_list = self.months[key]
+        if type(month_list) == int:
+            month_list = [None] + [True] * month_list
+            self.months[key] = month_list
+        return month_list
+
+
+    def drop_month_list(self, key):
+        """ (tuple) -> None
+        Goes back to the number of days of the (year, month) if none of its nights is\
+        booked any more.
+        """
+        month_list = self.months[key]
+        if type(month_list) != int and False not in month_list:
+            self.months[key] = len(month_list) - 1
+
+
+    def has_month(self, key):
+        """ (tuple) -> bool
+        Returns True if the (year, month) has been set up.
+        """
+        return key in self.months
+
+
+    def month_keys(self):
+        """ (None) -> list
+        Returns the list of (year, month) which have been set up.
+        """
+        return list(self.months)
+
+
+    def month_length(self, key):
+        """ (tuple) -> int
+        Returns the number of days of the (year, month), raises KeyError if it has not\
+        been set up.
+        """
+        month_list = self.months[key]
+        if type(month_list) == int:
+            return month_list
+        return len(month_list) - 1
+
+
+    def month_array(self, key):
+        """ (tuple) -> bytes
+        Returns one byte per night of the (year, month), 1 if it is booked and 0 if not,\
+        raises KeyError if it has not been set up.
+
+        >>> a = SparseAvailability()
+        >>> a.set_up_month(2021, 5)
+        >>> a.month_array((2021, 5)) == bytes(31)
+        True
+        >>> a.reserve(datetime.date(2021, 5, 2))
+        >>> list(a.month_array((2021, 5))[:4])
+        [0, 1, 0, 0]
+        """
+        month_list = self.months[key]
+        if type(month_list) == int:
+            return bytes(month_list)
+        return bytes([day == False for day in month_list[1:]])
+
+
+    def set_up_month(self, year, month):
+        """ (int,int) -> None
+        Makes the room available every night of the given month.
+        """
+        key = SparseAvailability.MONTH_KEYS.setdefault((year, month), (year, month))
+        self.months[key] = days_in_month(year, month)
+
+
+    def remove_month(self, year, month):
+        """ (int,int) -> None
+        Removes the given month from the availability of the room.
+        """
+        del self.months[(year, month)]
+
+
+    def is_booked(self, a_date):
+        """ (date) -> bool
+        Returns True if the given night is booked, raises KeyError if its month has\
+        not been set up.
+        """
+        month_list = self.months[(a_date.year, a_date.month)]
+        if type(month_list) == int:
+            return False
+        return month_list[a_date.day] == False
+
+
+    def mark_booked(self, a_date):
+        """ (date) -> None
+        Marks the given night as booked, even if it is booked already.
+        """
+        self.get_month_list((a_date.year, a_date.month))[a_date.day] = False
+
+
+    def reserve(self, reserve_date):
+        """ (date) -> None
+        Marks the given night as booked.
+        """
+        if self.is_booked(reserve_date):
+            raise AssertionError("The room is not available at the given date")
+        self.mark_booked(reserve_date)
+
+
+    def release(self, available_date):
+        """ (date) -> None
+        Marks the given night as available.
+        """
+        key = (available_date.year, available_date.month)
+        month_list = self.months[key]
+        if type(month_list) != int:
+            month_list[available_date.day] = True
+            self.drop_month_list(key)
+
+
+    def is_available(self, first_date, second_date):
+        """ (date,date) -> bool
+        Returns True if every night from the first date(included) to the second\
+        date(excluded) has been set up and is not booked.
+        """
+        for year, month, first_day, end_day in month_spans(first_date, second_date):
+            month_list = self.months.get((year, month))
+            if month_list is None:
+                return False
+            if type(month_list) != int and False in month_list[first_day:end_day]:
+                return False
+
+        return True
+
+
+    def reserve_stay(self, first_date, second_date):
+        """ (date,date) -> None
+        Marks every night from the first date(included) to the second date(excluded)\
+        as booked.
+        """
+        if not self.is_available(first_date, second_date):
+            raise AssertionError("The room is not available at the given date")
+
+        for year, month, first_day, end_day in month_spans(first_date, second_date):
+            month_list = self.get_month_list((year, month))
+            month_list[first_day:end_day] = [False] * (end_day - first_day)
+
+
+    def release_stay(self, first_date, second_date):
+        """ (date,date) -> None
+        Marks every night from the first date(included) to the second date(excluded)\
+        as available. Months which have not been set up are skipped.
+        """
+        for year, month, first_day, end_day in month_spans(first_date, second_date):
+            month_list = self.months.get((year, month))
+            if month_list is not None and type(month_list) != int:
+                month_list[first_day:end_day] = [True] * (end_day - first_day)
+                self.drop_month_list((year, month))
+
+
+
+class AvailabilityView(MutableMapping):
+    """ Represents the (year, month) -> [None, True, ...] dictionary of a room whose\
+    availability is kept by another backend. Reading and writing go to the backend.
+
+    Instance attribute: backend
+
+    >>> a = IntervalAvailability()
+    >>> a.set_up_month(2021, 5)
+    >>> view = a.view()
+    >>> view[(2021, 5)][3] = False
+    >>> a.is_available(datetime.date(2021, 5, 2), datetime.date(2021, 5, 4))
+    False
+    >>> view[(2021, 5)][:5]
+    [None, True, True, False, True]
+    >>> len(view), len(view[(2021, 5)])
+    (1, 32)
+    """
+
+    __slots__ = ('backend',)
+
+    def __init__(self, backend):
+        self.backend = backend
+
+
+    def __getitem__(self, key):
+        if not self.backend.has_month(key):
+            raise KeyError(key)
+        return MonthView(self.backend, key)
+
+
+    def __setitem__(self, key, value):
+        #set up the month as available, then book every night marked False
+        self.backend.set_up_month(key[0], key[1])
+        for day in range(1, len(value)):
+            if value[day] == False:
+                self.backend.reserve(datetime.date(key[0], key[1], day))
+
+
+    def __delitem__(self, key):
+        if not self.backend.has_month(key):
+            raise KeyError(key)
+        self.backend.remove_month(key[0], key[1])
+
+
+    def __iter__(self):
+        return iter(self.backend.month_keys())
+
+
+    def __len__(self):
+        return len(self.backend.month_keys())
+
+
+    def __contains__(self, key):
+        return self.backend.has_month(key)
+
+
+
+class MonthView(Sequence):
+    """ Represents the [None, True, ...] list of one month of a room whose availability\
+    is kept by another backend.
+
+    Instance attributes: backend, key(tuple) """
+
+    __slots__ = ('backend', 'key')
+
+    def __init__(self, backend, key):
+        self.backend = backend
+        self.key = key
+
+
+    def __len__(self):
+        return self.backend.month_length(self.key) + 1
+
+
+    def __getitem__(self, day):
+        if isinstance(day, slice):
+            return [self[i] for i in range(*day.indices(len(self)))]
+
+        if day < 0:
+            day += len(self)
+        if day < 0 or day >= len(self):
+            raise IndexError("list index out of range")
+        if day == 0:
+            return None
+
+        return not self.backend.is_booked(datetime.date(self.key[0], self.key[1], day))
+
+
+    def __setitem__(self, day, value):
+        a_date = datetime.date(self.key[0], self.key[1], day)
+        if value == False:
+            self.backend.mark_booked(a_date)
+        else:
+            self.backend.release(a_date)
+
+
+    def __eq__(self, other):
+        if not isinstance(other, (list, Sequence)):
+            return NotImplemented
+        return list(self) == list(other)
+
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+
+if __name__ == "__main__":
+    doctest.testmod()
@@ -0,0 +1,462 @@
+#This program simulates a booking system of hotels for measuring its performance.
+import doctest, datetime, random, os, tempfile, time, json, sys, argparse, tracemalloc
+from room import Room, MONTHS
+from reservation import Reservation
+from hotel import Hotel
+from booking import Booking
+import availability
+
+
+#name of the scale: number of rooms, number of years, number of reservations
+SCALES = {'small': (20, 1, 500),
+          'medium': (100, 2, 5000),
+          'large': (500, 3, 50000)}
+
+#most stays are short, a few last one or two weeks
+STAY_LENGTHS = [1, 2, 3, 4, 5, 7, 10, 14]
+STAY_WEIGHTS = [30, 25, 18, 10, 7, 6, 2, 2]
+
+#share and price of each type of room
+ROOM_TYPE_WEIGHTS = {'Twin': (30, 55.0), 'Double': (30, 70.0), 'Queen': (25, 90.0),
+                     'King': (15, 130.0)}
+
+
+def generate_hotel(name, num_rooms, months_list, year, num_reservations, seed = 0):
+    """ (str,int,list,int,int,int) -> Hotel
+    Returns a hotel with num_rooms rooms set up for the given months of the year and\
+    about num_reservations reservations of 1 to 7 nights, spread over the rooms. The\
+    same seed always gives the same hotel and booking numbers.
+
+    >>> Reservation.booking_numbers = []
+    >>> h = generate_hotel("Benchmark Hotel", 20, ['Jan', 'Feb'], 2021, 50)
+    >>> len(h.rooms), len(h.reservations)
+    (20, 50)
+    """
+    rng = random.Random(seed)
+    random.seed(seed)
+
+    rooms = []
+    for room_num in range(1, num_rooms + 1):
+        room_type = Room.TYPES_OF_ROOMS_AVAILABLE[room_num % 4].capitalize()
+        room = Room(room_type, room_num, float(50 + 10 * (room_num % 4)))
+        room.set_up_room_availability(months_list, year)
+        rooms.append(room)
+    hotel = Hotel(name, rooms, shared = True)
+
+    #walk through each room, leaving random gaps between the stays
+    first_date = datetime.date(year, MONTHS.index(months_list[0]) + 1, 1)
+    last_month = MONTHS.index(months_list[-1]) + 1
+    end_date = datetime.date(year + last_month // 12, last_month % 12 + 1, 1)
+    per_room = num_reservations // num_rooms + 1
+
+    made = 0
+    for room in hotel.rooms:
+        date1 = first_date
+        for i in range(per_room):
+            if made == num_reservations:
+                return hotel
+            date1 += datetime.timedelta(days = rng.randint(0, 2))
+            date2 = date1 + datetime.timedelta(days = rng.randint(1, 7))
+            if date2 > end_date:
+                break
+            a_reservation = Reservation("Guest " + str(made), room, date1, date2)
+            hotel.reservations[a_reservation.booking_number] = a_reservation
+            hotel.add_to_indexes(a_reservation)
+            made += 1
+            date1 = date2
+
+    return hotel
+
+
+
+def generate_hotel_for_years(name, num_rooms, first_year, num_years, num_reservations,
+                             seed = 0):
+    """ (str,int,int,int,int,int) -> Hotel
+    Returns a hotel with num_rooms rooms of mixed types set up for every month of\
+    num_years years from first_year, and about num_reservations reservations. Most\
+    stays last a few nights, a few last one or two weeks, and there are short gaps\
+    between them. The same seed always gives the same hotel and booking numbers.
+
+    >>> Reservation.booking_numbers = []
+    >>> h = generate_hotel_for_years("Benchmark Hotel", 12, 2021, 2, 300)
+    >>> len(h.rooms), len(h.reservations)
+    (12, 300)
+    >>> sorted(h.rooms[0].availability)[-1]
+    (2022, 12)
+    >>> sorted(h.get_available_room_types())
+    ['Double', 'King', 'Queen', 'Twin']
+    """
+    rng = random.Random(seed)
+    random.seed(seed)
+
+    #give every type at least one room, then draw the others by their share
+    types = list(ROOM_TYPE_WEIGHTS)
+    weights = [ROOM_TYPE_WEIGHTS[room_type][0] for room_type in types]
+    room_types = types[:num_rooms] + rng.choices(types, weights, k = max(num_rooms - 4, 0))
+
+    rooms = []
+    for room_num in range(1, num_rooms + 1):
+        room_type = room_types[room_num - 1]
+        room = Room(room_type, room_num, ROOM_TYPE_WEIGHTS[room_type][1])
+        for year in range(first_year, first_year + num_years):
+            room.set_up_room_availability(MONTHS, year)
+        rooms.append(room)
+    hotel = Hotel(name, rooms, shared = True)
+
+    #walk through each room, leaving random gaps between the stays
+    first_date = datetime.date(first_year, 1, 1)
+    end_date = datetime.date(first_year + num_years, 1, 1)
+    per_room = num_reservations // num_rooms + 1
+
+    made = 0
+    for room in hotel.rooms:
+        date1 = first_date
+        for i in range(per_room):
+            if made == num_reservations:
+                return hotel
+            date1 += datetime.timedelta(days = rng.randint(0, 3))
+            nights = rng.choices(STAY_LENGTHS, STAY_WEIGHTS)[0]
+            date2 = date1 + datetime.timedelta(days = nights)
+            if date2 > end_date:
+                break
+            a_reservation = Reservation("Guest " + str(made), room, date1, date2)
+            hotel.reservations[a_reservation.booking_number] = a_reservation
+            hotel.add_to_indexes(a_reservation)
+            made += 1
+            date1 = date2
+
+    return hotel
+
+
+
+def random_stays(rng, first_year, num_years, count):
+    """ (Random,int,int,int) -> list
+    Returns count random (room type, check-in date, check-out date) requests inside\
+    the num_years years from first_year.
+    """
+    types = list(ROOM_TYPE_WEIGHTS)
+    weights = [ROOM_TYPE_WEIGHTS[room_type][0] for room_type in types]
+    first = datetime.date(first_year, 1, 1).toordinal()
+    last = datetime.date(first_year + num_years, 1, 1).toordinal() - max(STAY_LENGTHS)
+
+    stays = []
+    for i in range(count):
+        check_in = rng.randint(first, last)
+        nights = rng.choices(STAY_LENGTHS, STAY_WEIGHTS)[0]
+        stays.append((rng.choices(types, weights)[0], datetime.date.fromordinal(check_in),
+                      datetime.date.fromordinal(check_in + nights)))
+    return stays
+
+
+
+def best_time(function, repeat = 3):
+    """ (function,int) -> float
+    Calls the function repeat times, returns the shortest time in seconds.
+    """
+    times = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+
+def benchmark_month_export(reservation_counts = (1000, 10000, 100000), repeat = 3):
+    """ (tuple,int) -> list
+    Times Hotel.save_reservations_for_month for hotels with each number of\
+    reservations, spread over a year with one room for every 20 reservations.
+    Returns a list of dictionaries, one per hotel.
+    """
+    results = []
+    old_folder = os.getcwd()
+
+    with tempfile.TemporaryDirectory() as folder:
+        os.chdir(folder)
+        try:
+            for num_reservations in reservation_counts:
+                Reservation.booking_numbers = []
+                num_rooms = max(num_reservations // 20, 1)
+                hotel = generate_hotel("Benchmark Hotel", num_rooms, MONTHS, 2021,
+                                       num_reservations)
+                os.makedirs("hotels/benchmark_hotel", exist_ok = True)
+
+                seconds = best_time(lambda: hotel.save_reservations_for_month('Jun', 2021),
+                                    repeat)
+                results.append({'reservations': len(hotel.reservations),
+                                'rooms': num_rooms, 'seconds': seconds})
+        finally:
+            os.chdir(old_folder)
+
+    return results
+
+
+
+def benchmark_interleaved_receipts(num_reservations = 20000, operations = 500, seed = 0):
+    """ (int,int,int) -> dict
+    Makes operations reservations in a hotel of about num_reservations reservations,\
+    each followed by the receipt of the new booking number, as a client booking and\
+    paying one stay after another would. Returns the seconds taken with get_receipt,\
+    with get_receipts, and with get_receipts building the columns again every time.
+
+    >>> Reservation.booking_numbers = []
+    >>> result = benchmark_interleaved_receipts(300, 5)
+    >>> sorted(result)
+    ['get_receipt', 'get_receipts', 'get_receipts_rebuilt', 'operations', 'reservations']
+    """
+    results = {'reservations': num_reservations, 'operations': operations}
+    for method in ['get_receipt', 'get_receipts', 'get_receipts_rebuilt']:
+        Reservation.booking_numbers = []
+        hotel = generate_hotel_for_years("Benchmark Hotel", max(num_reservations // 100, 4),
+                                         2021, 2, num_reservations, seed)
+        stays = random_stays(random.Random(seed), 2021, 2, operations)
+        hotel.get_columns()
+
+        start = time.perf_counter()
+        for room_type, date1, date2 in stays:
+            try:
+                booking_num = hotel.make_reservation("Guest", room_type, date1, date2)
+            except AssertionError:
+                continue
+            if method == 'get_receipt':
+                hotel.get_receipt([booking_num])
+            else:
+                if method == 'get_receipts_rebuilt':
+                    hotel.columns = None
+                hotel.get_receipts([booking_num])
+        results[method] = time.perf_counter() - start
+
+    return results
+
+
+
+def measure_memory(backend, num_rooms = 200, num_years = 10, num_reservations = 20000,
+                   seed = 0):
+    """ (class,int,int,int,int) -> dict
+    Measures with tracemalloc the bytes taken by each room set up for every month of\
+    num_years years with the given availability backend, and by each reservation made\
+    in those rooms, stays following each other in every room.
+
+    >>> memory = measure_memory(availability.PackedAvailability, 2, 1, 10)
+    >>> memory['room'] < 5000, memory['reservations']
+    (True, 10)
+    """
+    rng = random.Random(seed)
+    registry = Reservation.booking_numbers
+    Reservation.booking_numbers = []
+
+    tracemalloc.start()
+    try:
+        before_rooms = tracemalloc.get_traced_memory()[0]
+        rooms = []
+        for room_num in range(1, num_rooms + 1):
+            room = Room("Queen", room_num, 90.0, backend)
+            for year in range(2021, 2021 + num_years):
+                room.set_up_room_availability(MONTHS, year)
+            rooms.append(room)
+        before_reservations = tracemalloc.get_traced_memory()[0]
+
+        reservations = []
+        for room in rooms:
+            check_in = datetime.date(2021, 1, 1)
+            for i in range(num_reservations // num_rooms):
+                check_out = check_in + datetime.timedelta(rng.choices(STAY_LENGTHS, STAY_WEIGHTS)[0])
+                reservations.append(Reservation("Guest " + str(len(reservations)), room,
+                                                check_in, check_out))
+                check_in = check_out + datetime.timedelta(rng.randint(0, 3))
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+        Reservation.booking_numbers = registry
+
+    return {'backend': backend.__name__, 'rooms': num_rooms,
+            'reservations': len(reservations),
+            'room': (before_reservations - before_rooms) / num_rooms,
+            'reservation': (after - before_reservations) / max(len(reservations), 1)}
+
+
+
+def benchmark_scale(num_rooms, num_years, num_reservations, repeat = 3,
+                    operations_per_run = 200, seed = 0):
+    """ (int,int,int,int,int,int) -> dict
+    Times the core operations on a generated hotel of the given size. Returns a\
+    dictionary of the best time in seconds of each operation, per call for the\
+    operations done operations_per_run times, per call of the whole hotel or\
+    system for save_hotel, load_hotel and load_system.
+    """
+    first_year = 2021
+    Reservation.booking_numbers = []
+    hotel = generate_hotel_for_years("Benchmark Hotel", num_rooms, first_year, num_years,
+                                     num_reservations, seed)
+    rng = random.Random(seed + 1)
+    stays = random_stays(rng, first_year, num_years, operations_per_run)
+    rooms = [rng.choice(hotel.rooms) for stay in stays]
+    seconds = {}
+
+    #make the reservations that can be made, then cancel them to restore the hotel
+    made = []
+    def make_all():
+        for room_type, date1, date2 in stays:
+            try:
+                made.append(hotel.make_reservation("Benchmark Guest", room_type, date1, date2))
+            except AssertionError:
+                pass
+    def cancel_all():
+        for booking_num in made:
+            hotel.cancel_reservation(booking_num)
+        del made[:]
+
+    make_times = []
+    cancel_times = []
+    for i in range(repeat):
+        make_times.append(best_time(make_all, 1))
+        cancel_times.append(best_time(cancel_all, 1))
+    seconds['make_reservation'] = min(make_times) / len(stays)
+    seconds['cancel_reservation'] = min(cancel_times) / len(stays)
+
+    def check_all():
+        for room, (room_type, date1, date2) in zip(rooms, stays):
+            room.is_available(date1, date2)
+    def find_all():
+        for room_type, date1, date2 in stays:
+            Room.find_available_room(hotel.rooms, room_type, date1, date2)
+    seconds['is_available'] = best_time(check_all, repeat) / len(stays)
+    seconds['find_available_room'] = best_time(find_all, repeat) / len(stays)
+
+    #the files are written and read in a temporary folder
+    old_folder = os.getcwd()
+    registry = Reservation.booking_numbers
+    with tempfile.TemporaryDirectory() as folder:
+        os.chdir(folder)
+        try:
+            seconds['save_hotel'] = best_time(hotel.save_hotel, repeat)
+
+            def load_hotel():
+                Reservation.booking_numbers = []
+                Hotel.load_hotel(hotel.get_folder_name())
+            def load_system():
+                Reservation.booking_numbers = []
+                Booking.load_system()
+            seconds['load_hotel'] = best_time(load_hotel, repeat)
+            seconds['load_system'] = best_time(load_system, repeat)
+        finally:
+            os.chdir(old_folder)
+            Reservation.booking_numbers = registry
+
+    return seconds
+
+
+
+def run_benchmarks(scale_names = ('small', 'medium'), repeat = 3, operations_per_run = 200,
+                   scales = SCALES):
+    """ (tuple,int,int,dict) -> dict
+    Runs benchmark_scale for each of the named scales. Returns a dictionary which can\
+    be saved as JSON, with the size and the timings of each scale.
+
+    >>> results = run_benchmarks(['tiny'], 1, 5, {'tiny': (8, 1, 20)})
+    >>> results['scales']['tiny']['reservations']
+    20
+    >>> sorted(results['scales']['tiny']['seconds'])
+    ['cancel_reservation', 'find_available_room', 'is_available', 'load_hotel', 'load_system', 'make_reservation', 'save_hotel']
+    """
+    results = {'python': sys.version.split()[0], 'repeat': repeat,
+               'operations_per_run': operations_per_run, 'scales': {}}
+
+    for scale_name in scale_names:
+        num_rooms, num_years, num_reservations = scales[scale_name]
+        seconds = benchmark_scale(num_rooms, num_years, num_reservations, repeat,
+                                  operations_per_run)
+        results['scales'][scale_name] = {'rooms': num_rooms, 'years': num_years,
+                                         'reservations': num_reservations,
+                                         'seconds': seconds}
+
+    return results
+
+
+
+def compare_with_baseline(results, baseline, tolerance = 0.25):
+    """ (dict,dict,float) -> list
+    Returns the list of (scale, operation, baseline seconds, seconds) of the\
+    operations more than tolerance slower than in the baseline. Scales and\
+    operations missing from either side are not compared.
+
+    >>> baseline = {'scales': {'small': {'seconds': {'save_hotel': 0.10, 'load_hotel': 0.20}}}}
+    >>> results = {'scales': {'small': {'seconds': {'save_hotel': 0.15, 'load_hotel': 0.21}},                              'large': {'seconds': {'save_hotel': 9.0}}}}
+    >>> compare_with_baseline(results, baseline)
+    [('small', 'save_hotel', 0.1, 0.15)]
+    >>> compare_with_baseline(results, baseline, 0.5)
+    []
+    """
+    regressions = []
+    for scale_name, scale in results['scales'].items():
+        if scale_name not in baseline['scales']:
+            continue
+        old_seconds = baseline['scales'][scale_name]['seconds']
+        for operation, seconds in sorted(scale['seconds'].items()):
+            if operation in old_seconds and seconds > old_seconds[operation] * (1 + tolerance):
+                regressions.append((scale_name, operation, old_seconds[operation], seconds))
+    return regressions
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Times the core of the booking system.")
+    parser.add_argument('--scales', nargs = '+', default = ['small', 'medium'],
+                        choices = sorted(SCALES))
+    parser.add_argument('--repeat', type = int, default = 3)
+    parser.add_argument('--operations', type = int, default = 200)
+    parser.add_argument('--output', help = "file to save the results in as JSON")
+    parser.add_argument('--baseline', help = "JSON results to compare with")
+    parser.add_argument('--tolerance', type = float, default = 0.25)
+    parser.add_argument('--month-export', action = 'store_true')
+    parser.add_argument('--memory', action = 'store_true',
+                        help = "report the bytes per room and per reservation")
+    parser.add_argument('--receipts', action = 'store_true',
+                        help = "time a receipt after each reservation made")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.scales, args.repeat, args.operations)
+
+    print("scale    operation                seconds")
+    for scale_name, scale in results['scales'].items():
+        for operation, seconds in sorted(scale['seconds'].items()):
+            print("%-8s %-20s %11.6f" % (scale_name, operation, seconds))
+
+    if args.output:
+        file_object = open(args.output, 'w')
+        json.dump(results, file_object, indent = 2, sort_keys = True)
+        file_object.close()
+
+    if args.month_export:
+        print("Month export (Hotel.save_reservations_for_month)")
+        print("reservations     rooms   seconds")
+        for result in benchmark_month_export():
+            print("%12d %9d %9.4f" % (result['reservations'], result['rooms'],
+                                      result['seconds']))
+
+    if args.memory:
+        print("Memory (200 rooms over 10 years, 20000 reservations)")
+        print("backend                bytes/room  bytes/reservation")
+        for backend in [availability.DictAvailability, availability.IntervalAvailability,
+                        availability.PackedAvailability, availability.SparseAvailability]:
+            memory = measure_memory(backend)
+            print("%-20s %12.0f %18.0f" % (memory['backend'], memory['room'],
+                                           memory['reservation']))
+
+    if args.receipts:
+        result = benchmark_interleaved_receipts()
+        print("Receipt after each reservation (%d reservations, %d made)" %
+              (result['reservations'], result['operations']))
+        for method in ['get_receipt', 'get_receipts', 'get_receipts_rebuilt']:
+            print("%-22s %9.4f" % (method, result[method]))
+
+    #exit with an error if an operation got slower than in the baseline
+    if args.baseline:
+        file_object = open(args.baseline, 'r')
+        baseline = json.load(file_object)
+        file_object.close()
+        regressions = compare_with_baseline(results, baseline, args.tolerance)
+        for scale_name, operation, old_seconds, seconds in regressions:
+            print("Slower: %s %s %.6f -> %.6f" % (scale_name, operation, old_seconds, seconds))
+        if regressions:
+            sys.exit(1)
@@ -0,0 +1,661 @@
+#This program simulates a booking system of hotels for storing hotels in binary files.
+import doctest, datetime, random, os, mmap, struct, shutil
+from room import Room, MONTHS
+from reservation import Reservation, BookingNumberRegistry
+from hotel import Hotel
+from availability import days_in_month, month_spans, AvailabilityView
+
+
+OCCUPANCY_FILE = "occupancy.bin"
+RESERVATIONS_FILE = "reservations.bin"
+
+#one byte per room per night
+NOT_SET_UP = 0
+FREE = 1
+BOOKED = 2
+
+#turns the bytes of the nights into 1 if booked and 0 if not
+BOOKED_BYTES = bytes([value == BOOKED for value in range(256)])
+
+#magic, version, first night(ordinal), number of nights, number of rooms
+OCCUPANCY_HEADER = struct.Struct("<4sHiiI")
+#magic, version, number of reservations
+RESERVATIONS_HEADER = struct.Struct("<4sHI")
+#booking number, room number, check-in and check-out(ordinals), name offset and length
+RESERVATION_RECORD = struct.Struct("<qiiiII")
+ROOM_NUMBER = struct.Struct("<i")
+
+
+def write_atomically(path, data):
+    """ (str,bytes) -> None
+    Writes the data to a temporary file, then renames it over the file at path.
+    """
+    file_object = open(path + ".tmp", "wb")
+    file_object.write(data)
+    file_object.close()
+    os.replace(path + ".tmp", path)
+
+
+
+def save_hotel_binary(hotel):
+    """ (Hotel) -> None
+    Saves hotel_info.txt, the occupancy file and the reservation table of the hotel\
+    in its folder of the hotels folder.
+
+    The occupancy file has a header, the room numbers, then for each room one byte per\
+    night from the first to the last night set up in any room(0 if the night is not\
+    set up, 1 if free, 2 if booked). The reservation table has a header, one fixed\
+    width record per reservation, then the names of the guests.
+    """
+    folder_path = "hotels/" + hotel.get_folder_name() + "/"
+    if not os.path.exists(folder_path):
+        os.makedirs(folder_path)
+    hotel.save_hotel_info_file()
+
+    #find the first and last night set up in any of the rooms
+    first_night = None
+    end_night = None
+    for room in hotel.rooms:
+        for year, month in room.availability:
+            first = datetime.date(year, month, 1).toordinal()
+            end = first + days_in_month(year, month)
+            if first_night == None or first < first_night:
+                first_night = first
+            if end_night == None or end > end_night:
+                end_night = end
+    if first_night == None:
+        first_night = end_night = 0
+    num_nights = end_night - first_night
+
+    #write the header, the room numbers and one row of nights per room
+    data = bytearray(OCCUPANCY_HEADER.pack(b"HOCC", 1, first_night, num_nights,
+                                           len(hotel.rooms)))
+    for room in hotel.rooms:
+        data += ROOM_NUMBER.pack(room.room_num)
+
+    for room in hotel.rooms:
+        if type(room.backend) == MappedAvailability:
+            #copy the row of a mapped room as it is
+            data += room.backend.read(first_night, end_night)
+            continue
+        row = bytearray(num_nights)
+        for (year, month), month_list in room.availability.items():
+            column = datetime.date(year, month, 1).toordinal() - first_night
+            days = list(month_list)[1:]
+            row[column:column + len(days)] = bytes([BOOKED if day == False else FREE
+                                                    for day in days])
+        data += row
+
+    write_atomically(folder_path + OCCUPANCY_FILE, bytes(data))
+
+    #write the reservation records followed by the names
+    reservations = list(hotel.reservations.values())
+    records = bytearray(RESERVATIONS_HEADER.pack(b"HRSV", 1, len(reservations)))
+    names = bytearray()
+    for rsv in reservations:
+        name = rsv.name.encode("utf-8")
+        records += RESERVATION_RECORD.pack(rsv.booking_number, rsv.room_reserved.room_num,
+                                           rsv.check_in.toordinal(), rsv.check_out.toordinal(),
+                                           len(names), len(name))
+        names += name
+
+    write_atomically(folder_path + RESERVATIONS_FILE, bytes(records + names))
+
+
+
+def load_reservation_table(folder_name):
+    """ (str) -> list
+    Returns the list of reservations in the reservation table of the folder, as tuples\
+    (booking number, name, room number, check-in date, check-out date).
+    """
+    file_object = open("hotels/" + folder_name + "/" + RESERVATIONS_FILE, "rb")
+    data = file_object.read()
+    file_object.close()
+
+    magic, version, count = RESERVATIONS_HEADER.unpack_from(data, 0)
+    if magic != b"HRSV":
+        raise AssertionError("The reservation table is invalid.")
+
+    names_offset = RESERVATIONS_HEADER.size + count * RESERVATION_RECORD.size
+    table = []
+    for i in range(count):
+        record = RESERVATION_RECORD.unpack_from(data, RESERVATIONS_HEADER.size +
+                                                i * RESERVATION_RECORD.size)
+        booking_num, room_num, check_in, check_out, name_start, name_length = record
+        name_start += names_offset
+        name = data[name_start:name_start + name_length].decode("utf-8")
+        table.append((booking_num, name, room_num, datetime.date.fromordinal(check_in),
+                      datetime.date.fromordinal(check_out)))
+
+    return table
+
+
+
+class MappedOccupancy:
+    """ Represents the occupancy file of a hotel read through mmap. Availability checks\
+    read the nights they need from the mapped file, so only the pages queried are loaded.
+
+    Instance attributes: first_night(int), num_nights(int), room_numbers(list),
+                         row_of_room(dict), rooms_by_type(dict), buffer(mmap) """
+
+    def __init__(self, folder_name):
+        """ (str) -> MappedOccupancy
+        Maps the occupancy file of the folder, reads the room types from hotel_info.txt.
+
+        >>> random.seed(987)
+        >>> Reservation.booking_numbers = []
+        >>> r1 = Room("Double", 237, 99.99)
+        >>> r2 = Room("Double", 238, 99.99)
+        >>> r1.set_up_room_availability(['Oct', 'Nov', 'Dec'], 2021)
+        >>> r2.set_up_room_availability(['Oct', 'Nov'], 2021)
+        >>> h = Hotel("Queen Elizabeth Hotel", [r1, r2], {})
+        >>> num = h.make_reservation("Jack", "Double", datetime.date(2021, 10, 30),\
+                                     datetime.date(2021, 12, 23))
+        >>> save_hotel_binary(h)
+        >>> occupancy = MappedOccupancy('queen_elizabeth_hotel')
+        >>> occupancy.num_nights, occupancy.room_numbers
+        (92, [237, 238])
+        >>> date1 = datetime.date(2021, 10, 29)
+        >>> occupancy.is_available(237, date1, datetime.date(2021, 10, 31))
+        False
+        >>> occupancy.is_available(238, date1, datetime.date(2021, 12, 1))
+        True
+        >>> occupancy.is_available(238, date1, datetime.date(2021, 12, 2))
+        False
+        >>> occupancy.find_available_room('Double', date1, datetime.date(2021, 10, 31))
+        238
+        >>> occupancy.close()
+        >>> shutil.rmtree('hotels/queen_elizabeth_hotel')
+        """
+        info_file = "hotels/" + folder_name + "/hotel_info.txt"
+        hotel_name, rooms = Hotel.load_hotel_info_file(info_file)
+        types_of_rooms = {}
+        for room in rooms:
+            types_of_rooms[room.room_num] = room.room_type
+
+        self.file_object = open("hotels/" + folder_name + "/" + OCCUPANCY_FILE, "rb")
+        self.buffer = mmap.mmap(self.file_object.fileno(), 0, access = mmap.ACCESS_READ)
+
+        magic, version, first_night, num_nights, num_rooms = \
+            OCCUPANCY_HEADER.unpack_from(self.buffer, 0)
+        if magic != b"HOCC":
+            raise AssertionError("The occupancy file is invalid.")
+
+        self.first_night = first_night
+        self.num_nights = num_nights
+        self.rows_offset = OCCUPANCY_HEADER.size + num_rooms * ROOM_NUMBER.size
+
+        #only the room numbers are read, the nights stay in the mapped file
+        self.room_numbers = []
+        self.row_of_room = {}
+        self.rooms_by_type = {}
+        for row in range(num_rooms):
+            room_num = ROOM_NUMBER.unpack_from(self.buffer, OCCUPANCY_HEADER.size +
+                                               row * ROOM_NUMBER.size)[0]
+            self.room_numbers.append(room_num)
+            self.row_of_room[room_num] = row
+            room_type = types_of_rooms.get(room_num)
+            self.rooms_by_type.setdefault(room_type, []).append(room_num)
+
+
+
+    def is_available(self, room_num, date1, date2):
+        """ (int,date,date) -> bool
+        Returns True if the room is free every night from date1(included) to date2\
+        (excluded).
+        """
+        if date1 >= date2:
+            raise AssertionError("The first date is not earlier than the second date")
+
+        row = self.row_of_room.get(room_num)
+        first = date1.toordinal() - self.first_night
+        end = date2.toordinal() - self.first_night
+        if row == None or first < 0 or end > self.num_nights:
+            return False
+
+        #count the free nights directly in the mapped file
+        offset = self.rows_offset + row * self.num_nights
+        return self.buffer[offset + first:offset + end].count(FREE) == end - first
+
+
+
+    def find_available_room(self, room_type, date1, date2):
+        """ (str,date,date) -> int
+        Returns the number of the first room of the given type which is free every\
+        night from date1(included) to date2(excluded), None if there is no such room.
+        """
+        for room_num in self.rooms_by_type.get(room_type, []):
+            if self.is_available(room_num, date1, date2):
+                return room_num
+        return None
+
+
+
+    def set_up_months(self, room_num):
+        """ (int) -> list
+        Returns the list of (year, month) set up for the room.
+        """
+        months = []
+        row = self.row_of_room[room_num]
+        offset = self.rows_offset + row * self.num_nights
+        if self.num_nights == 0:
+            return months
+
+        a_date = datetime.date.fromordinal(self.first_night)
+        year = a_date.year
+        month = a_date.month
+        first = 0
+        while first < self.num_nights:
+            end = first + days_in_month(year, month)
+            if self.buffer[offset + first:offset + end].count(NOT_SET_UP) != end - first:
+                months.append((year, month))
+            first = end
+            month += 1
+            if month == 13:
+                year += 1
+                month = 1
+
+        return months
+
+
+
+    def availability_of(self, room_num):
+        """ (int) -> MappedAvailability
+        Returns the availability of the room read from its row of the mapped file.
+        """
+        return MappedAvailability(self.buffer, self.rows_offset +
+                                  self.row_of_room[room_num] * self.num_nights,
+                                  self.first_night, self.num_nights)
+
+
+
+    def close(self):
+        """ (None) -> None
+        Unmaps and closes the occupancy file.
+        """
+        self.buffer.close()
+        self.file_object.close()
+
+
+
+class MappedAvailability:
+    """ Represents the availability of a room as its row of nights in the occupancy\
+    file read through mmap, one byte per night from first_night. Checks read the\
+    mapped file, so loading a hotel does not read or copy the nights of its rooms.\
+    The first change copies the row into a bytearray owned by the room(copy on\
+    write), which grows when a month outside the file is set up.
+
+    Instance attributes: buffer(mmap), offset(int), first_night(int), num_nights(int),
+                         row(bytearray)
+
+    >>> a = MappedAvailability()
+    >>> a.set_up_month(2021, 5)
+    >>> a.reserve_stay(datetime.date(2021, 5, 30), datetime.date(2021, 6, 1))
+    >>> a.set_up_month(2021, 4)
+    >>> a.month_keys(), a.num_nights
+    ([(2021, 4), (2021, 5)], 61)
+    >>> a.is_available(datetime.date(2021, 4, 25), datetime.date(2021, 5, 30))
+    True
+    >>> a.is_available(datetime.date(2021, 4, 25), datetime.date(2021, 5, 31))
+    False
+    >>> a.view()[(2021, 5)][29:]
+    [True, False, False]
+    """
+
+    __slots__ = ('buffer', 'offset', 'first_night', 'num_nights', 'row')
+
+    def __init__(self, buffer = None, offset = 0, first_night = 0, num_nights = 0):
+        self.buffer = buffer
+        self.offset = offset
+        self.first_night = first_night
+        self.num_nights = num_nights
+        self.row = None
+        if buffer is None:
+            self.row = bytearray(num_nights)
+
+
+    def __getstate__(self):
+        #a mapped file cannot be copied or pickled, the copy owns its row
+        return (self.first_night, bytes(self.read(self.first_night,
+                                                  self.first_night + self.num_nights)))
+
+
+    def __setstate__(self, state):
+        self.buffer = None
+        self.offset = 0
+        self.first_night = state[0]
+        self.row = bytearray(state[1])
+        self.num_nights = len(self.row)
+
+
+    def view(self):
+        """ (None) -> AvailabilityView
+        Returns a dictionary-like view of (year, month) -> [None, True, ...] of the room.
+        """
+        return AvailabilityView(self)
+
+
+    def read(self, first, end):
+        """ (int,int) -> bytes
+        Returns one byte per night from the ordinal first(included) to the ordinal\
+        end(excluded), NOT_SET_UP for the nights outside the row.
+        """
+        start = max(first, self.first_night)
+        stop = min(end, self.first_night + self.num_nights)
+        if start >= stop:
+            return bytes(end - first)
+
+        if self.row is None:
+            nights = self.buffer[self.offset + start - self.first_night:
+                                 self.offset + stop - self.first_night]
+        else:
+            nights = bytes(self.row[start - self.first_night:stop - self.first_night])
+        if start == first and stop == end:
+            return nights
+        return bytes(start - first) + nights + bytes(end - stop)
+
+
+    def write(self, first, end, value):
+        """ (int,int,int) -> None
+        Sets the byte of every night from the ordinal first(included) to the ordinal\
+        end(excluded) to value, copying the row from the mapped file first.
+        """
+        if self.row is None:
+            self.row = bytearray(self.buffer[self.offset:self.offset + self.num_nights])
+            self.buffer = None
+
+        #grow the row to cover the nights written
+        if self.num_nights == 0:
+            self.first_night = first
+        if first < self.first_night:
+            self.row[0:0] = bytes(self.first_night - first)
+            self.first_night = first
+        if end > self.first_night + len(self.row):
+            self.row += bytes(end - self.first_night - len(self.row))
+        self.num_nights = len(self.row)
+
+        self.row[first - self.first_night:end - self.first_night] = bytes([value]) * (end - first)
+
+
+    def night_of(self, a_date):
+        """ (date) -> int
+        Returns the byte of the given night, raises KeyError if its month has not been\
+        set up.
+        """
+        night = a_date.toordinal()
+        value = self.read(night, night + 1)[0]
+        if value == NOT_SET_UP:
+            raise KeyError((a_date.year, a_date.month))
+        return value
+
+
+    def has_month(self, key):
+        """ (tuple) -> bool
+        Returns True if the (year, month) has been set up.
+        """
+        night = datetime.date(key[0], key[1], 1).toordinal()
+        return self.read(night, night + 1)[0] != NOT_SET_UP
+
+
+    def month_keys(self):
+        """ (None) -> list
+        Returns the list of (year, month) which have been set up.
+        """
+        months = []
+        if self.num_nights == 0:
+            return months
+
+        a_date = datetime.date.fromordinal(self.first_night)
+        year = a_date.year
+        month = a_date.month
+        while datetime.date(year, month, 1).toordinal() < self.first_night + self.num_nights:
+            if self.has_month((year, month)):
+                months.append((year, month))
+            month += 1
+            if month == 13:
+                year += 1
+                month = 1
+
+        return months
+
+
+    def month_length(self, key):
+        """ (tuple) -> int
+        Returns the number of days of the (year, month), raises KeyError if it has not\
+        been set up.
+        """
+        if not self.has_month(key):
+            raise KeyError(key)
+        return days_in_month(key[0], key[1])
+
+
+    def month_array(self, key):
+        """ (tuple) -> bytes
+        Returns one byte per night of the (year, month), 1 if it is booked and 0 if not,\
+        raises KeyError if it has not been set up.
+
+        >>> a = MappedAvailability()
+        >>> a.set_up_month(2021, 5)
+        >>> a.reserve_stay(datetime.date(2021, 5, 2), datetime.date(2021, 5, 4))
+        >>> list(a.month_array((2021, 5))[:5])
+        [0, 1, 1, 0, 0]
+        """
+        first = datetime.date(key[0], key[1], 1).toordinal()
+        nights = self.read(first, first + days_in_month(key[0], key[1]))
+        if nights[0] == NOT_SET_UP:
+            raise KeyError(key)
+        return nights.translate(BOOKED_BYTES)
+
+
+    def set_up_month(self, year, month):
+        """ (int,int) -> None
+        Makes the room available every night of the given month.
+        """
+        first = datetime.date(year, month, 1).toordinal()
+        self.write(first, first + days_in_month(year, month), FREE)
+
+
+    def remove_month(self, year, month):
+        """ (int,int) -> None
+        Removes the given month from the availability of the room.
+        """
+        first = datetime.date(year, month, 1).toordinal()
+        self.write(first, first + days_in_month(year, month), NOT_SET_UP)
+
+
+    def is_booked(self, a_date):
+        """ (date) -> bool
+        Returns True if the given night is booked, raises KeyError if its month has\
+        not been set up.
+        """
+        return self.night_of(a_date) == BOOKED
+
+
+    def mark_booked(self, a_date):
+        """ (date) -> None
+        Marks the given night as booked, even if it is booked already.
+        """
+        self.night_of(a_date)
+        night = a_date.toordinal()
+        self.write(night, night + 1, BOOKED)
+
+
+    def reserve(self, reserve_date):
+        """ (date) -> None
+        Marks the given night as booked.
+        """
+        if self.is_booked(reserve_date):
+            raise AssertionError("The room is not available at the given date")
+        self.mark_booked(reserve_date)
+
+
+    def release(self, available_date):
+        """ (date) -> None
+        Marks the given night as available.
+        """
+        self.night_of(available_date)
+        night = available_date.toordinal()
+        self.write(night, night + 1, FREE)
+
+
+    def is_available(self, first_date, second_date):
+        """ (date,date) -> bool
+        Returns True if every night from the first date(included) to the second\
+        date(excluded) has been set up and is not booked.
+        """
+        first = first_date.toordinal()
+        end = second_date.toordinal()
+        return self.read(first, end).count(FREE) == end - first
+
+
+    def reserve_stay(self, first_date, second_date):
+        """ (date,date) -> None
+        Marks every night from the first date(included) to the second date(excluded)\
+        as booked.
+        """
+        if not self.is_available(first_date, second_date):
+            raise AssertionError("The room is not available at the given date")
+        self.write(first_date.toordinal(), second_date.toordinal(), BOOKED)
+
+
+    def release_stay(self, first_date, second_date):
+        """ (date,date) -> None
+        Marks every night from the first date(included) to the second date(excluded)\
+        as available. Months which have not been set up are skipped.
+        """
+        for year, month, first_day, end_day in month_spans(first_date, second_date):
+            if self.has_month((year, month)):
+                first = datetime.date(year, month, first_day).toordinal()
+                self.write(first, first + end_day - first_day, FREE)
+
+
+
+def load_hotel_binary(folder_name, backend = None):
+    """ (str) -> Hotel
+    Loads the hotel saved in binary files in folder_name, creates and returns an object\
+    of type Hotel with the loaded name, rooms and reservations. Reservations whose\
+    booking number is already in use are skipped, as with the CSV files.
+
+    Without a backend, each room keeps a MappedAvailability on its row of the mapped\
+    occupancy file: the nights are not read or copied at load time, and the nights of\
+    the reservations are already booked in the file. The file stays mapped while a\
+    room reads from it. With a backend, the rows are copied into rooms of that backend.
+
+    >>> random.seed(987)
+    >>> Reservation.booking_numbers = []
+    >>> r1 = Room("Double", 237, 99.99)
+    >>> r1.set_up_room_availability(['Oct', 'Nov', 'Dec'], 2021)
+    >>> h = Hotel("Queen Elizabeth Hotel", [r1], {})
+    >>> num = h.make_reservation("Jack", "Double", datetime.date(2021, 10, 30),\
+                                 datetime.date(2021, 12, 23))
+    >>> save_hotel_binary(h)
+    >>> Reservation.booking_numbers = []
+    >>> hotel = load_hotel_binary('queen_elizabeth_hotel')
+    >>> print(hotel.reservations[1953400675629])
+    Booking number: 1953400675629
+    Name: Jack
+    Room reserved: Room 237,Double,99.99
+    Check-in date: 2021-10-30
+    Check-out date: 2021-12-23
+    >>> sorted(hotel.rooms[0].availability)
+    [(2021, 10), (2021, 11), (2021, 12)]
+    >>> type(hotel.rooms[0].backend).__name__, hotel.rooms[0].backend.row is None
+    ('MappedAvailability', True)
+    >>> hotel.cancel_reservation(1953400675629)
+    >>> hotel.rooms[0].is_available(datetime.date(2021, 10, 30), datetime.date(2021, 12, 23))
+    True
+    >>> hotel.rooms[0].backend.row is None
+    False
+
+    >>> from availability import IntervalAvailability
+    >>> Reservation.booking_numbers = []
+    >>> hotel = load_hotel_binary('queen_elizabeth_hotel', IntervalAvailability)
+    >>> hotel.rooms[0].is_available(datetime.date(2021, 10, 29), datetime.date(2021, 10, 31))
+    False
+    >>> shutil.rmtree('hotels/queen_elizabeth_hotel')
+    """
+    info_file = "hotels/" + folder_name + "/hotel_info.txt"
+    hotel_name, list_rooms = Hotel.load_hotel_info_file(info_file, backend)
+
+    occupancy = MappedOccupancy(folder_name)
+    rooms_by_num = {}
+    for room in list_rooms:
+        rooms_by_num[room.room_num] = room
+        if backend == None:
+            #read the nights of the room from the mapped file when they are needed
+            if room.room_num in occupancy.row_of_room:
+                room.backend = occupancy.availability_of(room.room_num)
+            else:
+                room.backend = MappedAvailability()
+        elif room.room_num in occupancy.row_of_room:
+            #set up the months of the room from its row of the occupancy file
+            for year, month in occupancy.set_up_months(room.room_num):
+                room.set_up_room_availability([MONTHS[month - 1]], year)
+    if backend != None:
+        occupancy.close()
+
+    hotel = Hotel(hotel_name, list_rooms, shared = True)
+
+    registry = Reservation.get_registry()
+    for booking_num, name, room_num, check_in, check_out in load_reservation_table(folder_name):
+        if booking_num in registry or room_num not in rooms_by_num:
+            continue
+        if backend == None:
+            registry.add(booking_num)
+            rsv = Reservation.restore(name, rooms_by_num[room_num], check_in, check_out,
+                                      booking_num, reserve = False)
+        else:
+            rsv = Reservation(name, rooms_by_num[room_num], check_in, check_out, booking_num)
+        hotel.reservations[booking_num] = rsv
+        hotel.add_to_indexes(rsv)
+
+    hotel.info_dirty = False
+    return hotel
+
+
+
+def convert_csv_to_binary(folder_name):
+    """ (str) -> None
+    Loads the hotel from the CSV files of the folder and saves it in binary files.
+    The booking numbers in use are left as they were.
+    """
+    registry = Reservation.booking_numbers
+    Reservation.booking_numbers = BookingNumberRegistry()
+    try:
+        save_hotel_binary(Hotel.load_hotel(folder_name))
+    finally:
+        Reservation.booking_numbers = registry
+
+
+
+def convert_binary_to_csv(folder_name):
+    """ (str) -> None
+    Loads the hotel from the binary files of the folder and saves it in CSV files.
+    The booking numbers in use are left as they were.
+
+    >>> random.seed(987)
+    >>> Reservation.booking_numbers = []
+    >>> r1 = Room("Double", 237, 99.99)
+    >>> r1.set_up_room_availability(['Oct', 'Nov', 'Dec'], 2021)
+    >>> h = Hotel("Queen Elizabeth Hotel", [r1], {})
+    >>> num = h.make_reservation("Jack", "Double", datetime.date(2021, 10, 30),\
+                                 datetime.date(2021, 12, 23))
+    >>> save_hotel_binary(h)
+    >>> convert_binary_to_csv('queen_elizabeth_hotel')
+    >>> fobj = open('hotels/queen_elizabeth_hotel/2021_Oct.csv', 'r')
+    >>> fobj.read()
+    '237,,,,,,,,,,,,,,,,,,,,,,,,,,,,,,1953400675629--Jack,1953400675629--Jack\\n'
+    >>> fobj.close()
+    >>> shutil.rmtree('hotels/queen_elizabeth_hotel')
+    """
+    registry = Reservation.booking_numbers
+    Reservation.booking_numbers = BookingNumberRegistry()
+    try:
+        load_hotel_binary(folder_name).save_hotel()
+    finally:
+        Reservation.booking_numbers = registry
+
+
+
+if __name__ == "__main__":
+    doctest.testmod()
@@ -1,26 +1,244 @@
 #This program simulates a booking system of hotels for the booking.
 #Ziwei Hu 260889365
-import doctest, datetime, random, matplotlib, os
+import doctest, datetime, random, os
+from concurrent.futures import ProcessPoolExecutor
+from room import Room
+from reservation import Reservation, BookingNumberRegistry
 from hotel import Hotel
 
 
+def load_hotel_data(folder_name, backend = None):
+    """ (str,class) -> Hotel
+    Loads the hotel in folder_name with its own booking number registry, as done by\
+    the worker processes of Booking.load_system. The rooms keep their availability in\
+    the given backend. The hotel goes back to the main process pickled, with the\
+    availability of its rooms, its reservations and its indexes already built.
+    """
+    Reservation.booking_numbers = BookingNumberRegistry()
+    return Hotel.load_hotel(folder_name, backend)
+
+
 class Booking:
     """ Represents a booking for the booking system.
 
-    Instance attribute: hotels(list)  """
+    Instance attributes: hotels(list), reservation_index(dict)  """
     
     def __init__(self, hotels):
         """ (list) -> Booking
-        Initializes an instance attribute of the same name(hotels) accordingly
+        Initializes an instance attribute of the same name(hotels) accordingly,
+        and indexes the reservations of all the hotels by booking number.
         """
         self.hotels = hotels
+        self.index_reservations()
+        
+        
+    def index_reservations(self):
+        """ (None) -> None
+        Rebuilds reservation_index, a dictionary where each key is a booking number\
+        and each value is a tuple of the hotel and the reservation. Reservations made\
+        or cancelled directly on a hotel are only seen after calling it again.
+        """
+        self.reservation_index = {}
+        for hotel in self.hotels:
+            for booking_num in hotel.reservations:
+                self.reservation_index[booking_num] = (hotel, hotel.reservations[booking_num])
+                
+                
+    def make_reservation(self, hotel, name, room_type, date1, date2):
+        """ (Hotel,str,str,date,date) -> int
+        Creates a reservation at the given hotel, returns its booking number.
+        
+        >>> random.seed(987)
+        >>> Reservation.booking_numbers = []
+        >>> r1 = Room("Queen", 105, 80.0)
+        >>> r1.set_up_room_availability(['May'], 2021)
+        >>> booking = Booking([Hotel("Secret Nugget Hotel", [r1])])
+        >>> date1 = datetime.date(2021, 5, 3)
+        >>> date2 = datetime.date(2021, 5, 10)
+        >>> booking.make_reservation(booking.hotels[0], "Mrs. Santos", "Queen", date1, date2)
+        1953400675629
+        >>> hotel, rsv = booking.get_reservation_for_booking_number(1953400675629)
+        >>> hotel.name, rsv.name
+        ('Secret Nugget Hotel', 'Mrs. Santos')
+        """
+        booking_num = hotel.make_reservation(name, room_type, date1, date2)
+        self.reservation_index[booking_num] = (hotel, hotel.reservations[booking_num])
+        return booking_num
+    
+    
+    def cancel_booking(self, booking_num):
+        """ (int) -> bool
+        Cancels the reservation with the booking number at whichever hotel it is,\
+        returns False if there is no such reservation.
+        
+        >>> random.seed(987)
+        >>> Reservation.booking_numbers = []
+        >>> r1 = Room("Queen", 105, 80.0)
+        >>> r1.set_up_room_availability(['May'], 2021)
+        >>> booking = Booking([Hotel("Secret Nugget Hotel", [r1])])
+        >>> date1 = datetime.date(2021, 5, 3)
+        >>> date2 = datetime.date(2021, 5, 10)
+        >>> num = booking.make_reservation(booking.hotels[0], "Jack", "Queen", date1, date2)
+        >>> booking.cancel_booking(num)
+        True
+        >>> booking.cancel_booking(num)
+        False
+        >>> len(booking.hotels[0].reservations)
+        0
+        """
+        found = self.get_reservation_for_booking_number(booking_num)
+        if found == None:
+            return False
+        
+        del self.reservation_index[booking_num]
+        found[0].cancel_reservation(booking_num)
+        return True
+    
+    
+    def get_reservation_for_booking_number(self, booking_num):
+        """ (int) -> tuple
+        Returns a tuple of the hotel and the reservation with the booking number,\
+        None if there is no such reservation.
+        """
+        found = self.reservation_index.get(booking_num)
+        if found == None:
+            return None
+        
+        #the reservation may have been cancelled directly on the hotel
+        if found[0].reservations.get(booking_num) is not found[1]:
+            del self.reservation_index[booking_num]
+            return None
+        
+        return found
+    
+    
+    def get_reservations_for_booking_numbers(self, booking_num_list):
+        """ (list) -> list
+        Returns a list with a tuple of the hotel and the reservation for each booking\
+        number in the list, None for the booking numbers without a reservation.
+        
+        >>> random.seed(987)
+        >>> Reservation.booking_numbers = []
+        >>> r1 = Room("Queen", 105, 80.0)
+        >>> r1.set_up_room_availability(['May'], 2021)
+        >>> booking = Booking([Hotel("Secret Nugget Hotel", [r1])])
+        >>> date1 = datetime.date(2021, 5, 3)
+        >>> date2 = datetime.date(2021, 5, 10)
+        >>> num = booking.make_reservation(booking.hotels[0], "Jack", "Queen", date1, date2)
+        >>> found = booking.get_reservations_for_booking_numbers([num, 123])
+        >>> found[0][1].name, found[1]
+        ('Jack', None)
+        """
+        found_list = []
+        for booking_num in booking_num_list:
+            found_list.append(self.get_reservation_for_booking_number(booking_num))
+        return found_list
+        
+        
+    def find_reservations(self, name = None, hotel_name = None, room_num = None,
+                          check_in = None, check_out = None):
+        """ (str,str,int,date,date) -> list
+        Returns a list with a tuple of the hotel and the reservation for each\
+        reservation matching the details given, at every hotel or only at the hotel\
+        with the given name.
+        
+        >>> random.seed(987)
+        >>> Reservation.booking_numbers = []
+        >>> r1 = Room("Queen", 105, 80.0)
+        >>> r1.set_up_room_availability(['May'], 2021)
+        >>> booking = Booking([Hotel("Secret Nugget Hotel", [r1])])
+        >>> date1 = datetime.date(2021, 5, 3)
+        >>> date2 = datetime.date(2021, 5, 10)
+        >>> num = booking.make_reservation(booking.hotels[0], "Jack", "Queen", date1, date2)
+        >>> [rsv.booking_number for hotel, rsv in booking.find_reservations("Jack")] == [num]
+        True
+        >>> booking.find_reservations("Jack", "Overlook Hotel")
+        []
+        """
+        found_list = []
+        for hotel in self.hotels:
+            if hotel_name == None or hotel.name == hotel_name:
+                for rsv in hotel.find_reservations(name, room_num, check_in, check_out):
+                    found_list.append((hotel, rsv))
+        return found_list
+        
+        
+    def search(self, room_type, date1, date2):
+        """ (str,date,date) -> list
+        Returns a list with a tuple (hotel, free rooms, lowest price) for each hotel\
+        having a room of the given type free every night from date1(included) to date2\
+        (excluded). The free night counts of the hotel rule it out without looking at its\
+        rooms when a night of the stay is booked in every room of the type. Otherwise the\
+        rooms are checked, so a hotel where each night has a free room but no single room\
+        is free all the nights is not listed. The free rooms are the rooms free all the\
+        nights, and the lowest price is the price of the stay in the cheapest of them.
         
+        >>> random.seed(987)
+        >>> Reservation.booking_numbers = []
+        >>> rooms1 = [Room("Queen", 101, 70.0), Room("Queen", 102, 80.0)]
+        >>> rooms2 = [Room("Queen", 201, 99.99), Room("Twin", 202, 55.0)]
+        >>> for r in rooms1 + rooms2:
+        ...     r.set_up_room_availability(['May'], 2021)
+        >>> booking = Booking([Hotel("Secret Nugget Hotel", rooms1), Hotel("Overlook Hotel", rooms2)])
+        >>> date1 = datetime.date(2021, 5, 3)
+        >>> date2 = datetime.date(2021, 5, 5)
+        >>> for hotel, free_rooms, price in booking.search('Queen', date1, date2):
+        ...     print(hotel.name, free_rooms, price)
+        Secret Nugget Hotel 2 140.0
+        Overlook Hotel 1 199.98
+        >>> num = booking.make_reservation(booking.hotels[1], "Jack", "Queen", date1,\
+                                           datetime.date(2021, 5, 4))
+        >>> [(hotel.name, free_rooms) for hotel, free_rooms, price in booking.search('Queen', date1, date2)]
+        [('Secret Nugget Hotel', 2)]
+        >>> booking.search('King', date1, date2)
+        []
         
+        >>> num = booking.make_reservation(booking.hotels[0], "Jill", "Queen", date1,\
+                                           datetime.date(2021, 5, 4))
+        >>> [(hotel.name, free_rooms, price) for hotel, free_rooms, price in booking.search('Queen', date1, date2)]
+        [('Secret Nugget Hotel', 1, 160.0)]
+        >>> num1 = booking.make_reservation(booking.hotels[0], "Jim", "Queen",\
+                                            datetime.date(2021, 5, 4), date2)
+        >>> num2 = booking.make_reservation(booking.hotels[0], "Jane", "Queen",\
+                                            datetime.date(2021, 5, 4), date2)
+        >>> booking.cancel_booking(num1)
+        True
+        >>> booking.hotels[0].get_free_counts('Queen', date1, date2)
+        [1, 1]
+        >>> booking.search('Queen', date1, date2)
+        []
+        """
+        #raise an AssertionError if date1 is not earlier than date2
+        if date1 >= date2:
+            raise AssertionError("The check in date does not happen to be earlier than "+
+                                  "the check out date.")
+        
+        found = []
+        for hotel in self.hotels:
+            #skip the hotel if a night of the stay is booked in every room of the type
+            if min(hotel.get_free_counts(room_type, date1, date2)) <= 0:
+                continue
+            
+            free_rooms = hotel.find_available_rooms(room_type, date1, date2)
+            if len(free_rooms) == 0:
+                continue
+            
+            lowest_price = min([room.price for room in free_rooms])
+            found.append((hotel, len(free_rooms), round(lowest_price * (date2 - date1).days, 2)))
+            
+        return found
+    
+    
     @classmethod
-    def load_system(cls):
-        """ (None) -> Booking
+    def load_system(cls, workers = 1, store = None, backend = None, date1 = None, date2 = None):
+        """ (int,SQLiteStore,class,date,date) -> Booking
         Loads in all the hotels in the hotels folder and creates,
         and returns an object of type Booking with said list of hotels.
+        With more than one worker, the hotels are loaded in parallel processes
+        and their booking numbers are merged at the end. If a store(such as a
+        SQLiteStore) is given, the hotels are loaded from it instead of the folders,
+        for the nights from date1 to date2 only if they are given(see
+        SQLiteStore.load_hotel). The rooms keep their availability in the given backend.
         
         >>> system = Booking.load_system()
         >>> len(system.hotels)
@@ -29,24 +247,86 @@ class Booking:
         'The Great Northern Hotel'
         >>> print(system.hotels[0].rooms[314])
         Room 315,Queen,129.99
+        
+        >>> Reservation.booking_numbers = []
+        >>> parallel_system = Booking.load_system(workers = 2)
+        >>> [h.name for h in parallel_system.hotels] == [h.name for h in system.hotels]
+        True
+        >>> print(parallel_system.hotels[0].rooms[314])
+        Room 315,Queen,129.99
+        >>> Booking.load_system(workers = 2)
+        Traceback (most recent call last):
+        AssertionError: The booking number is used by more than one hotel.
+        
+        >>> from availability import IntervalAvailability
+        >>> Reservation.booking_numbers = []
+        >>> interval_system = Booking.load_system(workers = 2, backend = IntervalAvailability)
+        >>> hotel, rsv = interval_system.get_reservation_for_booking_number(9998701091820)
+        >>> type(rsv.room_reserved.backend).__name__, rsv.room_reserved is hotel.rooms[236]
+        ('IntervalAvailability', True)
+        >>> old_rsv = system.get_reservation_for_booking_number(9998701091820)[1]
+        >>> rsv.room_reserved.availability == old_rsv.room_reserved.availability
+        True
+
+        >>> from sqlite_store import SQLiteStore, migrate_csv_to_sqlite
+        >>> store = SQLiteStore(':memory:')
+        >>> migrate_csv_to_sqlite(store, ['overlook_hotel']) > 0
+        True
+        >>> Reservation.booking_numbers = []
+        >>> windowed = Booking.load_system(store = store, date1 = datetime.date(1975, 11, 1),\
+                                           date2 = datetime.date(1975, 11, 2))
+        >>> sorted(windowed.hotels[0].rooms[236].availability)
+        [(1975, 10), (1975, 11), (1975, 12)]
         """
-        #get access to all the folders in the hotels folder
-        folder_list = os.listdir('hotels')
+        if store is not None:
+            return cls([store.load_hotel(folder, backend, date1, date2)
+                        for folder in store.hotel_folders()])
+        
+        #get access to all the folders in the hotels folder, skip .DS_Store folder for Mac
+        folder_list = []
+        for folder in os.listdir('hotels'):
+            if folder[0] != ".":
+                folder_list.append(folder)
+        
+        if workers > 1:
+            return cls(Booking.load_hotels_in_parallel(folder_list, workers, backend))
         
         #create a list to add Hotel object in
         hotels = []
         
         #iterate through each folder to load each hotel
         for folder in folder_list:
-            #skip .DS_Store folder for Mac
-            if folder[0] == ".":
-                continue
-            
             #generate a Hotel object for each folder
-            a_hotel = Hotel.load_hotel(folder)
+            a_hotel = Hotel.load_hotel(folder, backend)
             hotels.append(a_hotel)
             
         return cls(hotels)
+    
+    
+    
+    @staticmethod
+    def load_hotels_in_parallel(folder_list, workers, backend = None):
+        """ (list,int,class) -> list
+        Loads the hotels of the folders in a pool of worker processes, each building\
+        the rooms, reservations and indexes of its hotels, then registers all their\
+        booking numbers at once. Raises an AssertionError if a booking number is used\
+        by more than one hotel.
+        """
+        with ProcessPoolExecutor(max_workers = workers) as executor:
+            hotels = list(executor.map(load_hotel_data, folder_list,
+                                       [backend] * len(folder_list)))
+        
+        #check every booking number against the others and the ones already in use
+        registry = Reservation.get_registry()
+        new_numbers = set()
+        for a_hotel in hotels:
+            for booking_num in a_hotel.reservations:
+                if booking_num in new_numbers or booking_num in registry:
+                    raise AssertionError("The booking number is used by more than one hotel.")
+                new_numbers.add(booking_num)
+        registry.numbers.update(new_numbers)
+        
+        return hotels
         
     
     
@@ -161,7 +441,7 @@ class Booking:
         #make the reservation with the given information
         for i in range(len(self.hotels)):
             if hotel_chosen == i+1:
-                booking_num = self.hotels[i].make_reservation(user_name,type_chosen,check_in_date,check_out_date)
+                booking_num = self.make_reservation(self.hotels[i],user_name,type_chosen,check_in_date,check_out_date)
             
                
         #print out the booking number
@@ -195,17 +475,12 @@ class Booking:
         #prompts the user to enter a booking number
         booking_num = int(input("Please enter your booking number: "))
                           
-        #iterate through the hotels to check whether contain the booking number
-        cancel_times = 0
-        for i in range(len(self.hotels)):
-            if booking_num in self.hotels[i].reservations:
-                #cancel the reservation if be found
-                self.hotels[i].cancel_reservation(booking_num)
-                cancel_times += 1
-                print("Cancelled successfully.")
+        #cancel the reservation if be found in the index of all hotels
+        if self.cancel_booking(booking_num):
+            print("Cancelled successfully.")
         
         #display message if cannot be found
-        if cancel_times == 0:
+        else:
             print("Could not find a reservation with that booking number.")
         
     
@@ -264,23 +539,20 @@ class Booking:
                     booking_num_list.append(int(booking_num))
                 
                 
-            #iterate through each booking number entered to find such a reservation
-            for booking_number in booking_num_list:
-                found_times = 0
-                
-                #find the booking number in all hotels
-                for i in range(len(self.hotels)):
-                    if booking_number in self.hotels[i].reservations:
-                        found_times += 1
-                        total_amount = round(self.hotels[i].get_receipt([booking_number]),2)
-                        
-                        #prints the reservation to the screen
-                        print("Reservation found at hotel " + self.hotels[i].name + ":")
-                        print(self.hotels[i].reservations[booking_number])
-                        print("Total amount due: $" + str(total_amount))
-                        
-                if found_times == 0:
+            #find the reservations of all the booking numbers entered at once
+            found_list = self.get_reservations_for_booking_numbers(booking_num_list)
+            for found in found_list:
+                if found == None:
                     print("The booking number is invalid.")
+                    continue
+                
+                hotel, rsv = found
+                total_amount = round(hotel.get_receipt([rsv.booking_number]),2)
+                
+                #prints the reservation to the screen
+                print("Reservation found at hotel " + hotel.name + ":")
+                print(rsv)
+                print("Total amount due: $" + str(total_amount))
              
              
         #if they do not have their booking number         
@@ -306,34 +578,25 @@ class Booking:
             check_in_date = datetime.date(int(check_in[0]),int(check_in[1]),int(check_in[2]))
             check_out_date = datetime.date(int(check_out[0]),int(check_out[1]),int(check_out[2]))
             
-            found_times = 0
-            #iterate through each hotel to find such a reservation
-            for i in range(len(self.hotels)):
-                #get the hotel object of the same name as input
-                if hotel_name == self.hotels[i].name:
-                    
-                    #iterate through all booking number of the reservations
-                    for booking_number in self.hotels[i].reservations:
-                        #check each Reservation object of the booking_number
-                        if name_user == self.hotels[i].reservations[booking_number].name:
-                            if room_number == self.hotels[i].reservations[booking_number].room_reserved.room_num:
-                                if check_in_date == self.hotels[i].reservations[booking_number].check_in:
-                                    if check_out_date == self.hotels[i].reservations[booking_number].check_out:
-                                        found_times += 1
-                                        total_amount = round(self.hotels[i].get_receipt([booking_number]),2)
-                                        
-                                        #prints the reservation to the screen
-                                        print("Reservation found at hotel " + self.hotels[i].name + ":")
-                                        print(self.hotels[i].reservations[booking_number])
-                                        print("Total amount due: $" + str(total_amount))
-            if found_times == 0:
+            #find the reservations through the indexes of the hotel of the same name
+            found_list = self.find_reservations(name_user, hotel_name, room_number,
+                                                check_in_date, check_out_date)
+            for hotel, rsv in found_list:
+                total_amount = round(hotel.get_receipt([rsv.booking_number]),2)
+                
+                #prints the reservation to the screen
+                print("Reservation found at hotel " + hotel.name + ":")
+                print(rsv)
+                print("Total amount due: $" + str(total_amount))
+            if len(found_list) == 0:
                 print("The booking number is invalid.")
                     
             
             
     def delete_reservations_at_random(self):
         """ (None) -> None
-        Chooses a hotel at random and delete all of its reservations.
+        Chooses a hotel at random and delete all of its reservations. Each reservation\
+        is cancelled through the hotel, so its room is free again for search and booking.
         
         >>> random.seed(1338)
         >>> booking = Booking.load_system()
@@ -343,6 +606,24 @@ class Booking:
         0
         >>> len(booking.hotels[0].reservations)
         1
+        
+        >>> Reservation.booking_numbers = []
+        >>> room = Room("Queen", 105, 80.0)
+        >>> room.set_up_room_availability(['May'], 2021)
+        >>> small = Booking([Hotel("Secret Nugget Hotel", [room])])
+        >>> date1 = datetime.date(2021, 5, 3)
+        >>> date2 = datetime.date(2021, 5, 5)
+        >>> num = small.make_reservation(small.hotels[0], "Jack", "Queen", date1, date2)
+        >>> small.search('Queen', date1, date2)
+        []
+        >>> small.delete_reservations_at_random()
+        You said the magic word!
+        >>> room.is_available(date1, date2), num in Reservation.booking_numbers
+        (True, False)
+        >>> [(hotel.name, free_rooms) for hotel, free_rooms, price in small.search('Queen', date1, date2)]
+        [('Secret Nugget Hotel', 1)]
+        >>> small.find_reservations("Jack")
+        []
         """
         print("You said the magic word!")
         
@@ -350,8 +631,9 @@ class Booking:
         num_hotels = len(self.hotels)
         random_index = random.randint(0, num_hotels - 1)
         
-        #delete all of its reservation
-        self.hotels[random_index].reservations = {}
+        #delete all of its reservation, from the index of all hotels too
+        for booking_num in self.hotels[random_index].cancel_all_reservations():
+            self.reservation_index.pop(booking_num, None)
         
 
 
@@ -1,19 +1,712 @@
 #This program simulates a booking system of hotels for a hotel.
 #Ziwei Hu 260889365
-import doctest, datetime, random, copy, os, csv
+import doctest, datetime, random, copy, os, csv, heapq, threading, contextlib
 from room import Room, MONTHS, DAYS_PER_MONTH
 from reservation import Reservation
+from occupancy import OccupancyMatrix
+from availability import days_in_month
+from revenue import ReservationColumns
+from journal import Journal, JOURNAL_FILE
 
 
 class Hotel:
     """ Represents a hotel
 
-    Instance attributes: name(str), rooms(list), reservations(dict)"""
+    Instance attributes: name(str), rooms(list), reservations(dict), rooms_by_type(dict),
+                         booked_nights(dict), occupancy(OccupancyMatrix), lookup_index(dict),
+                         dirty_months(set), info_dirty(bool), state_lock, type_locks(dict),
+                         free_nights(dict), columns(ReservationColumns), columns_added(dict),
+                         columns_removed(set), month_versions(dict), rooms_version(int),
+                         journal(Journal), loaded_nights(tuple)"""
     
-    def __init__(self, name, rooms = [], reservations = {}):
+    def __init__(self, name, rooms = None, reservations = None, shared = False):
+        """ (str,list,dict,bool) -> Hotel
+        Initializes a hotel with the given name, list of rooms and dictionary of\
+        reservations keyed by booking number. Unless shared, the hotel works on its own\
+        copy of the rooms and reservations, copied together so that each copied\
+        reservation is attached to the copy of its room. If shared, the hotel takes the\
+        given list and dictionary as they are, without copying anything.
+        
+        >>> random.seed(987)
+        >>> Reservation.booking_numbers = []
+        >>> r1 = Room("Queen", 105, 80.0)
+        >>> r1.set_up_room_availability(['May'], 2021)
+        >>> rsv = Reservation("Jack", r1, datetime.date(2021, 5, 3), datetime.date(2021, 5, 10))
+        >>> h = Hotel("Secret Nugget Hotel", [r1], {rsv.booking_number: rsv})
+        >>> h.rooms[0] is r1, h.reservations[rsv.booking_number].room_reserved is h.rooms[0]
+        (False, True)
+        >>> h = Hotel("Secret Nugget Hotel", [r1], {rsv.booking_number: rsv}, shared = True)
+        >>> h.rooms[0] is r1, h.reservations[rsv.booking_number] is rsv
+        (True, True)
+        """
+        if rooms is None:
+            rooms = []
+        if reservations is None:
+            reservations = {}
+        if not shared:
+            rooms, reservations = copy.deepcopy((rooms, reservations))
+        
         self.name = name
-        self.rooms = copy.deepcopy(rooms)
-        self.reservations = copy.deepcopy(reservations)
+        self.occupancy = None
+        self.free_nights = None
+        self.columns = None
+        self.month_versions = {}
+        self.rooms_version = 0
+        self.dirty_months = set()
+        self.state_lock = contextlib.nullcontext()
+        self.type_locks = None
+        self.journal = None
+        self.loaded_nights = None
+        self.reservations = reservations
+        self.rooms = rooms
+        
+        
+    @property
+    def rooms(self):
+        """ Returns the list of Room objects of the hotel. """
+        return self._rooms
+    
+    
+    @rooms.setter
+    def rooms(self, rooms):
+        self._rooms = rooms
+        self.info_dirty = True
+        self.index_rooms()
+        
+        
+    def index_rooms(self):
+        """ (None) -> None
+        Rebuilds rooms_by_type, a dictionary where each key is a room type and each value\
+        is the list of rooms of that type, and booked_nights, a dictionary where each key\
+        is a room type and each value is a dictionary from a day ordinal to the number of\
+        rooms of that type booked that night. The reservations are indexed again too.
+        
+        >>> r1 = Room("Queen", 105, 80.0)
+        >>> r2 = Room("Twin", 101, 55.0)
+        >>> r3 = Room("Queen", 107, 80.0)
+        >>> h = Hotel("Secret Nugget Hotel", [r1, r2])
+        >>> [str(room) for room in h.rooms_by_type['Queen']]
+        ['Room 105,Queen,80.0']
+        >>> h.add_room(r3)
+        >>> [str(room) for room in h.rooms_by_type['Queen']]
+        ['Room 105,Queen,80.0', 'Room 107,Queen,80.0']
+        """
+        self.rooms_by_type = {}
+        self.booked_nights = {}
+        self.lookup_index = {}
+        self.columns = None
+        self.columns_added = {}
+        self.columns_removed = set()
+        
+        #group the rooms by their type, keeping the order of the rooms list
+        for room in self._rooms:
+            if room.room_type not in self.rooms_by_type:
+                self.rooms_by_type[room.room_type] = []
+                self.booked_nights[room.room_type] = {}
+            self.rooms_by_type[room.room_type].append(room)
+        self.indexed_room_count = len(self._rooms)
+        
+        #the free night counts are counted again on the next search
+        self.free_nights = None
+        self.rooms_version += 1
+        
+        #the occupancy matrix needs one row per room, build it again
+        if self.occupancy is not None:
+            self.occupancy = OccupancyMatrix(self._rooms)
+        
+        #count the nights already booked and index the reservations of the hotel
+        for booking_num in self.reservations:
+            self.add_to_indexes(self.reservations[booking_num])
+            
+            
+    def add_room(self, room):
+        """ (Room) -> None
+        Adds the room to the hotel and to the room type index.
+        """
+        self._rooms.append(room)
+        self.info_dirty = True
+        if room.room_type not in self.rooms_by_type:
+            self.rooms_by_type[room.room_type] = []
+            self.booked_nights[room.room_type] = {}
+        self.rooms_by_type[room.room_type].append(room)
+        self.indexed_room_count = len(self._rooms)
+        self.free_nights = None
+        self.rooms_version += 1
+        
+        if self.occupancy is not None:
+            self.occupancy = OccupancyMatrix(self._rooms)
+        
+        
+    def mark_dirty(self, date1, date2):
+        """ (date,date) -> None
+        Adds the (year, month) of every night from date1(included) to date2(excluded)\
+        to dirty_months, the months to write on the next incremental save.
+        
+        >>> h = Hotel("Secret Nugget Hotel")
+        >>> h.mark_dirty(datetime.date(2021, 5, 30), datetime.date(2021, 7, 1))
+        >>> sorted(h.dirty_months)
+        [(2021, 5), (2021, 6)]
+        """
+        self.dirty_months.update(Hotel.months_of_stay(date1, date2))
+        
+        
+    @staticmethod
+    def months_of_stay(date1, date2):
+        """ (date,date) -> list
+        Returns the list of (year, month) of the nights from date1(included) to date2\
+        (excluded).
+        
+        >>> Hotel.months_of_stay(datetime.date(2021, 12, 30), datetime.date(2022, 1, 2))
+        [(2021, 12), (2022, 1)]
+        """
+        last_night = date2 - datetime.timedelta(days = 1)
+        year = date1.year
+        month = date1.month
+        
+        months = []
+        while (year, month) <= (last_night.year, last_night.month):
+            months.append((year, month))
+            month += 1
+            if month == 13:
+                year += 1
+                month = 1
+        return months
+                
+                
+    def enable_occupancy_matrix(self):
+        """ (None) -> None
+        Builds an occupancy matrix(rooms x nights) mirroring the availability of the\
+        rooms. Reservations made and cancelled through the hotel keep it up to date, and\
+        find_available_room uses it instead of checking the rooms one by one. Requires\
+        numpy. Call it again after setting up new months for the rooms.
+        
+        >>> random.seed(987)
+        >>> Reservation.booking_numbers = []
+        >>> rooms = [Room("Queen", num, 80.0) for num in range(101, 104)]
+        >>> for r in rooms:
+        ...     r.set_up_room_availability(['May'], 2021)
+        >>> h = Hotel("Secret Nugget Hotel", rooms)
+        >>> h.enable_occupancy_matrix()
+        >>> date1 = datetime.date(2021, 5, 3)
+        >>> date2 = datetime.date(2021, 5, 10)
+        >>> num1 = h.make_reservation("Mrs. Santos", "Queen", date1, date2)
+        >>> num2 = h.make_reservation("Jack", "Queen", date1, date2)
+        >>> h.occupancy.free_counts(date1, date2, 'Queen').tolist()
+        [1, 1, 1, 1, 1, 1, 1]
+        >>> h.cancel_reservation(num1)
+        >>> str(h.find_available_room('Queen', date1, date2))
+        'Room 101,Queen,80.0'
+        """
+        self.occupancy = OccupancyMatrix(self._rooms)
+        
+        
+    def enable_concurrency(self):
+        """ (None) -> None
+        Lets several threads make and cancel reservations of the hotel at the same time.
+        Reservations of rooms of the same type are made one at a time under the lock of\
+        that type, while the reservations dictionary and the indexes shared by all the\
+        types are updated under state_lock. Booking numbers are allocated under the lock\
+        of the registry, so no room is booked twice and no number is given twice. Rooms\
+        must not be added while threads are booking.
+        
+        >>> import sys, concurrent.futures
+        >>> random.seed(987)
+        >>> Reservation.booking_numbers = []
+        >>> rooms = [Room(["Queen", "Twin"][num % 2], num, 80.0) for num in range(101, 141)]
+        >>> for r in rooms:
+        ...     r.set_up_room_availability(['May', 'Jun'], 2021)
+        >>> h = Hotel("Secret Nugget Hotel", rooms)
+        >>> h.enable_concurrency()
+        >>> rng = random.Random(137)
+        >>> requests = []
+        >>> for i in range(2000):
+        ...     date1 = datetime.date(2021, 5, 1) + datetime.timedelta(days = rng.randint(0, 50))
+        ...     date2 = date1 + datetime.timedelta(days = rng.randint(1, 9))
+        ...     requests.append(("Guest " + str(i), rng.choice(["Queen", "Twin"]), date1, date2))
+        >>> def book(request):
+        ...     try:
+        ...         return h.make_reservation(*request)
+        ...     except AssertionError:
+        ...         return None
+        >>> def book_and_cancel(request):
+        ...     booking_num = book(request)
+        ...     if booking_num != None and booking_num % 3 == 0:
+        ...         h.cancel_reservation(booking_num)
+        ...         return None
+        ...     return booking_num
+        >>> switch_interval = sys.getswitchinterval()
+        >>> sys.setswitchinterval(0.00001)
+        >>> with concurrent.futures.ThreadPoolExecutor(16) as pool:
+        ...     booked = [num for num in pool.map(book_and_cancel, requests) if num != None]
+        >>> sys.setswitchinterval(switch_interval)
+        
+        Every booking number is unique, kept by the hotel and registered.
+        >>> sorted(booked) == sorted(h.reservations), len(booked) == len(set(booked))
+        (True, True)
+        >>> all(num in Reservation.booking_numbers for num in booked)
+        True
+        
+        No two reservations of a room overlap, and the rooms and indexes agree with them.
+        >>> nights = {}
+        >>> for rsv in h.reservations.values():
+        ...     for night in range(rsv.check_in.toordinal(), rsv.check_out.toordinal()):
+        ...         key = (rsv.room_reserved.room_num, night)
+        ...         nights[key] = nights.get(key, 0) + 1
+        >>> max(nights.values())
+        1
+        >>> booked_in_rooms = 0
+        >>> for r in h.rooms:
+        ...     for month_list in r.availability.values():
+        ...         booked_in_rooms += list(month_list).count(False)
+        >>> booked_in_rooms == len(nights)
+        True
+        >>> sum(sum(booked.values()) for booked in h.booked_nights.values()) == len(nights)
+        True
+        """
+        #turn a booking number list into a registry before the threads share it
+        Reservation.get_registry()
+        
+        self.type_locks = {}
+        for room_type in self.rooms_by_type:
+            self.type_locks[room_type] = threading.Lock()
+        self.state_lock = threading.Lock()
+        
+        
+    def enable_journal(self, batch_size = 1, interval = None):
+        """ (int,float) -> None
+        Appends a record to the journal of the hotel folder for every reservation made\
+        or cancelled from now on, so that Hotel.load_hotel gets them back even if the\
+        hotel is not saved again. The records are synced to the disk every batch_size\
+        records, or on the first record after interval seconds if an interval(above 0)\
+        is given. The CSV files should be up to date with the reservations made before,\
+        save the hotel first if not.
+        """
+        folder_path = 'hotels/' + self.get_folder_name()
+        if not os.path.exists(folder_path):
+            os.makedirs(folder_path)
+        self.journal = Journal(folder_path + '/' + JOURNAL_FILE, batch_size, interval)
+        
+        
+    def compact_journal(self):
+        """ (None) -> None
+        Writes the months changed since the last save to the CSV files, then empties\
+        the journal. No reservation can be made or cancelled meanwhile. A crash before\
+        the journal is emptied is harmless, its records are already in the CSV files\
+        and are skipped when replayed.
+        
+        >>> import shutil
+        >>> random.seed(987)
+        >>> Reservation.booking_numbers = []
+        >>> r1 = Room("Queen", 105, 80.0)
+        >>> r1.set_up_room_availability(['May'], 2021)
+        >>> h = Hotel("Queen Elizabeth Hotel", [r1])
+        >>> h.save_hotel()
+        >>> h.enable_journal()
+        >>> num = h.make_reservation("Jack", "Queen", datetime.date(2021, 5, 3),\
+                                     datetime.date(2021, 5, 6))
+        >>> os.path.getsize('hotels/queen_elizabeth_hotel/' + JOURNAL_FILE) > 0
+        True
+        >>> h.compact_journal()
+        >>> os.path.getsize('hotels/queen_elizabeth_hotel/' + JOURNAL_FILE)
+        0
+        >>> Reservation.booking_numbers = []
+        >>> list(Hotel.load_hotel('queen_elizabeth_hotel').reservations) == [num]
+        True
+        >>> h.journal.close()
+        >>> shutil.rmtree('hotels/queen_elizabeth_hotel')
+        """
+        with contextlib.ExitStack() as stack:
+            for room_type in sorted(self.rooms_by_type):
+                stack.enter_context(self.lock_for_type(room_type))
+            stack.enter_context(self.state_lock)
+            
+            self.save_hotel(incremental = True)
+            if self.journal is not None:
+                self.journal.clear()
+        
+        
+    def lock_for_type(self, room_type):
+        """ (str) -> lock
+        Returns the lock of the rooms of the given type, or a context manager which does\
+        nothing if the hotel is not in concurrent mode.
+        """
+        if self.type_locks is None:
+            return contextlib.nullcontext()
+        
+        if room_type not in self.type_locks:
+            with self.state_lock:
+                self.type_locks.setdefault(room_type, threading.Lock())
+        return self.type_locks[room_type]
+        
+        
+    def snapshot(self):
+        """ (None) -> Hotel
+        Returns a copy of the hotel which can be saved in another thread while this\
+        hotel keeps taking reservations. The copy takes over the months to save,\
+        dirty_months and info_dirty of this hotel are reset.
+        
+        Only the list of rooms and the dictionary of reservations are copied, so the\
+        copy costs one pass over the booking numbers and no room is copied: saving\
+        reads the numbers, types and prices of the rooms, which reservations do not\
+        change, and the reservations, which are never changed once made. The indexes\
+        of the copy are not built, it is only meant to be saved.
+        
+        >>> random.seed(987)
+        >>> Reservation.booking_numbers = []
+        >>> r1 = Room("Queen", 105, 80.0)
+        >>> r1.set_up_room_availability(['May'], 2021)
+        >>> h = Hotel("Secret Nugget Hotel", [r1])
+        >>> h.enable_concurrency()
+        >>> num = h.make_reservation("Jack", "Queen", datetime.date(2021, 5, 3),\
+                                     datetime.date(2021, 5, 10))
+        >>> copy_of_h = h.snapshot()
+        >>> sorted(copy_of_h.dirty_months), h.dirty_months
+        ([(2021, 5)], set())
+        >>> h.cancel_reservation(num)
+        >>> copy_of_h.reservations[num].room_reserved is copy_of_h.rooms[0]
+        True
+        >>> num in h.reservations, copy_of_h.rooms[0] is h.rooms[0]
+        (False, True)
+        """
+        #hold every lock so that no reservation is half made while copying
+        with contextlib.ExitStack() as stack:
+            for room_type in sorted(self.rooms_by_type):
+                stack.enter_context(self.lock_for_type(room_type))
+            stack.enter_context(self.state_lock)
+            
+            #the reservations keep the rooms of this hotel, which the copy lists too
+            a_hotel = Hotel(self.name, shared = True)
+            a_hotel._rooms = list(self._rooms)
+            a_hotel.reservations = dict(self.reservations)
+            a_hotel.dirty_months = self.dirty_months
+            a_hotel.info_dirty = self.info_dirty
+            a_hotel.loaded_nights = self.loaded_nights
+            
+            self.dirty_months = set()
+            self.info_dirty = False
+            
+        return a_hotel
+        
+        
+    def add_to_indexes(self, reservation):
+        """ (Reservation) -> None
+        Counts the nights of the reservation in booked_nights, marks them as booked\
+        in the occupancy matrix, adds the reservation to lookup_index and changes the\
+        version of its months. The reservation waits in columns_added until the next\
+        get_columns.
+        """
+        if self.columns is not None:
+            self.columns_added[reservation.booking_number] = reservation
+        
+        #the analytics of the months of the stay are computed again
+        for year_month in Hotel.months_of_stay(reservation.check_in, reservation.check_out):
+            self.month_versions[year_month] = self.month_versions.get(year_month, 0) + 1
+        
+        for key in Hotel.lookup_keys(reservation.name, reservation.room_reserved.room_num,
+                                     reservation.check_in, reservation.check_out):
+            if key not in self.lookup_index:
+                self.lookup_index[key] = set()
+            self.lookup_index[key].add(reservation.booking_number)
+            
+        if self.occupancy is not None:
+            self.occupancy.mark(reservation.room_reserved, reservation.check_in,
+                                reservation.check_out, False)
+        
+        booked = self.booked_nights.setdefault(reservation.room_reserved.room_type, {})
+        for night in range(reservation.check_in.toordinal(), reservation.check_out.toordinal()):
+            booked[night] = booked.get(night, 0) + 1
+            
+        if self.free_nights is not None:
+            free = self.free_nights.setdefault(reservation.room_reserved.room_type, {})
+            for night in range(reservation.check_in.toordinal(), reservation.check_out.toordinal()):
+                free[night] = free.get(night, 0) - 1
+            
+            
+    def remove_from_indexes(self, reservation):
+        """ (Reservation) -> None
+        Removes the nights of the reservation from booked_nights, marks them as free\
+        in the occupancy matrix, removes the reservation from lookup_index and changes\
+        the version of its months. The booking number waits in columns_removed until\
+        the next get_columns.
+        """
+        if self.columns is not None:
+            self.columns_added.pop(reservation.booking_number, None)
+            self.columns_removed.add(reservation.booking_number)
+        
+        #the analytics of the months of the stay are computed again
+        for year_month in Hotel.months_of_stay(reservation.check_in, reservation.check_out):
+            self.month_versions[year_month] = self.month_versions.get(year_month, 0) + 1
+        
+        for key in Hotel.lookup_keys(reservation.name, reservation.room_reserved.room_num,
+                                     reservation.check_in, reservation.check_out):
+            if key in self.lookup_index:
+                self.lookup_index[key].discard(reservation.booking_number)
+                if len(self.lookup_index[key]) == 0:
+                    del self.lookup_index[key]
+            
+        if self.occupancy is not None:
+            self.occupancy.mark(reservation.room_reserved, reservation.check_in,
+                                reservation.check_out, True)
+        
+        booked = self.booked_nights.get(reservation.room_reserved.room_type, {})
+        for night in range(reservation.check_in.toordinal(), reservation.check_out.toordinal()):
+            if booked.get(night, 0) > 1:
+                booked[night] -= 1
+            else:
+                booked.pop(night, None)
+                
+        if self.free_nights is not None:
+            free = self.free_nights.setdefault(reservation.room_reserved.room_type, {})
+            for night in range(reservation.check_in.toordinal(), reservation.check_out.toordinal()):
+                free[night] = free.get(night, 0) + 1
+                
+                
+    def count_free_nights(self):
+        """ (None) -> None
+        Builds free_nights, a dictionary where each key is a room type and each value\
+        is a dictionary from a day ordinal to the number of rooms of that type set up\
+        and not booked that night. Reservations made and cancelled through the hotel\
+        keep it up to date. It is built again after the rooms change, call it again\
+        after setting up new months for the rooms.
+        """
+        rooms_per_month = {}
+        for room in self._rooms:
+            months = rooms_per_month.setdefault(room.room_type, {})
+            for year, month in room.availability:
+                months[(year, month)] = months.get((year, month), 0) + 1
+        
+        #every night of a month starts with the rooms set up for it, minus the booked ones
+        free_nights = {}
+        for room_type in rooms_per_month:
+            free = {}
+            for (year, month), count in rooms_per_month[room_type].items():
+                first = datetime.date(year, month, 1).toordinal()
+                for night in range(first, first + days_in_month(year, month)):
+                    free[night] = count
+            for night, count in self.booked_nights.get(room_type, {}).items():
+                free[night] = free.get(night, 0) - count
+            free_nights[room_type] = free
+        
+        self.free_nights = free_nights
+        
+        
+    def get_free_counts(self, room_type, date1, date2):
+        """ (str,date,date) -> list
+        Returns the number of rooms of the given type which are free each night from\
+        date1(included) to date2(excluded), read from free_nights.
+        
+        >>> random.seed(987)
+        >>> Reservation.booking_numbers = []
+        >>> rooms = [Room("Queen", 101, 80.0), Room("Queen", 102, 90.0), Room("Twin", 103, 55.0)]
+        >>> for r in rooms:
+        ...     r.set_up_room_availability(['May'], 2021)
+        >>> h = Hotel("Secret Nugget Hotel", rooms)
+        >>> num = h.make_reservation("Jack", "Queen", datetime.date(2021, 5, 30),\
+                                     datetime.date(2021, 6, 1))
+        >>> h.get_free_counts('Queen', datetime.date(2021, 5, 29), datetime.date(2021, 6, 2))
+        [2, 1, 1, 0]
+        >>> num2 = h.make_reservation("Judy", "Queen", datetime.date(2021, 5, 29),\
+                                      datetime.date(2021, 5, 31))
+        >>> h.cancel_reservation(num)
+        >>> h.get_free_counts('Queen', datetime.date(2021, 5, 29), datetime.date(2021, 6, 2))
+        [1, 1, 2, 0]
+        >>> h.get_free_counts('King', datetime.date(2021, 5, 29), datetime.date(2021, 5, 30))
+        [0]
+        """
+        if self.free_nights is None or len(self._rooms) != self.indexed_room_count:
+            if len(self._rooms) != self.indexed_room_count:
+                self.index_rooms()
+            self.count_free_nights()
+        
+        free = self.free_nights.get(room_type, {})
+        return [free.get(night, 0) for night in range(date1.toordinal(), date2.toordinal())]
+        
+        
+    @staticmethod
+    def lookup_keys(name = None, room_num = None, check_in = None, check_out = None):
+        """ (str,int,date,date) -> list
+        Returns the keys of lookup_index for the given fields, leaving out the fields\
+        which are None. A room number with a check-in date also gives a combined key.
+        
+        >>> Hotel.lookup_keys('Jack', 237)
+        [('name', 'Jack'), ('room_num', 237)]
+        >>> Hotel.lookup_keys(room_num = 237, check_in = datetime.date(1975, 10, 30))
+        [('room_num', 237), ('check_in', datetime.date(1975, 10, 30)), ('room_num_check_in', 237, datetime.date(1975, 10, 30))]
+        """
+        keys = []
+        if name != None:
+            keys.append(('name', name))
+        if room_num != None:
+            keys.append(('room_num', room_num))
+        if check_in != None:
+            keys.append(('check_in', check_in))
+        if check_out != None:
+            keys.append(('check_out', check_out))
+        if room_num != None and check_in != None:
+            keys.append(('room_num_check_in', room_num, check_in))
+        return keys
+    
+    
+    def find_reservations(self, name = None, room_num = None, check_in = None, check_out = None):
+        """ (str,int,date,date) -> list
+        Returns the list of reservations matching every given field, sorted by booking\
+        number. Fields left as None match anything. Only the reservations under the\
+        smallest index entry of the given fields are checked.
+        
+        >>> random.seed(987)
+        >>> Reservation.booking_numbers = []
+        >>> r1 = Room("Queen", 105, 80.0)
+        >>> r2 = Room("Queen", 107, 80.0)
+        >>> r1.set_up_room_availability(['May'], 2021)
+        >>> r2.set_up_room_availability(['May'], 2021)
+        >>> h = Hotel("Secret Nugget Hotel", [r1, r2])
+        >>> date1 = datetime.date(2021, 5, 3)
+        >>> date2 = datetime.date(2021, 5, 10)
+        >>> num1 = h.make_reservation("Mrs. Santos", "Queen", date1, date2)
+        >>> num2 = h.make_reservation("Jack", "Queen", date1, date2)
+        >>> num3 = h.make_reservation("Jack", "Queen", date2, datetime.date(2021, 5, 12))
+        >>> [rsv.booking_number == num2 for rsv in h.find_reservations("Jack", 107, date1)]
+        [True]
+        >>> len(h.find_reservations(name = "Jack")), len(h.find_reservations(check_in = date1))
+        (2, 2)
+        >>> h.cancel_reservation(num2)
+        >>> len(h.find_reservations(room_num = 107, check_out = date2))
+        0
+        """
+        keys = Hotel.lookup_keys(name, room_num, check_in, check_out)
+        
+        #start from the smallest set of booking numbers among the given fields
+        if len(keys) == 0:
+            candidates = self.reservations
+        else:
+            candidates = None
+            for key in keys:
+                numbers = self.lookup_index.get(key, set())
+                if candidates == None or len(numbers) < len(candidates):
+                    candidates = numbers
+        
+        #check every field of the candidates, skipping the ones deleted from reservations
+        found = []
+        for booking_num in sorted(candidates):
+            rsv = self.reservations.get(booking_num)
+            if rsv == None:
+                continue
+            if name != None and rsv.name != name:
+                continue
+            if room_num != None and rsv.room_reserved.room_num != room_num:
+                continue
+            if check_in != None and rsv.check_in != check_in:
+                continue
+            if check_out != None and rsv.check_out != check_out:
+                continue
+            found.append(rsv)
+        
+        return found
+        
+        
+    def find_available_room(self, type_input, date1, date2):
+        """ (str,date,date) -> Room
+        Returns the first Room of the hotel of the given type which happens to be\
+        available for the specific dates. Returns None if no such room. Only the rooms\
+        of the given type are checked, and none of them if one of the nights is already\
+        booked in all of them.
+        
+        >>> random.seed(987)
+        >>> Reservation.booking_numbers = []
+        >>> r1 = Room("Queen", 105, 80.0)
+        >>> r2 = Room("Twin", 101, 55.0)
+        >>> r3 = Room("Queen", 107, 80.0)
+        >>> for r in [r1, r2, r3]:
+        ...     r.set_up_room_availability(['May'], 2021)
+        >>> h = Hotel("Secret Nugget Hotel", [r1, r2, r3])
+        >>> date1 = datetime.date(2021, 5, 3)
+        >>> date2 = datetime.date(2021, 5, 10)
+        >>> str(h.find_available_room('Queen', date1, date2))
+        'Room 105,Queen,80.0'
+        >>> num1 = h.make_reservation("Mrs. Santos", "Queen", date1, date2)
+        >>> str(h.find_available_room('Queen', date1, date2))
+        'Room 107,Queen,80.0'
+        >>> num2 = h.make_reservation("Jack", "Queen", datetime.date(2021, 5, 9), date2)
+        >>> print(h.find_available_room('Queen', date1, date2))
+        None
+        >>> print(h.find_available_room('King', date1, date2))
+        None
+        """
+        #raise an AssertionError if date1 is not earlier than date2
+        if date1 >= date2:
+            raise AssertionError("The check in date does not happen to be earlier than "+
+                                  "the check out date.")
+        
+        #rebuild the index if rooms were appended to the rooms list directly
+        if len(self._rooms) != self.indexed_room_count:
+            self.index_rooms()
+        
+        #the occupancy matrix answers with one vectorized check of the rooms of the type
+        if self.occupancy is not None:
+            return self.occupancy.first_free_room(type_input, date1, date2)
+        
+        rooms_of_type = self.rooms_by_type.get(type_input, [])
+        
+        #stop early if a night of the stay is booked in every room of the type
+        booked = self.booked_nights.get(type_input)
+        if booked:
+            for night in range(date1.toordinal(), date2.toordinal()):
+                if booked.get(night, 0) >= len(rooms_of_type):
+                    return None
+        
+        #iterate through the rooms of the given type only
+        for room in rooms_of_type:
+            if room.is_available(date1, date2):
+                return room
+        
+        return None
+        
+        
+    def find_available_rooms(self, type_input, date1, date2):
+        """ (str,date,date) -> list
+        Returns the list of every Room of the hotel of the given type which is available\
+        for the specific dates, in the order of the rooms list. As in find_available_room,\
+        none of the rooms is checked if one of the nights is already booked in all of them.
+        
+        >>> random.seed(987)
+        >>> Reservation.booking_numbers = []
+        >>> rooms = [Room("Queen", num, 80.0) for num in range(101, 104)]
+        >>> for r in rooms:
+        ...     r.set_up_room_availability(['May'], 2021)
+        >>> h = Hotel("Secret Nugget Hotel", rooms)
+        >>> date1 = datetime.date(2021, 5, 3)
+        >>> date2 = datetime.date(2021, 5, 10)
+        >>> num1 = h.make_reservation("Mrs. Santos", "Queen", datetime.date(2021, 5, 9), date2)
+        >>> [room.room_num for room in h.find_available_rooms('Queen', date1, date2)]
+        [102, 103]
+        >>> h.enable_occupancy_matrix()
+        >>> [room.room_num for room in h.find_available_rooms('Queen', date1, date2)]
+        [102, 103]
+        >>> h.find_available_rooms('King', date1, date2)
+        []
+        """
+        #raise an AssertionError if date1 is not earlier than date2
+        if date1 >= date2:
+            raise AssertionError("The check in date does not happen to be earlier than "+
+                                  "the check out date.")
+        
+        #rebuild the index if rooms were appended to the rooms list directly
+        if len(self._rooms) != self.indexed_room_count:
+            self.index_rooms()
+        
+        if self.occupancy is not None:
+            return self.occupancy.free_rooms(type_input, date1, date2)
+        
+        rooms_of_type = self.rooms_by_type.get(type_input, [])
+        
+        #stop early if a night of the stay is booked in every room of the type
+        booked = self.booked_nights.get(type_input)
+        if booked:
+            for night in range(date1.toordinal(), date2.toordinal()):
+                if booked.get(night, 0) >= len(rooms_of_type):
+                    return []
+        
+        return [room for room in rooms_of_type if room.is_available(date1, date2)]
         
         
     def make_reservation(self, name_person, type_room_desired, date1, date2):
@@ -37,22 +730,147 @@ class Hotel:
         Check-in date: 2021-05-03
         Check-out date: 2021-05-10
         """
-        #if a room of the specified type is available, creates a reservation 
-        if Room.find_available_room(self.rooms, type_room_desired, date1, date2) != None:
-            room = Room.find_available_room(self.rooms, type_room_desired, date1, date2)
+        #no other thread books a room of this type between the search and the booking
+        with self.lock_for_type(type_room_desired):
+            #if a room of the specified type is available, creates a reservation 
+            room = self.find_available_room(type_room_desired, date1, date2)
+            
+            #raise an AssertionError if no room of the given type is available
+            if room == None:
+                raise AssertionError("No room of the given type is available.")
+            
             a_reservation = Reservation(name_person, room, date1, date2)
-        
-        #raise an AssertionError if no room of the given type is available
-        else:
-            raise AssertionError("No room of the given type is available.")
-        
-        #updates the attribute storing all the hotel reservations
-        self.reservations[a_reservation.booking_number] = a_reservation
+            
+            #updates the attribute storing all the hotel reservations
+            with self.state_lock:
+                self.reservations[a_reservation.booking_number] = a_reservation
+                self.add_to_indexes(a_reservation)
+                self.mark_dirty(date1, date2)
+                if self.journal is not None:
+                    self.journal.record_make(a_reservation)
             
         return a_reservation.booking_number
     
     
     
+    def make_reservations(self, requests):
+        """ (iterable) -> list
+        Makes a reservation for each (name, room type, check-in date, check-out date)\
+        request. The requests are sorted by room type and dates and the rooms of each\
+        type are assigned in one sweep, keeping the rooms in a heap ordered by the\
+        check-out date of the last stay given to them in the batch. Returns a list with\
+        one (booking number, None) or (None, reason) tuple per request, in the order of\
+        the requests. A request which cannot be booked does not stop the others.
+        
+        >>> random.seed(987)
+        >>> Reservation.booking_numbers = []
+        >>> rooms = [Room("Queen", 105, 80.0), Room("Queen", 107, 80.0), Room("Twin", 101, 55.0)]
+        >>> for r in rooms:
+        ...     r.set_up_room_availability(['May'], 2021)
+        >>> h = Hotel("Secret Nugget Hotel", rooms)
+        >>> num = h.make_reservation("Jack", "Queen", datetime.date(2021, 5, 1),\
+                                     datetime.date(2021, 5, 4))
+        >>> results = h.make_reservations([\
+                ("Mrs. Santos", "Queen", datetime.date(2021, 5, 3), datetime.date(2021, 5, 8)),\
+                ("Judy", "Queen", datetime.date(2021, 5, 2), datetime.date(2021, 5, 5)),\
+                ("Dale", "Queen", datetime.date(2021, 5, 4), datetime.date(2021, 5, 6)),\
+                ("Audrey", "King", datetime.date(2021, 5, 4), datetime.date(2021, 5, 6)),\
+                ("Bobby", "Twin", datetime.date(2021, 5, 30), datetime.date(2021, 6, 2)),\
+                ("Shelly", "Twin", datetime.date(2021, 5, 9), datetime.date(2021, 5, 9))])
+        >>> for booking_num, reason in results:
+        ...     print(booking_num, reason)
+        None No room of the given type is available.
+        1296485824452 None
+        1830129182153 None
+        None No room of the given type is available.
+        None No room of the given type is available.
+        None The check in date does not happen to be earlier than the check out date.
+        >>> print(h.reservations[1296485824452].room_reserved)
+        Room 107,Queen,80.0
+        >>> print(h.reservations[1830129182153].room_reserved)
+        Room 105,Queen,80.0
+        """
+        results = []
+        requests_by_type = {}
+        
+        #check the dates of each request and group the valid ones by room type
+        for name, room_type, date1, date2 in requests:
+            if date1 >= date2:
+                results.append((None, "The check in date does not happen to be earlier "+
+                                      "than the check out date."))
+            else:
+                results.append(None)
+                requests_by_type.setdefault(room_type, []).append((date1, date2,
+                                                                   len(results) - 1, name))
+        
+        #rebuild the index if rooms were appended to the rooms list directly
+        if len(self._rooms) != self.indexed_room_count:
+            self.index_rooms()
+        
+        for room_type, stays in requests_by_type.items():
+            with self.lock_for_type(room_type):
+                self.assign_rooms(room_type, stays, results)
+                
+        return results
+    
+    
+    
+    def assign_rooms(self, room_type, stays, results):
+        """ (str,list,list) -> None
+        Books the (check-in date, check-out date, index, name) stays of make_reservations\
+        for the rooms of the given type, storing the (booking number, reason) of each\
+        stay at its index of results.
+        """
+        rooms_of_type = self.rooms_by_type.get(room_type, [])
+        booked = self.booked_nights.get(room_type, {})
+        stays.sort(key = lambda stay: stay[:3])
+        
+        #rooms busy in the batch are keyed by the check-out date of their last stay,
+        #the others are kept in the order of the rooms list
+        busy = []
+        ready = [(position, rooms_of_type[position]) for position in range(len(rooms_of_type))]
+        
+        for date1, date2, index, name in stays:
+            check_in = date1.toordinal()
+            while busy and busy[0][0] <= check_in:
+                end, position, room = heapq.heappop(busy)
+                heapq.heappush(ready, (position, room))
+        
+            #skip the search if a night of the stay is booked in every room of the type
+            full = len(ready) == 0
+            for night in range(check_in, date2.toordinal()):
+                if full or booked.get(night, 0) >= len(rooms_of_type):
+                    full = True
+                    break
+        
+            #take the first ready room which has no earlier booking on those nights
+            room = None
+            skipped = []
+            while not full and ready:
+                position, a_room = heapq.heappop(ready)
+                if a_room.is_available(date1, date2):
+                    room = a_room
+                    break
+                skipped.append((position, a_room))
+            for entry in skipped:
+                heapq.heappush(ready, entry)
+        
+            if room == None:
+                results[index] = (None, "No room of the given type is available.")
+                continue
+            heapq.heappush(busy, (date2.toordinal(), position, room))
+        
+            a_reservation = Reservation(name, room, date1, date2)
+            with self.state_lock:
+                self.reservations[a_reservation.booking_number] = a_reservation
+                self.add_to_indexes(a_reservation)
+                self.mark_dirty(date1, date2)
+                if self.journal is not None:
+                    self.journal.record_make(a_reservation)
+            results[index] = (a_reservation.booking_number, None)
+    
+    
+    
     def get_receipt(self, booking_num_list):
         """ (list) -> float
         Returns a float indicating the amount of money a user should pay for reservations.
@@ -99,6 +917,66 @@ class Hotel:
     
     
     
+    def get_columns(self):
+        """ (None) -> ReservationColumns
+        Returns the reservations of the hotel as parallel arrays of room prices,\
+        check-in and check-out ordinals. The arrays are built on the first call. After\
+        that, the reservations made and cancelled since the last call are applied in\
+        one batch, unless they outnumber the reservations in the arrays, which are then\
+        built again. Requires numpy.
+        
+        >>> random.seed(987)
+        >>> Reservation.booking_numbers = []
+        >>> r1 = Room("Queen", 105, 80.0)
+        >>> r1.set_up_room_availability(['May'], 2021)
+        >>> h = Hotel("Secret Nugget Hotel", [r1])
+        >>> num1 = h.make_reservation("Jack", "Queen", datetime.date(2021, 5, 3),\
+                                      datetime.date(2021, 5, 10))
+        >>> num2 = h.make_reservation("Judy", "Queen", datetime.date(2021, 5, 20),\
+                                      datetime.date(2021, 5, 22))
+        >>> columns = h.get_columns()
+        >>> num3 = h.make_reservation("Jill", "Queen", datetime.date(2021, 5, 10),\
+                                      datetime.date(2021, 5, 12))
+        >>> h.cancel_reservation(num1)
+        >>> len(h.columns_added), len(h.columns_removed)
+        (1, 1)
+        >>> h.get_columns() is columns, columns.booking_numbers.tolist() == sorted([num2, num3])
+        (True, True)
+        >>> h.columns_added, h.columns_removed
+        ({}, set())
+        """
+        with self.state_lock:
+            pending = len(self.columns_added) + len(self.columns_removed)
+            if self.columns is None or pending > len(self.columns.booking_numbers):
+                self.columns = ReservationColumns(self.reservations)
+            elif pending > 0:
+                self.columns.update(self.columns_added, self.columns_removed)
+            self.columns_added = {}
+            self.columns_removed = set()
+            return self.columns
+    
+    
+    
+    def get_receipts(self, booking_num_list):
+        """ (list) -> list
+        Returns the amount to pay for each booking number of the list, 0.0 for the\
+        booking numbers without a reservation at the hotel, computed over all the\
+        booking numbers at once. Requires numpy.
+        
+        >>> r1 = Room("Queen", 105, 80.0)
+        >>> r1.set_up_room_availability(['May', 'Jun'], 2021)
+        >>> h = Hotel("Secret Negget Hotel", [r1])
+        >>> num1 = h.make_reservation("Mrs. Santos", "Queen", datetime.date(2021, 5, 3),\
+                                      datetime.date(2021, 5, 10))
+        >>> num2 = h.make_reservation("Jack", "Queen", datetime.date(2021, 5, 30),\
+                                      datetime.date(2021, 6, 5))
+        >>> h.get_receipts([num1, 123, num2])
+        [560.0, 0.0, 480.0]
+        """
+        return self.get_columns().receipts(booking_num_list).tolist()
+    
+    
+    
     def get_reservation_for_booking_number(self, booking_num):
         """ (int) -> Reservation
         Returns the reservation object with the given booking number,
@@ -141,31 +1019,69 @@ class Hotel:
         >>> h.cancel_reservation(num1)
         >>> num1 in h.reservations
         False
+        >>> num1 in Reservation.booking_numbers
+        False
         >>> r1.availability[(2021, 5)][4]
         True
         """
         #returns the reservation object with the booking_num
         reservation_object = self.get_reservation_for_booking_number(booking_num)
         
+        #raise an AssertionError if there is no such reservation
+        if reservation_object == None:
+            raise AssertionError("The booking number cannot be found.")
+        
         #retrieves the check-in date and check-out date
         check_in_date = reservation_object.check_in
         check_out_date = reservation_object.check_out
         
-        #remove the reservation from reservations of the hotel
-        del self.reservations[booking_num]
-        
-        #gets the number of days for the reservation
-        diff = check_out_date - check_in_date
-        num_days = diff.days
-        one_day = datetime.timedelta(days = 1) 
-        
-        #make available for the room originally reserved
-        for date in range(num_days):
-            reservation_object.room_reserved.make_available(check_in_date)
-            check_in_date += one_day
-            
-            
+        with self.lock_for_type(reservation_object.room_reserved.room_type):
+            #remove the reservation from reservations of the hotel, free its booking number,
+            #unless another thread has cancelled it first
+            with self.state_lock:
+                if self.reservations.get(booking_num) is not reservation_object:
+                    raise AssertionError("The booking number cannot be found.")
+                del self.reservations[booking_num]
+                self.remove_from_indexes(reservation_object)
+                self.mark_dirty(check_in_date, check_out_date)
+                if self.journal is not None:
+                    self.journal.record_cancel(booking_num)
+            Reservation.get_registry().release(booking_num)
             
+            #make available for the room originally reserved
+            reservation_object.room_reserved.release_stay(check_in_date, check_out_date)
+
+
+
+    def cancel_all_reservations(self):
+        """ (None) -> list
+        Cancels every reservation of the hotel one by one through cancel_reservation,\
+        so that the rooms, the indexes, the booking numbers and the journal follow.\
+        Returns the list of the booking numbers cancelled.
+
+        >>> r1 = Room("Queen", 105, 80.0)
+        >>> r1.set_up_room_availability(['May'], 2021)
+        >>> h = Hotel("Secret Nugget Hotel", [r1])
+        >>> num1 = h.make_reservation("Mrs. Santos", "Queen", datetime.date(2021, 5, 3),\
+                                      datetime.date(2021, 5, 5))
+        >>> num2 = h.make_reservation("Mr. Santos", "Queen", datetime.date(2021, 5, 7),\
+                                      datetime.date(2021, 5, 9))
+        >>> h.cancel_all_reservations() == [num1, num2]
+        True
+        >>> len(h.reservations), h.find_reservations("Mrs. Santos")
+        (0, [])
+        >>> r1.is_available(datetime.date(2021, 5, 3), datetime.date(2021, 5, 9))
+        True
+        >>> min(h.get_free_counts("Queen", datetime.date(2021, 5, 1), datetime.date(2021, 5, 31)))
+        1
+        """
+        cancelled = list(self.reservations)
+        for booking_num in cancelled:
+            self.cancel_reservation(booking_num)
+        return cancelled
+
+
+
     def get_available_room_types(self):
         """ (None) -> list
         Returns a list of strings representing the room types available at the hotel.
@@ -182,24 +1098,20 @@ class Hotel:
         >>> types
         ['Queen', 'Twin']
         """
-        room_type_available = []
+        #rebuild the index if rooms were appended to the rooms list directly
+        if len(self._rooms) != self.indexed_room_count:
+            self.index_rooms()
         
         #generates a list of room type available at the hotel
-        for a_room in self.rooms:
-            if a_room.room_type not in room_type_available:
-                room_type_available.append(a_room.room_type)
-            else:
-                continue
-        
-        return room_type_available
+        return list(self.rooms_by_type)
         
         
     
     @staticmethod
-    def load_hotel_info_file(info_file):
+    def load_hotel_info_file(info_file, backend = None):
         """ (str) -> str,list
         Read in the file at that path and return a 2-tuple of the hotel's name and a\
-        list of Room objects.
+        list of Room objects. The rooms keep their availability in the given backend.
         
         >>> hotel_name,rooms = Hotel.load_hotel_info_file('hotels/overlook_hotel/hotel_info.txt')
         >>> hotel_name
@@ -229,7 +1141,7 @@ class Hotel:
                     element = element.strip()
                     
                 room_object = Room(room_element[1], int(room_element[0][5:]),\
-                                   float(room_element[2]))
+                                   float(room_element[2]), backend)
                 list_rooms.append(room_object)
             
             line_num += 1
@@ -239,6 +1151,23 @@ class Hotel:
                     
     
     
+    def get_folder_name(self):
+        """ (None) -> str
+        Returns the name of the folder of the hotel in the hotels folder.
+        
+        >>> Hotel("Queen Elizabeth Hotel").get_folder_name()
+        'queen_elizabeth_hotel'
+        """
+        folder_name = ""
+        for char in self.name:
+            if char == " ":
+                folder_name += "_"
+            else:
+                folder_name += char.lower()
+        return folder_name
+    
+    
+    
     def save_hotel_info_file(self):
         """ (None) -> None
         Saves the hotel's name and room information into a file hotel_info_txt.
@@ -253,36 +1182,37 @@ class Hotel:
         >>> fobj.close()
         """
         #generate the name of a folder for a hotel
-        hotel_name = self.name
-        folder_name = ""
-        for char in hotel_name:
-            if char == " ":
-                folder_name += "_"
-            else:
-                folder_name += char.lower()
+        folder_name = self.get_folder_name()
         
-        #open a new file to write the hotel's name and room information
-        file_object = open("hotels/" + folder_name + "/hotel_info.txt", "w")
+        #write to a temporary file first, then rename it over hotel_info.txt
+        path = "hotels/" + folder_name + "/hotel_info.txt"
+        file_object = open(path + ".tmp", "w")
         file_object.write(self.name + "\n")
         
         for element in self.rooms:
             file_object.write(str(element) + "\n")
         
         file_object.close()
+        os.replace(path + ".tmp", path)
         
         
     
     @staticmethod
-    def load_reservation_strings_for_month(folder_name, month, year):
-        """ (str,str,int) -> dict
+    def load_reservation_strings_for_month(folder_name, month, year, skip_empty = False):
+        """ (str,str,int,bool) -> dict
         Loads the CSV file named after the given month and year in the given folder name,
         returns a dictionary, each key is a room number, each value is a list of tuples.
+        If skip_empty is True, the days without a reservation are left out, and so are\
+        the rooms without any reservation in the month.
         
         >>> name,rooms = Hotel.load_hotel_info_file('hotels/overlook_hotel/hotel_info.txt')
         >>> h = Hotel(name, rooms, {})
         >>> rsvs = h.load_reservation_strings_for_month('overlook_hotel', 'Oct', 1975)
         >>> print(rsvs[237])
         [(1975, 'Oct', 1, ''), (1975, 'Oct', 2, ''), (1975, 'Oct', 3, ''), (1975, 'Oct', 4, ''), (1975, 'Oct', 5, ''), (1975, 'Oct', 6, ''), (1975, 'Oct', 7, ''), (1975, 'Oct', 8, ''), (1975, 'Oct', 9, ''), (1975, 'Oct', 10, ''), (1975, 'Oct', 11, ''), (1975, 'Oct', 12, ''), (1975, 'Oct', 13, ''), (1975, 'Oct', 14, ''), (1975, 'Oct', 15, ''), (1975, 'Oct', 16, ''), (1975, 'Oct', 17, ''), (1975, 'Oct', 18, ''), (1975, 'Oct', 19, ''), (1975, 'Oct', 20, ''), (1975, 'Oct', 21, ''), (1975, 'Oct', 22, ''), (1975, 'Oct', 23, ''), (1975, 'Oct', 24, ''), (1975, 'Oct', 25, ''), (1975, 'Oct', 26, ''), (1975, 'Oct', 27, ''), (1975, 'Oct', 28, ''), (1975, 'Oct', 29, ''), (1975, 'Oct', 30, '9998701091820--Jack'), (1975, 'Oct', 31, '9998701091820--Jack')]
+        >>> rsvs = h.load_reservation_strings_for_month('overlook_hotel', 'Oct', 1975, True)
+        >>> rsvs
+        {237: [(1975, 'Oct', 30, '9998701091820--Jack'), (1975, 'Oct', 31, '9998701091820--Jack')]}
         """
         #loads the csv file named after the given month and year in the given folder name
         filename = str(year) + "_" + month + ".csv"
@@ -295,6 +1225,9 @@ class Hotel:
         
         #read line by line, append the new item to the dictionary
         for r in range(len(content_list)):
+            #a room without any reservation in the month gives nothing to load
+            if skip_empty and not any(content_list[r][1:]):
+                continue
             
             rsv_list = []
             for c in range(len(content_list[r])):
@@ -302,7 +1235,8 @@ class Hotel:
                 if c == 0:
                     key = int(content_list[r][c])
                 elif content_list[r][c] == "":
-                    rsv_list.append((year, month, c, ""))
+                    if not skip_empty:
+                        rsv_list.append((year, month, c, ""))
                 else:
                     rsv_list.append((year, month, c, content_list[r][c]))
             
@@ -332,64 +1266,63 @@ class Hotel:
         >>> fobj.read()
         '237,,,,,,,,,,,,,,,,,,,,,,,,,,,,,,1953400675629--Jack,1953400675629--Jack\\n'
         >>> fobj.close()
+        
+        >>> date3 = datetime.date(2021, 10, 2)
+        >>> date4 = datetime.date(2021, 10, 4)
+        >>> h.make_reservation("Jill", "Double", date3, date4)
+        1296485824452
+        >>> h.save_reservations_for_month('Oct', 2021)
+        >>> fobj = open('hotels/queen_elizabeth_hotel/2021_Oct.csv', 'r')
+        >>> fobj.read()
+        '237,,1296485824452--Jill,1296485824452--Jill,,,,,,,,,,,,,,,,,,,,,,,,,,,1953400675629--Jack,1953400675629--Jack\\n'
+        >>> fobj.close()
         """
         #generate the folder name in hotels folder
-        hotel_name = self.name
-        folder_name = ""
-        for char in hotel_name:
-            if char == " ":
-                folder_name += "_"
-            else:
-                folder_name += char.lower()
+        folder_name = self.get_folder_name()
                 
         #generate the filename
         filename = str(year) + "_" + month + ".csv"
         
-        #create a new csv file to write
-        file_object = open("hotels/" + folder_name + "/" + filename, "w")
+        #get the first night of the given month and the night after the last column
+        month_num = MONTHS.index(month) + 1
+        num_days = DAYS_PER_MONTH[month_num - 1]
+        first_night = datetime.date(year, month_num, 1).toordinal()
+        end_night = first_night + num_days
         
-        #get the first day of the given month for further looping
-        first_date = datetime.date(year, MONTHS.index(month) + 1, 1)
-        one_day = datetime.timedelta(days = 1) 
+        #project each reservation onto the day columns of its room, in a single pass
+        cells = {}
+        for rsv_obj in list(self.reservations.values()):
+            first = max(rsv_obj.check_in.toordinal(), first_night)
+            end = min(rsv_obj.check_out.toordinal(), end_night)
+            if first >= end:
+                continue
+            
+            room_number = rsv_obj.room_reserved.room_num
+            if room_number not in cells:
+                cells[room_number] = [''] * num_days
+            short_string = rsv_obj.to_short_string()
+            cells[room_number][first - first_night:end - first_night] = [short_string] * (end - first)
         
-        #iterate through rooms in the hotel
+        #write one row per room in the hotel, empty cells for the free days
+        #write to a temporary file first, then rename it over the CSV file
+        empty_row = [''] * num_days
+        path = "hotels/" + folder_name + "/" + filename
+        file_object = open(path + ".tmp", "w", newline = "")
+        writer = csv.writer(file_object, lineterminator = "\n")
         for room_obj in self.rooms:
-            room_number = room_obj.room_num
-            row = str(room_number) + ','
-            
-            #iterate through each day of the month to check its availability
-            for i in range(DAYS_PER_MONTH[MONTHS.index(month)]):
-                if not room_obj.is_available(first_date, first_date + one_day):
-                    
-                    #find the reservation object for this room at given date
-                    for booking_num in self.reservations:
-                        rsv_obj = self.reservations[booking_num]
-                        room_testing = rsv_obj.room_reserved
-                        room_num_testing = room_testing.room_num
-                        
-                        #if the two rooms are the same, generate the short string 
-                        if not room_testing.is_available(first_date, first_date + one_day):
-                            if room_num_testing == room_number:
-                                short_string = rsv_obj.to_short_string()
-                                row += short_string + ','
-                #if no reservation, add a comma for seperation                
-                else:
-                    row += ','
-                #increase the date by one day
-                first_date += one_day
-                
-            #write to the csv file for each room in the hotel
-            file_object.write(row[:-1] + "\n")
+            writer.writerow([room_obj.room_num] + cells.get(room_obj.room_num, empty_row))
         
         file_object.close()
+        os.replace(path + ".tmp", path)
         
     
     
-    def save_hotel(self):
-        """ (None) -> None
+    def save_hotel(self, incremental = False):
+        """ (bool) -> None
         Saves a file hotel_info.txt with the hotel's name and room information,
         CSV files containing the reservation data. If the folders do not exist, then
-        create them.
+        create them. If incremental, only the months changed by reservations since the
+        last save(and the files which do not exist yet) are written.
         
         >>> random.seed(987)
         >>> r1 = Room("Double", 237, 99.99)
@@ -411,22 +1344,44 @@ class Hotel:
         >>> fobj.read()
         '237,,,,,,,,,,,,,,,,,,,,,,,,,,,,,,1953400675629--Jack,1953400675629--Jack\\n'
         >>> fobj.close()
+        
+        >>> date3 = datetime.date(2021, 12, 25)
+        >>> date4 = datetime.date(2021, 12, 27)
+        >>> num = h.make_reservation("Jill", "Double", date3, date4)
+        >>> sorted(h.dirty_months)
+        [(2021, 12)]
+        >>> fobj = open('hotels/queen_elizabeth_hotel/2021_Oct.csv', 'w')
+        >>> fobj.write('untouched\\n')
+        10
+        >>> fobj.close()
+        >>> h.save_hotel(incremental = True)
+        >>> fobj = open('hotels/queen_elizabeth_hotel/2021_Oct.csv', 'r')
+        >>> fobj.read()
+        'untouched\\n'
+        >>> fobj.close()
+        >>> fobj = open('hotels/queen_elizabeth_hotel/2021_Dec.csv', 'r')
+        >>> fobj.read().count('--Jill')
+        2
+        >>> fobj.close()
+        >>> h.dirty_months
+        set()
         """
         #generate the folder name in hotels folder
-        hotel_name = self.name
-        folder_name = ""
-        for char in hotel_name:
-            if char == " ":
-                folder_name += "_"
-            else:
-                folder_name += char.lower()
+        folder_name = self.get_folder_name()
                 
         #check whether the folder exists, if not, create a folder
         if not os.path.exists('hotels/' + folder_name):
             os.makedirs('hotels/' + folder_name)
             
-        #save a file hotel_info.txt
-        self.save_hotel_info_file()
+        #save a file hotel_info.txt, unless saving incrementally and the rooms are unchanged
+        folder_path = 'hotels/' + folder_name + '/'
+        if not incremental or self.info_dirty or not os.path.exists(folder_path + 'hotel_info.txt'):
+            self.save_hotel_info_file()
+        self.info_dirty = False
+        
+        #take the dirty months, changes made from now on go to a new set
+        dirty_months = self.dirty_months
+        self.dirty_months = set()
         
         #if no rooms in a hotel, no CSV files should be created
         if len(self.rooms) == 0:
@@ -436,18 +1391,26 @@ class Hotel:
         availability_dict = self.rooms[0].availability
         
         #save CSV files one for each month in which there are rooms available
-        for year, month in availability_dict:
+        for year, month in list(availability_dict):
+            filename = str(year) + "_" + MONTHS[month - 1] + ".csv"
+            if incremental and (year, month) not in dirty_months and \
+               os.path.exists(folder_path + filename):
+                continue
             self.save_reservations_for_month(MONTHS[month - 1], year)
         
         
         
     @classmethod
-    def load_hotel(cls, folder_name):
+    def load_hotel(cls, folder_name, backend = None, store = None):
         """ (str) -> Hotel
         Loads the hotel info file and reservation CSV files from folder_name,
         creates and returns an object of type Hotel with the loaded name, rooms, and
-        reservation information. Creates Reservation objects first.
+        reservation information. Creates Reservation objects first. The rooms keep
+        their availability in the given backend(Room.AVAILABILITY_BACKEND by default).
+        If a store(such as a SQLiteStore) is given, the hotel is loaded from it instead
+        of the files.
         
+        >>> from availability import SparseAvailability
         >>> random.seed(137)
         >>> Reservation.booking_numbers = []
         >>> hotel = Hotel.load_hotel('overlook_hotel')
@@ -461,7 +1424,15 @@ class Hotel:
         Room reserved: Room 237,Twin,99.99
         Check-in date: 1975-10-30
         Check-out date: 1975-12-24
+        
+        >>> Reservation.booking_numbers = []
+        >>> sparse_hotel = Hotel.load_hotel('overlook_hotel', SparseAvailability)
+        >>> sparse_hotel.rooms[236].availability == hotel.rooms[236].availability
+        True
         """
+        if store is not None:
+            return store.load_hotel(folder_name, backend)
+        
         #get access to all the files in the given folder
         files_list = os.listdir('hotels/' + folder_name)
         
@@ -469,15 +1440,13 @@ class Hotel:
         for file in files_list:
             #if the file is the hotel_info.txt, load the hotel info
             if file[-3:] == 'txt':
-                hotel_name, list_rooms = Hotel.load_hotel_info_file('hotels/'+folder_name+'/'+file)
+                hotel_name, list_rooms = Hotel.load_hotel_info_file('hotels/'+folder_name+'/'+file,\
+                                                                    backend)
                 hotel_name.strip()
         
-        #create a Hotel object with empty reservations dictionary
+        #create a Hotel object with empty reservations dictionary, owning the loaded rooms
         reservations_hotel = {}
-        
-        hotel_obj = Hotel(hotel_name, list_rooms)
-        list_rooms = hotel_obj.rooms
-        reservations_hotel = hotel_obj.reservations
+        hotel_obj = Hotel(hotel_name, list_rooms, reservations_hotel, shared = True)
             
         #if the file is a CSV file, get all the month and year exist into months_list
         months_list = []
@@ -500,26 +1469,39 @@ class Hotel:
         rsv_dict = {}
         for month, year in months_list:
             #load the CSV file to get the rsv_dict for each month
-            rsv_dict_month = Hotel.load_reservation_strings_for_month(folder_name, month, year)
+            rsv_dict_month = Hotel.load_reservation_strings_for_month(folder_name, month, year,
+                                                                      True)
             
-            #iterate through the new dict created to check whether is in rsv_dict
+            #append the month to the reservation strings of each room
             for room_number in rsv_dict_month:
                 if room_number in rsv_dict:
-                    rsv_dict[room_number] = rsv_dict_month[room_number] + rsv_dict[room_number]
+                    rsv_dict[room_number].extend(rsv_dict_month[room_number])
                 else:
                     rsv_dict[room_number] = rsv_dict_month[room_number]
         
+        #find the room object of each room number through a dictionary
+        rooms_by_num = {}
+        for room_obj in list_rooms:
+            rooms_by_num[room_obj.room_num] = room_obj
         
-        #generate a dictionay that key is booking number, value is room object
         for room_num in rsv_dict:
-            for room_obj in list_rooms:
-                
-                if room_obj.room_num == room_num:
-                    #get a dictionary that key is a booking number and value is a reservation object
-                    rsv_obj_dict = Reservation.get_reservations_from_row(room_obj, rsv_dict[room_num])
+            if room_num not in rooms_by_num:
+                continue
+            
+            #get a dictionary that key is a booking number and value is a reservation object
+            rsv_obj_dict = Reservation.get_reservations_from_row(rooms_by_num[room_num],
+                                                                 rsv_dict[room_num])
+            
+            for booking_num in rsv_obj_dict:
+                reservations_hotel[booking_num] = rsv_obj_dict[booking_num] 
+                hotel_obj.add_to_indexes(rsv_obj_dict[booking_num])
+        
+        #apply the reservations made and cancelled since the CSV files were written
+        if JOURNAL_FILE in files_list:
+            Journal.replay(hotel_obj, 'hotels/' + folder_name + '/' + JOURNAL_FILE)
         
-                    for booking_num in rsv_obj_dict:
-                        reservations_hotel[booking_num] = rsv_obj_dict[booking_num] 
+        #the loaded hotel is the same as its files
+        hotel_obj.info_dirty = False
         
         return hotel_obj
         
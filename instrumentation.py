@@ -0,0 +1,417 @@
+#This program simulates a booking system of hotels for measuring where the time is spent.
+import doctest, datetime, random, os, time, json, math, threading, functools, shutil
+from room import Room
+from reservation import Reservation
+from hotel import Hotel
+from booking import Booking
+
+
+#the functions timed, as (class, name of the function)
+TARGETS = [(Room, 'is_available'), (Room, 'find_available_room'), (Reservation, '__init__'),
+           (Hotel, 'find_available_room'), (Hotel, 'make_reservation'),
+           (Hotel, 'cancel_reservation'), (Hotel, 'save_hotel'), (Hotel, 'load_hotel'),
+           (Booking, 'load_system')]
+
+#the functions whose files are counted in the bytes written by Hotel.save_hotel
+SAVE_TARGETS = [(Hotel, 'save_reservations_for_month'), (Hotel, 'save_hotel_info_file')]
+
+#the functions replaced, with the attribute they replaced, while instrumentation is on
+ORIGINALS = {}
+
+
+class Histogram:
+    """ Represents the distribution of the values recorded for a metric. Each value goes\
+    to a bucket whose bounds grow by BUCKET_GROWTH, so the percentiles are within about\
+    9% of the exact ones whatever the number of values.
+
+    Instance attributes: buckets(dict), count(int), total(float), minimum(float),
+                         maximum(float)
+    Class attribute: BUCKET_GROWTH
+
+    >>> histogram = Histogram()
+    >>> for value in range(1, 101):
+    ...     histogram.add(value)
+    >>> histogram.count, histogram.mean(), histogram.maximum
+    (100, 50.5, 100)
+    >>> 47 <= histogram.percentile(50) <= 55, 90 <= histogram.percentile(95) <= 100
+    (True, True)
+    >>> histogram.percentile(100)
+    100
+    """
+
+    BUCKET_GROWTH = 2 ** (1 / 8)
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.minimum = None
+        self.maximum = None
+
+
+
+    def add(self, value):
+        """ (float) -> None
+        Records the value.
+        """
+        #zero and negative values all go to the first bucket
+        if value > 0:
+            bucket = math.ceil(math.log(value, Histogram.BUCKET_GROWTH))
+        else:
+            bucket = None
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value
+        if self.minimum == None or value < self.minimum:
+            self.minimum = value
+        if self.maximum == None or value > self.maximum:
+            self.maximum = value
+
+
+
+    def mean(self):
+        """ (None) -> float
+        Returns the mean of the values, 0.0 if there is none.
+        """
+        if self.count == 0:
+            return 0.0
+        return self.total / self.count
+
+
+
+    def percentile(self, percent):
+        """ (float) -> float
+        Returns the upper bound of the bucket holding the value under which the given\
+        percent of the values are, kept between the smallest and largest value.
+        """
+        if self.count == 0:
+            return 0.0
+
+        #walk the buckets from the smallest until enough values are seen
+        wanted = math.ceil(self.count * percent / 100)
+        seen = 0
+        keys = sorted(self.buckets, key = lambda bucket: -math.inf if bucket == None else bucket)
+        for bucket in keys:
+            seen += self.buckets[bucket]
+            if seen >= wanted:
+                break
+        if bucket == None:
+            return self.minimum
+        return min(max(Histogram.BUCKET_GROWTH ** bucket, self.minimum), self.maximum)
+
+
+
+    def summary(self):
+        """ (None) -> dict
+        Returns a dictionary with the count, mean, p50, p95, p99 and maximum of the\
+        values.
+        """
+        return {'count': self.count, 'mean': self.mean(), 'p50': self.percentile(50),
+                'p95': self.percentile(95), 'p99': self.percentile(99),
+                'max': self.maximum if self.count else 0.0}
+
+
+
+class Stats:
+    """ Represents the metrics recorded by the instrumentation, one histogram per name.
+    The latencies are in seconds under the name of the function(such as\
+    'Hotel.make_reservation'), the rooms checked by a search under\
+    'Hotel.find_available_room.rooms_scanned' and the bytes written by a save under\
+    'Hotel.save_hotel.bytes_written'.
+
+    Instance attributes: histograms(dict), lock(threading.Lock), dump_thread,
+                         stop_event(threading.Event) """
+
+    def __init__(self):
+        self.histograms = {}
+        self.lock = threading.Lock()
+        self.dump_thread = None
+        self.stop_event = None
+
+
+
+    def record(self, name, value):
+        """ (str,float) -> None
+        Records the value in the histogram of the given name.
+        """
+        with self.lock:
+            if name not in self.histograms:
+                self.histograms[name] = Histogram()
+            self.histograms[name].add(value)
+
+
+
+    def get(self, name):
+        """ (str) -> dict
+        Returns the summary of the histogram of the given name, with a count of 0 if\
+        nothing has been recorded under it.
+        """
+        with self.lock:
+            return self.histograms.get(name, Histogram()).summary()
+
+
+
+    def count(self, name):
+        """ (str) -> int
+        Returns the number of values recorded under the given name.
+        """
+        return self.get(name)['count']
+
+
+
+    def summary(self):
+        """ (None) -> dict
+        Returns a dictionary from the name of each histogram to its summary.
+        """
+        with self.lock:
+            summaries = {}
+            for name in sorted(self.histograms):
+                summaries[name] = self.histograms[name].summary()
+            return summaries
+
+
+
+    def reset(self):
+        """ (None) -> None
+        Forgets every value recorded.
+        """
+        with self.lock:
+            self.histograms = {}
+
+
+
+    def report(self):
+        """ (None) -> str
+        Returns a table of the count and percentiles of each histogram, the latencies\
+        in milliseconds.
+        """
+        lines = ["%-42s %8s %10s %10s %10s %10s" % ("metric", "count", "p50", "p95", "p99",
+                                                   "max")]
+        for name, summary in self.summary().items():
+            scale = 1000
+            if name.endswith('.rooms_scanned') or name.endswith('.bytes_written'):
+                scale = 1
+            lines.append("%-42s %8d %10.3f %10.3f %10.3f %10.3f" % (name, summary['count'],
+                         summary['p50'] * scale, summary['p95'] * scale,
+                         summary['p99'] * scale, summary['max'] * scale))
+        return "\n".join(lines)
+
+
+
+    def dump(self, path):
+        """ (str) -> None
+        Writes the summaries as JSON to the file at path, with the time of the dump,\
+        through a temporary file so that a reader never sees half a dump.
+        """
+        data = {'time': datetime.datetime.now().isoformat(timespec = 'seconds'),
+                'metrics': self.summary()}
+        file_object = open(path + ".tmp", "w")
+        json.dump(data, file_object, indent = 2)
+        file_object.close()
+        os.replace(path + ".tmp", path)
+
+
+
+    def start_dumping(self, path, interval = 60.0):
+        """ (str,float) -> None
+        Dumps the summaries to the file at path every interval seconds, in a daemon\
+        thread, until stop_dumping is called.
+
+        >>> stats = Stats()
+        >>> stats.record('Hotel.make_reservation', 0.002)
+        >>> stats.start_dumping('stats_test.json', 0.01)
+        >>> time.sleep(0.1)
+        >>> stats.stop_dumping()
+        >>> file_object = open('stats_test.json')
+        >>> json.load(file_object)['metrics']['Hotel.make_reservation']['count']
+        1
+        >>> file_object.close()
+        >>> os.remove('stats_test.json')
+        """
+        self.stop_dumping()
+        self.stop_event = threading.Event()
+
+        def dump_until_stopped(stop_event):
+            while not stop_event.wait(interval):
+                self.dump(path)
+
+        self.dump_thread = threading.Thread(target = dump_until_stopped,
+                                            args = (self.stop_event,), daemon = True)
+        self.dump_thread.start()
+
+
+
+    def stop_dumping(self):
+        """ (None) -> None
+        Stops the periodic dump, if it is running.
+        """
+        if self.dump_thread is not None:
+            self.stop_event.set()
+            self.dump_thread.join()
+            self.dump_thread = None
+            self.stop_event = None
+
+
+
+#the rooms checked and the bytes written so far by the current thread
+counters = threading.local()
+
+#the stats the wrappers record into while instrumentation is on
+STATS = Stats()
+
+
+def get_counter(name):
+    """ (str) -> int
+    Returns the counter of the current thread with the given name, 0 at first.
+    """
+    return getattr(counters, name, 0)
+
+
+
+def add_to_counter(name, value):
+    """ (str,int) -> None
+    Adds the value to the counter of the current thread with the given name.
+    """
+    setattr(counters, name, getattr(counters, name, 0) + value)
+
+
+
+def timed(function, name, stats):
+    """ (function,str,Stats) -> function
+    Returns a function which calls the given one and records how long it took under\
+    the given name. The rooms checked by searches and the bytes written by saves are\
+    recorded too.
+    """
+    is_search = name.endswith('.find_available_room')
+    is_room_check = name == 'Room.is_available'
+    is_save = name == 'Hotel.save_hotel'
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if is_room_check:
+            add_to_counter('rooms_scanned', 1)
+        rooms_before = get_counter('rooms_scanned')
+        bytes_before = get_counter('bytes_written')
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            stats.record(name, time.perf_counter() - start)
+            if is_search:
+                stats.record(name + '.rooms_scanned', get_counter('rooms_scanned') - rooms_before)
+            if is_save:
+                stats.record(name + '.bytes_written', get_counter('bytes_written') - bytes_before)
+
+    return wrapper
+
+
+
+def counting_bytes(function, name):
+    """ (function,str) -> function
+    Returns a function which calls the given method of a hotel, then adds the size of\
+    the file it wrote to the bytes written by the current thread.
+    """
+    @functools.wraps(function)
+    def wrapper(hotel, *args, **kwargs):
+        result = function(hotel, *args, **kwargs)
+        folder_path = 'hotels/' + hotel.get_folder_name() + '/'
+        if name == 'save_hotel_info_file':
+            path = folder_path + 'hotel_info.txt'
+        else:
+            path = folder_path + str(args[1]) + "_" + args[0] + ".csv"
+        if os.path.exists(path):
+            add_to_counter('bytes_written', os.path.getsize(path))
+        return result
+
+    return wrapper
+
+
+
+def replace(a_class, function_name, make_wrapper):
+    """ (class,str,function) -> None
+    Replaces the function of the class by the wrapper made from it, keeping the\
+    function a static method or class method if it was one, and remembers the\
+    original.
+    """
+    original = a_class.__dict__[function_name]
+    ORIGINALS[(a_class, function_name)] = original
+    if isinstance(original, staticmethod):
+        setattr(a_class, function_name, staticmethod(make_wrapper(original.__func__)))
+    elif isinstance(original, classmethod):
+        setattr(a_class, function_name, classmethod(make_wrapper(original.__func__)))
+    else:
+        setattr(a_class, function_name, make_wrapper(original))
+
+
+
+def enable(stats = None):
+    """ (Stats) -> Stats
+    Turns the instrumentation on, recording into the given stats(STATS by default),\
+    and returns the stats. While it is off, the functions are the original ones and\
+    cost nothing more.
+
+    >>> random.seed(987)
+    >>> Reservation.booking_numbers = []
+    >>> rooms = [Room("Queen", 105, 80.0), Room("Queen", 107, 80.0)]
+    >>> for r in rooms:
+    ...     r.set_up_room_availability(['May'], 2021)
+    >>> h = Hotel("Queen Elizabeth Hotel", rooms)
+    >>> stats = enable(Stats())
+    >>> num1 = h.make_reservation("Jack", "Queen", datetime.date(2021, 5, 3),\
+                                  datetime.date(2021, 5, 10))
+    >>> num2 = h.make_reservation("Jill", "Queen", datetime.date(2021, 5, 5),\
+                                  datetime.date(2021, 5, 6))
+    >>> h.cancel_reservation(num1)
+    >>> h.save_hotel()
+    >>> disable()
+    >>> num3 = h.make_reservation("Judy", "Queen", datetime.date(2021, 5, 5),\
+                                  datetime.date(2021, 5, 6))
+    >>> stats.count('Hotel.make_reservation'), stats.count('Reservation.__init__')
+    (2, 2)
+    >>> stats.get('Hotel.find_available_room.rooms_scanned')['max']
+    2
+    >>> stats.get('Hotel.save_hotel.bytes_written')['max'] == \
+            os.path.getsize('hotels/queen_elizabeth_hotel/hotel_info.txt') + \
+            os.path.getsize('hotels/queen_elizabeth_hotel/2021_May.csv')
+    True
+    >>> stats.get('Hotel.make_reservation')['p99'] > 0
+    True
+    >>> shutil.rmtree('hotels/queen_elizabeth_hotel')
+    """
+    global STATS
+    if stats is None:
+        stats = STATS
+    disable()
+    STATS = stats
+
+    for a_class, function_name in TARGETS:
+        name = a_class.__name__ + '.' + function_name
+        replace(a_class, function_name,
+                lambda function, name = name: timed(function, name, stats))
+    for a_class, function_name in SAVE_TARGETS:
+        replace(a_class, function_name,
+                lambda function, name = function_name: counting_bytes(function, name))
+    return stats
+
+
+
+def disable():
+    """ (None) -> None
+    Puts the original functions back.
+    """
+    for (a_class, function_name), original in ORIGINALS.items():
+        setattr(a_class, function_name, original)
+    ORIGINALS.clear()
+
+
+
+def is_enabled():
+    """ (None) -> bool
+    Returns True if the instrumentation is on.
+    """
+    return len(ORIGINALS) > 0
+
+
+
+if __name__ == "__main__":
+    doctest.testmod()
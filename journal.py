@@ -0,0 +1,260 @@
+#This program simulates a booking system of hotels for the journal of the reservations.
+import doctest, datetime, os, threading, time, random, shutil
+from room import Room
+from reservation import Reservation
+
+
+JOURNAL_FILE = "journal.log"
+
+
+class Journal:
+    """ Represents the append-only journal of the reservations made and cancelled in a\
+    hotel since its CSV files were last written. Each record is one line, written to\
+    the file at once. The file is flushed and synced to the disk every batch_size\
+    records, or on the first record after interval seconds if an interval(above 0) is\
+    given, so a crash loses at most the records written since the last sync.
+
+    A record is 'M,booking number,room number,check-in,check-out,name' for a\
+    reservation made and 'C,booking number' for a reservation cancelled.
+
+    Instance attributes: path(str), batch_size(int), interval(float), file_object,
+                         pending(int), last_sync(float), lock(threading.Lock) """
+
+    def __init__(self, path, batch_size = 1, interval = None):
+        """ (str,int,float) -> Journal
+        Opens the journal file at the given path to append records to it, creating\
+        the file if it does not exist. Without an interval, or with an interval of 0,\
+        only batch_size decides when the file is synced.
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.interval = interval
+        self.file_object = open(path, 'a')
+        self.pending = 0
+        self.last_sync = time.monotonic()
+        self.lock = threading.Lock()
+
+
+
+    def append(self, record):
+        """ (str) -> None
+        Writes the record as a line of the journal, syncing the file if the batch is\
+        full or the interval has passed.
+
+        >>> journal = Journal('journal_test.log', batch_size = 3)
+        >>> journal.append("C,1953400675629")
+        >>> journal.append("C,4191471513010")
+        >>> journal.pending
+        2
+        >>> journal.append("C,1296485824452")
+        >>> journal.pending
+        0
+        >>> journal.close()
+        >>> os.remove('journal_test.log')
+        """
+        with self.lock:
+            self.file_object.write(record + "\n")
+            self.pending += 1
+            if self.pending >= self.batch_size or \
+               (self.interval != None and self.interval > 0 and
+                time.monotonic() - self.last_sync >= self.interval):
+                self.sync_file()
+
+
+
+    def sync_file(self):
+        """ (None) -> None
+        Flushes the records written and syncs the file to the disk. The lock must be\
+        held.
+        """
+        self.file_object.flush()
+        os.fsync(self.file_object.fileno())
+        self.pending = 0
+        self.last_sync = time.monotonic()
+
+
+
+    def sync(self):
+        """ (None) -> None
+        Syncs the records which are not on the disk yet.
+        """
+        with self.lock:
+            if self.pending > 0:
+                self.sync_file()
+
+
+
+    def record_make(self, reservation):
+        """ (Reservation) -> None
+        Appends the record of a reservation made.
+        """
+        self.append(",".join(["M", str(reservation.booking_number),
+                              str(reservation.room_reserved.room_num),
+                              reservation.check_in.isoformat(),
+                              reservation.check_out.isoformat(), reservation.name]))
+
+
+
+    def record_cancel(self, booking_num):
+        """ (int) -> None
+        Appends the record of a reservation cancelled.
+        """
+        self.append("C," + str(booking_num))
+
+
+
+    def clear(self):
+        """ (None) -> None
+        Empties the journal, once all its records are in the CSV files.
+        """
+        with self.lock:
+            self.file_object.truncate(0)
+            self.sync_file()
+
+
+
+    def close(self):
+        """ (None) -> None
+        Syncs and closes the journal file.
+        """
+        with self.lock:
+            self.sync_file()
+            self.file_object.close()
+
+
+
+    @staticmethod
+    def read_records(path):
+        """ (str) -> list
+        Returns the list of records of the journal file at the given path, as lists of\
+        strings. A last line without its end, left by a crash while writing it, is\
+        ignored.
+        """
+        file_object = open(path, 'r')
+        lines = file_object.read().split("\n")
+        file_object.close()
+
+        #the part after the last end of line is empty, or an unfinished record
+        records = []
+        for line in lines[:-1]:
+            if line[:2] == "M,":
+                records.append(line.split(",", 5))
+            elif line[:2] == "C,":
+                records.append(line.split(","))
+        return records
+
+
+
+    @staticmethod
+    def replay(hotel, path):
+        """ (Hotel,str) -> int,int
+        Applies the records of the journal file at the given path to the hotel loaded\
+        from the CSV files, returns the number of reservations added or removed and the\
+        number of reservations made which were skipped. Records already in the CSV\
+        files, written by a save made after them, are left out, so replaying a journal\
+        twice changes nothing. A reservation made is skipped if its room is not in the\
+        hotel, or if its nights or its booking number are taken by another reservation,\
+        so a journal which does not match the CSV files cannot stop the hotel from\
+        loading. The reservations added are made with Reservation, which registers their\
+        booking numbers. The months changed are marked dirty, to be written on the next\
+        save. The hotel must not have a journal of its own yet.
+
+        >>> random.seed(987)
+        >>> Reservation.booking_numbers = []
+        >>> from hotel import Hotel
+        >>> r1 = Room("Queen", 105, 80.0)
+        >>> r1.set_up_room_availability(['May'], 2021)
+        >>> h = Hotel("Queen Elizabeth Hotel", [r1])
+        >>> num1 = h.make_reservation("Jack", "Queen", datetime.date(2021, 5, 3),\
+                                      datetime.date(2021, 5, 6))
+        >>> h.save_hotel()
+        >>> h.enable_journal()
+        >>> num2 = h.make_reservation("Jill", "Queen", datetime.date(2021, 5, 10),\
+                                      datetime.date(2021, 5, 12))
+        >>> h.cancel_reservation(num1)
+        >>> num3 = h.make_reservation("Judy", "Queen", datetime.date(2021, 5, 4),\
+                                      datetime.date(2021, 5, 5))
+        >>> h.journal.close()
+
+        The CSV files only have the first reservation, the journal has the rest.
+        >>> Reservation.booking_numbers = []
+        >>> loaded = Hotel.load_hotel('queen_elizabeth_hotel')
+        >>> sorted(loaded.reservations) == sorted([num2, num3])
+        True
+        >>> print(loaded.reservations[num3].room_reserved, loaded.reservations[num3].name)
+        Room 105,Queen,80.0 Judy
+        >>> Journal.replay(loaded, 'hotels/queen_elizabeth_hotel/' + JOURNAL_FILE)
+        (0, 0)
+
+        A save which does not empty the journal does not change what is loaded.
+        >>> loaded.save_hotel()
+        >>> Reservation.booking_numbers = []
+        >>> sorted(Hotel.load_hotel('queen_elizabeth_hotel').reservations) == sorted([num2, num3])
+        True
+
+        Records of an unknown room, or clashing with the CSV files, are skipped.
+        >>> journal = Journal('hotels/queen_elizabeth_hotel/' + JOURNAL_FILE)
+        >>> journal.append("M,5555555555555,999,2021-05-20,2021-05-22,Jim")
+        >>> journal.append("M,6666666666666,105,2021-05-11,2021-05-13,Jane")
+        >>> journal.close()
+        >>> Reservation.booking_numbers = []
+        >>> loaded = Hotel.load_hotel('queen_elizabeth_hotel')
+        >>> sorted(loaded.reservations) == sorted([num2, num3])
+        True
+        >>> Journal.replay(loaded, 'hotels/queen_elizabeth_hotel/' + JOURNAL_FILE)
+        (0, 2)
+        >>> 6666666666666 in Reservation.booking_numbers
+        False
+        >>> shutil.rmtree('hotels/queen_elizabeth_hotel')
+        """
+        #a reservation cancelled is removed, even if saved in the CSV files since it was
+        #made, then the reservations made since their last cancellation are added
+        made = {}
+        cancelled = set()
+        for record in Journal.read_records(path):
+            booking_num = int(record[1])
+            if record[0] == "M":
+                made[booking_num] = record
+            else:
+                made.pop(booking_num, None)
+                cancelled.add(booking_num)
+
+        rooms_by_num = {}
+        for room in hotel.rooms:
+            rooms_by_num[room.room_num] = room
+
+        #cancel first, the nights they free may be booked by the reservations made
+        changes = 0
+        for booking_num in cancelled:
+            if booking_num in hotel.reservations:
+                hotel.cancel_reservation(booking_num)
+                changes += 1
+
+        skipped = 0
+        for booking_num, record in made.items():
+            if booking_num in hotel.reservations:
+                continue
+            room = rooms_by_num.get(int(record[2]))
+            if room == None:
+                skipped += 1
+                continue
+            date1 = datetime.date.fromisoformat(record[3])
+            date2 = datetime.date.fromisoformat(record[4])
+
+            #the room is not booked and the number not registered if either is taken
+            try:
+                rsv = Reservation(record[5], room, date1, date2, booking_num)
+            except AssertionError:
+                skipped += 1
+                continue
+            hotel.reservations[booking_num] = rsv
+            hotel.add_to_indexes(rsv)
+            hotel.mark_dirty(date1, date2)
+            changes += 1
+
+        return changes, skipped
+
+
+
+if __name__ == "__main__":
+    doctest.testmod()
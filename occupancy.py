@@ -0,0 +1,227 @@
+#This program simulates a booking system of hotels for the occupancy of a hotel.
+import doctest, datetime
+from room import Room, MONTHS
+from availability import days_in_month
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class OccupancyMatrix:
+    """ Represents the occupancy of the rooms of a hotel as a rooms x nights matrix,
+    where a cell is True if the room has been set up and is not booked that night.
+
+    Instance attributes: rooms(list), first_night(int), free(numpy.ndarray),
+                         row_of_room(dict), rows_by_type(dict) """
+
+    def __init__(self, rooms):
+        """ (list) -> OccupancyMatrix
+        Builds the matrix from the availability of the given rooms.
+
+        >>> r1 = Room("Queen", 105, 80.0)
+        >>> r2 = Room("Twin", 101, 55.0)
+        >>> r1.set_up_room_availability(['May', 'Jun'], 2021)
+        >>> r2.set_up_room_availability(['Jun'], 2021)
+        >>> r1.availability[(2021, 5)][8] = False
+        >>> matrix = OccupancyMatrix([r1, r2])
+        >>> matrix.free.shape
+        (2, 61)
+        >>> int(matrix.free[0].sum()), int(matrix.free[1].sum())
+        (60, 30)
+        """
+        if numpy is None:
+            raise ImportError("The occupancy matrix requires numpy.")
+
+        self.rooms = list(rooms)
+        self.row_of_room = {}
+        self.rows_by_type = {}
+
+        #find the first and last night set up in any of the rooms
+        first_night = None
+        end_night = None
+        for room in self.rooms:
+            for year, month in room.availability:
+                first = datetime.date(year, month, 1).toordinal()
+                end = first + days_in_month(year, month)
+                if first_night == None or first < first_night:
+                    first_night = first
+                if end_night == None or end > end_night:
+                    end_night = end
+
+        if first_night == None:
+            first_night = end_night = 0
+
+        self.first_night = first_night
+        self.free = numpy.zeros((len(self.rooms), end_night - first_night), dtype = bool)
+
+        #copy the availability of every room, one month at a time
+        for row in range(len(self.rooms)):
+            room = self.rooms[row]
+            self.row_of_room[room.room_num] = row
+            self.rows_by_type.setdefault(room.room_type, []).append(row)
+
+            for (year, month), month_list in room.availability.items():
+                column = datetime.date(year, month, 1).toordinal() - first_night
+                days = list(month_list)[1:]
+                self.free[row, column:column + len(days)] = [day != False for day in days]
+
+        for room_type in self.rows_by_type:
+            self.rows_by_type[room_type] = numpy.array(self.rows_by_type[room_type], dtype = int)
+
+
+
+    def columns(self, date1, date2):
+        """ (date,date) -> int,int
+        Returns the columns of the matrix for the nights from date1(included) to\
+        date2(excluded), or None if any of those nights is outside of the matrix.
+        """
+        first = date1.toordinal() - self.first_night
+        end = date2.toordinal() - self.first_night
+        if first < 0 or end > self.free.shape[1]:
+            return None
+        return first, end
+
+
+
+    def mark(self, room, date1, date2, free):
+        """ (Room,date,date,bool) -> None
+        Updates the cells of the room from date1(included) to date2(excluded).
+        """
+        row = self.row_of_room.get(room.room_num)
+        if row == None:
+            return
+
+        #only the nights inside the matrix are updated
+        first = max(date1.toordinal() - self.first_night, 0)
+        end = min(date2.toordinal() - self.first_night, self.free.shape[1])
+        if first < end:
+            self.free[row, first:end] = free
+
+
+
+    def free_rooms(self, room_type, date1, date2):
+        """ (str,date,date) -> list
+        Returns the list of rooms of the given type which are free every night from\
+        date1(included) to date2(excluded).
+
+        >>> rooms = [Room("Queen", num, 80.0) for num in range(101, 106)]
+        >>> for r in rooms:
+        ...     r.set_up_room_availability(['May'], 2021)
+        >>> rooms[0].reserve_room(datetime.date(2021, 5, 4))
+        >>> rooms[3].reserve_room(datetime.date(2021, 5, 9))
+        >>> matrix = OccupancyMatrix(rooms)
+        >>> date1 = datetime.date(2021, 5, 3)
+        >>> date2 = datetime.date(2021, 5, 10)
+        >>> [room.room_num for room in matrix.free_rooms('Queen', date1, date2)]
+        [102, 103, 105]
+        >>> matrix.free_rooms('Queen', date1, datetime.date(2021, 6, 2))
+        []
+        """
+        rows = self.free_rows(room_type, date1, date2)
+        return [self.rooms[row] for row in rows]
+
+
+
+    def free_rows(self, room_type, date1, date2):
+        """ (str,date,date) -> numpy.ndarray
+        Returns the rows of the rooms of the given type which are free every night from\
+        date1(included) to date2(excluded).
+        """
+        rows = self.rows_by_type.get(room_type)
+        columns = self.columns(date1, date2)
+        if rows is None or columns == None:
+            return numpy.zeros(0, dtype = int)
+
+        #a room is free for the stay if it is free in every column of the stay
+        free_for_stay = self.free[rows, columns[0]:columns[1]].all(axis = 1)
+        return rows[free_for_stay]
+
+
+
+    def first_free_room(self, room_type, date1, date2):
+        """ (str,date,date) -> Room
+        Returns the first room of the given type which is free every night from date1\
+        (included) to date2(excluded), None if there is no such room.
+        """
+        rows = self.free_rows(room_type, date1, date2)
+        if len(rows) == 0:
+            return None
+        return self.rooms[rows[0]]
+
+
+
+    def free_counts(self, date1, date2, room_type = None):
+        """ (date,date,str) -> numpy.ndarray
+        Returns the number of free rooms(of the given type, or of any type) for each\
+        night from date1(included) to date2(excluded).
+
+        >>> rooms = [Room("Queen", 101, 80.0), Room("Queen", 102, 80.0), Room("Twin", 103, 55.0)]
+        >>> for r in rooms:
+        ...     r.set_up_room_availability(['May'], 2021)
+        >>> rooms[0].reserve_room(datetime.date(2021, 5, 31))
+        >>> matrix = OccupancyMatrix(rooms)
+        >>> matrix.free_counts(datetime.date(2021, 5, 30), datetime.date(2021, 6, 2)).tolist()
+        [3, 2, 0]
+        >>> matrix.free_counts(datetime.date(2021, 5, 30), datetime.date(2021, 6, 1), 'Queen').tolist()
+        [2, 1]
+        """
+        num_nights = (date2 - date1).days
+        counts = numpy.zeros(num_nights, dtype = int)
+
+        if room_type == None:
+            rows = slice(None)
+        elif room_type in self.rows_by_type:
+            rows = self.rows_by_type[room_type]
+        else:
+            return counts
+
+        #only the nights inside the matrix can have free rooms
+        first = date1.toordinal() - self.first_night
+        start = max(first, 0)
+        end = min(first + num_nights, self.free.shape[1])
+        if start < end:
+            counts[start - first:end - first] = self.free[rows, start:end].sum(axis = 0)
+
+        return counts
+
+
+
+    def month_grid(self, month, year, room_type = None):
+        """ (str,int,str) -> list,numpy.ndarray
+        Returns the list of rooms(of the given type, or of any type) and a matrix with\
+        one row per room and one column per day of the month, True if the room is free.
+
+        >>> rooms = [Room("Queen", 101, 80.0), Room("Twin", 103, 55.0)]
+        >>> for r in rooms:
+        ...     r.set_up_room_availability(['Feb'], 2021)
+        >>> rooms[1].reserve_room(datetime.date(2021, 2, 2))
+        >>> grid_rooms, grid = OccupancyMatrix(rooms).month_grid('Feb', 2021, 'Twin')
+        >>> [room.room_num for room in grid_rooms], grid.shape
+        ([103], (1, 28))
+        >>> grid[0, :3].tolist()
+        [True, False, True]
+        """
+        month_num = MONTHS.index(month) + 1
+        date1 = datetime.date(year, month_num, 1)
+        date2 = date1 + datetime.timedelta(days = days_in_month(year, month_num))
+
+        if room_type == None:
+            rows = numpy.arange(len(self.rooms))
+        else:
+            rows = self.rows_by_type.get(room_type, numpy.zeros(0, dtype = int))
+
+        grid = numpy.zeros((len(rows), (date2 - date1).days), dtype = bool)
+        first = date1.toordinal() - self.first_night
+        start = max(first, 0)
+        end = min(first + grid.shape[1], self.free.shape[1])
+        if start < end:
+            grid[:, start - first:end - first] = self.free[rows, start:end]
+
+        return [self.rooms[row] for row in rows], grid
+
+
+
+if __name__ == "__main__":
+    doctest.testmod()
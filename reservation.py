@@ -1,17 +1,142 @@
 #This program simulates a booking system of hotels for its reservation.
 #Ziwei Hu 260889365
-import doctest, datetime, random
+import doctest, datetime, random, threading
 from room import Room, MONTHS, DAYS_PER_MONTH
 
 
+class BookingNumberRegistry:
+    """ Represents the set of booking numbers in use
+    
+    Instance attributes: numbers(set), lock(threading.RLock)
+    Class attributes: FIRST_NUMBER, LAST_NUMBER """
+    
+    FIRST_NUMBER = 1000000000000
+    LAST_NUMBER = 9999999999999
+    
+    def __init__(self, numbers = ()):
+        self.numbers = set(numbers)
+        self.lock = threading.RLock()
+        
+        
+    def __contains__(self, booking_num):
+        return booking_num in self.numbers
+    
+    
+    def __len__(self):
+        return len(self.numbers)
+    
+    
+    def __iter__(self):
+        return iter(self.numbers)
+    
+    
+    def add(self, booking_num):
+        """ (int) -> None
+        Registers the booking number, raises AssertionError if it is already in use.
+        
+        >>> registry = BookingNumberRegistry([1953400675629])
+        >>> registry.add(4191471513010)
+        >>> 4191471513010 in registry
+        True
+        >>> registry.add(1953400675629)
+        Traceback (most recent call last):
+        AssertionError: The booking number is invalid.
+        """
+        with self.lock:
+            if booking_num in self.numbers:
+                raise AssertionError("The booking number is invalid.")
+            self.numbers.add(booking_num)
+        
+        
+    #booking_numbers used to be a list, keep its method name working
+    append = add
+    
+    
+    def release(self, booking_num):
+        """ (int) -> None
+        Makes the booking number available again, does nothing if it is not in use.
+        
+        >>> registry = BookingNumberRegistry([1953400675629])
+        >>> registry.release(1953400675629)
+        >>> registry.release(1953400675629)
+        >>> len(registry)
+        0
+        """
+        with self.lock:
+            self.numbers.discard(booking_num)
+        
+        
+    def allocate(self):
+        """ (None) -> int
+        Returns a random 13 digit booking number which is not in use. If the random\
+        number is taken, the next free number after it is returned instead of drawing\
+        again.
+        
+        >>> random.seed(987)
+        >>> BookingNumberRegistry().allocate()
+        1953400675629
+        >>> random.seed(987)
+        >>> BookingNumberRegistry([1953400675629, 1953400675630]).allocate()
+        1953400675631
+        """
+        with self.lock:
+            booking_num = random.randint(self.FIRST_NUMBER, self.LAST_NUMBER)
+            
+            #walk to the next free number, going back to the first number after the last one
+            while booking_num in self.numbers:
+                booking_num += 1
+                if booking_num > self.LAST_NUMBER:
+                    booking_num = self.FIRST_NUMBER
+                    
+            return booking_num
+        
+        
+    def add_new(self):
+        """ (None) -> int
+        Allocates a booking number and registers it in one step, so that two threads\
+        never get the same number. Returns the number.
+        
+        >>> random.seed(987)
+        >>> registry = BookingNumberRegistry()
+        >>> registry.add_new()
+        1953400675629
+        >>> 1953400675629 in registry
+        True
+        """
+        with self.lock:
+            booking_num = self.allocate()
+            self.numbers.add(booking_num)
+            return booking_num
+    
+    
+    
 class Reservation:
     """ Represents a reservation
     
     Instance attributes: booking_number(int), name(str), room_reserved(Room),\
                          check_in(date), check_out(date)
-    Class attributes: booking_numbers(list) """
+    Class attributes: booking_numbers(BookingNumberRegistry) """
+    
+    booking_numbers = BookingNumberRegistry()
+    
+    __slots__ = ('name', 'check_in', 'check_out', 'booking_number', 'room_reserved')
+    
+    @staticmethod
+    def get_registry():
+        """ (None) -> BookingNumberRegistry
+        Returns the registry of the booking numbers in use. If booking_numbers has been\
+        set to a list, it is turned into a registry first.
+        
+        >>> Reservation.booking_numbers = [1953400675629]
+        >>> registry = Reservation.get_registry()
+        >>> 1953400675629 in registry, Reservation.booking_numbers is registry
+        (True, True)
+        """
+        if not isinstance(Reservation.booking_numbers, BookingNumberRegistry):
+            Reservation.booking_numbers = BookingNumberRegistry(Reservation.booking_numbers)
+        return Reservation.booking_numbers
+    
     
-    booking_numbers = []
     
     def __init__(self, name, room, date1, date2, booking_num = None):
         """ (str,Room,date,date,int) -> Reservation
@@ -33,8 +158,9 @@ class Reservation:
         >>> r1.availability[(2021, 5)][9]
         False
         """
+        #check and reserve the room for all nights from date1 to date2 in one step,
         #raise AssertionError if room_input is not available at the specified dates
-        if not room.is_available(date1, date2):
+        if not room.reserve_stay_if_available(date1, date2):
             raise AssertionError("The input room is not available at the specified dates.")
         
         #initialize all the instance attributes
@@ -43,47 +169,63 @@ class Reservation:
         self.check_out = date2
         self.booking_number = booking_num
         
-        #raise AssertionError if booking_num input had already been used for not 13 digit
-        if self.booking_number != None:
-            if len(str(self.booking_number)) != 13:
-                raise AssertionError("The booking number is invalid.")
-            if self.booking_number in Reservation.booking_numbers:
-                raise AssertionError("The booking number is invalid.")
-            if str(self.booking_number)[0] not in "123456789":
-                raise AssertionError("The booking number is invalid.")
+        registry = Reservation.get_registry()
         
-        #if booking_num is not provided, generates a new random 13 digit number
-        if self.booking_number == None:
-            self.booking_number = random.randint(1000000000000, 9999999999999)
-        while self.booking_number in Reservation.booking_numbers:
-            self.booking_number = random.randint(1000000000000, 9999999999999)
+        try:
+            #raise AssertionError if booking_num input had already been used for not 13 digit
+            if self.booking_number != None:
+                if len(str(self.booking_number)) != 13:
+                    raise AssertionError("The booking number is invalid.")
+                if str(self.booking_number)[0] not in "123456789":
+                    raise AssertionError("The booking number is invalid.")
+                registry.add(self.booking_number)
             
-            
-        #updates the class attribute booking_numbers
-        Reservation.booking_numbers.append(self.booking_number)
-        
-        #get a timedelta object from the two given days, calculate the difference of days
-        diff = date2 - date1
-        num_days = diff.days
-        one_day = datetime.timedelta(days = 1) #generate a timedelta object for one day
-        
-        date = date1
-        date_list = []
-        
-        #create a list contains all date between first_date and second_date
-        for i in range(num_days):
-            date_list.append(date)
-            date += one_day                      
-        
-        #reserve the specified room for all nights from date1 to date2
-        for date in date_list:
-            room.reserve_room(date)
+            #if booking_num is not provided, generates and registers a new 13 digit number
+            else:
+                self.booking_number = registry.add_new()
+        except AssertionError:
+            #give the nights back to the room if the booking number cannot be used
+            room.release_stay(date1, date2)
+            raise
            
         #initiates the intance attribute of room_reserved
         self.room_reserved = room
         
     
     
+    @classmethod
+    def restore(cls, name, room, date1, date2, booking_num, reserve = True):
+        """ (str,Room,date,date,int,bool) -> Reservation
+        Creates a reservation whose booking number has already been registered, as\
+        done by the loaders which merge all the booking numbers at once. The room is\
+        reserved for every night from date1 to date2, unless reserve is False because\
+        the loaded availability of the room has these nights booked already.
+        
+        >>> Reservation.booking_numbers = [1953400675629]
+        >>> r1 = Room("Queen", 105, 80.0)
+        >>> r1.set_up_room_availability(['May'], 2021)
+        >>> date1 = datetime.date(2021, 5, 3)
+        >>> date2 = datetime.date(2021, 5, 10)
+        >>> my_reservation = Reservation.restore("Mrs.Santos", r1, date1, date2, 1953400675629)
+        >>> my_reservation.booking_number
+        1953400675629
+        >>> r1.is_available(date1, date2)
+        False
+        """
+        reservation = cls.__new__(cls)
+        reservation.name = name
+        reservation.check_in = date1
+        reservation.check_out = date2
+        reservation.booking_number = booking_num
+        
+        if reserve:
+            room.reserve_stay(date1, date2)
+        reservation.room_reserved = room
+        
+        return reservation
+        
+        
+        
     def __str__(self):
         """ (Reservation) -> None
         Returns a string representation of a reservation containing the booking number,\
@@ -186,42 +328,36 @@ class Reservation:
         Check-out date: 2021-05-05
         """
         #creates a dictionary, generate a timedelta object for one day
+        registry = Reservation.get_registry()
         reservation_dict = dict()
         one_day = datetime.timedelta(days = 1) 
         
-        
-        #iterates through each tuple in reservation_strings to reserve the room
+        #group the tuples by booking number in one pass, keeping the min and max date
+        stays = dict()
         for tup in reservation_strings:
             #if the tuple has empty reservation string, skip to the next iteration
             if tup[3] == '':
                 continue
             
             booking_num = int(tup[3][0:13])
-            #if no reservation for the booking number in the tuple
-            if booking_num not in Reservation.booking_numbers:
-                min_date = datetime.date(int(tup[0]), MONTHS.index(tup[1]) + 1, int(tup[2]))
-                max_date = datetime.date(int(tup[0]), MONTHS.index(tup[1]) + 1, int(tup[2]))
-                
-                #find the minimum day as the check-in date and maximum day as check_out
-                for tup2 in reservation_strings:
-                    if tup2[3] == '':
-                        continue
-                    elif int(tup2[3][0:13]) == booking_num:
-                        date = datetime.date(int(tup2[0]), MONTHS.index(tup2[1]) + 1, int(tup2[2]))
-                        if date < min_date:
-                            min_date = date
-                        elif date > max_date:
-                            max_date = date
-                    
-                max_date += one_day
-                
-                #generate a reservation, add it to the reservation dictionary
-                rsv = Reservation.from_short_string(tup[3], min_date, max_date, room)
-                reservation_dict[booking_num] = rsv
-                
-            #if booking number in the tuple already has reservation, skip to next iteration
-            if booking_num in Reservation.booking_numbers:
+            date = datetime.date(int(tup[0]), MONTHS.index(tup[1]) + 1, int(tup[2]))
+            
+            if booking_num not in stays:
+                stays[booking_num] = [tup[3], date, date]
+            elif date < stays[booking_num][1]:
+                stays[booking_num][1] = date
+            elif date > stays[booking_num][2]:
+                stays[booking_num][2] = date
+        
+        #generate a reservation for each booking number, the check-out is the day after
+        for booking_num in stays:
+            #if booking number already has reservation, skip to next iteration
+            if booking_num in registry:
                 continue
+            
+            short_string, min_date, max_date = stays[booking_num]
+            rsv = Reservation.from_short_string(short_string, min_date, max_date + one_day, room)
+            reservation_dict[booking_num] = rsv
                 
         return reservation_dict
 
@@ -0,0 +1,318 @@
+#This program simulates a booking system of hotels for the revenue of the hotels.
+import doctest, datetime, random
+from room import Room, MONTHS
+from reservation import Reservation
+from availability import days_in_month
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class ReservationColumns:
+    """ Represents the reservations of a hotel as parallel arrays, one entry per\
+    reservation sorted by booking number, so that receipts and revenue are computed\
+    over all the reservations at once.
+
+    Instance attributes: booking_numbers(numpy.ndarray), prices(numpy.ndarray),
+                         check_in(numpy.ndarray), check_out(numpy.ndarray),
+                         type_codes(numpy.ndarray), room_types(list) """
+
+    def __init__(self, reservations):
+        """ (dict) -> ReservationColumns
+        Builds the arrays from a dictionary of reservations keyed by booking number.
+
+        >>> random.seed(987)
+        >>> Reservation.booking_numbers = []
+        >>> r1 = Room("Queen", 105, 80.0)
+        >>> r1.set_up_room_availability(['May'], 2021)
+        >>> rsv = Reservation("Jack", r1, datetime.date(2021, 5, 3), datetime.date(2021, 5, 10))
+        >>> columns = ReservationColumns({rsv.booking_number: rsv})
+        >>> columns.prices.tolist(), columns.nights().tolist()
+        ([80.0], [7])
+        """
+        if numpy is None:
+            raise ImportError("The reservation columns require numpy.")
+
+        self.booking_numbers = numpy.zeros(0, dtype = numpy.int64)
+        self.prices = numpy.zeros(0, dtype = float)
+        self.check_in = numpy.zeros(0, dtype = numpy.int64)
+        self.check_out = numpy.zeros(0, dtype = numpy.int64)
+        self.type_codes = numpy.zeros(0, dtype = numpy.int64)
+        self.room_types = []
+        self.update(reservations)
+
+
+
+    def update(self, added, removed = ()):
+        """ (dict,set) -> None
+        Removes the reservations of the booking numbers in removed, then adds the\
+        reservations of the dictionary added keyed by booking number, keeping the\
+        arrays sorted by booking number. Booking numbers without a reservation in the\
+        arrays are ignored in removed.
+
+        >>> random.seed(987)
+        >>> Reservation.booking_numbers = []
+        >>> r1 = Room("Queen", 105, 80.0)
+        >>> r2 = Room("Twin", 101, 55.0)
+        >>> for r in [r1, r2]:
+        ...     r.set_up_room_availability(['May'], 2021)
+        >>> rsv1 = Reservation("Jack", r1, datetime.date(2021, 5, 3), datetime.date(2021, 5, 10))
+        >>> rsv2 = Reservation("Judy", r2, datetime.date(2021, 5, 3), datetime.date(2021, 5, 5))
+        >>> columns = ReservationColumns({rsv1.booking_number: rsv1})
+        >>> columns.update({rsv2.booking_number: rsv2}, {rsv1.booking_number, 123})
+        >>> columns.booking_numbers.tolist() == [rsv2.booking_number], columns.revenue_by_type()
+        (True, {'Queen': 0.0, 'Twin': 110.0})
+        """
+        if len(removed) > 0:
+            removed = numpy.fromiter(removed, dtype = numpy.int64, count = len(removed))
+            kept = ~numpy.isin(self.booking_numbers, removed)
+            self.booking_numbers = self.booking_numbers[kept]
+            self.prices = self.prices[kept]
+            self.check_in = self.check_in[kept]
+            self.check_out = self.check_out[kept]
+            self.type_codes = self.type_codes[kept]
+
+        booking_numbers = sorted(added)
+        count = len(booking_numbers)
+        if count == 0:
+            return
+
+        prices = numpy.zeros(count, dtype = float)
+        check_in = numpy.zeros(count, dtype = numpy.int64)
+        check_out = numpy.zeros(count, dtype = numpy.int64)
+        type_codes = numpy.zeros(count, dtype = numpy.int64)
+
+        code_of_type = {}
+        for code in range(len(self.room_types)):
+            code_of_type[self.room_types[code]] = code
+        for i in range(count):
+            rsv = added[booking_numbers[i]]
+            room_type = rsv.room_reserved.room_type
+            if room_type not in code_of_type:
+                code_of_type[room_type] = len(self.room_types)
+                self.room_types.append(room_type)
+            prices[i] = rsv.room_reserved.price
+            check_in[i] = rsv.check_in.toordinal()
+            check_out[i] = rsv.check_out.toordinal()
+            type_codes[i] = code_of_type[room_type]
+
+        #insert the new rows where their booking numbers keep the arrays sorted
+        booking_numbers = numpy.array(booking_numbers, dtype = numpy.int64)
+        positions = numpy.searchsorted(self.booking_numbers, booking_numbers)
+        self.booking_numbers = numpy.insert(self.booking_numbers, positions, booking_numbers)
+        self.prices = numpy.insert(self.prices, positions, prices)
+        self.check_in = numpy.insert(self.check_in, positions, check_in)
+        self.check_out = numpy.insert(self.check_out, positions, check_out)
+        self.type_codes = numpy.insert(self.type_codes, positions, type_codes)
+
+
+
+    def nights(self):
+        """ (None) -> numpy.ndarray
+        Returns the number of nights of each reservation.
+        """
+        return self.check_out - self.check_in
+
+
+
+    def receipts(self, booking_num_list):
+        """ (list) -> numpy.ndarray
+        Returns the amount to pay for each booking number of the list, 0.0 for the\
+        booking numbers without a reservation.
+
+        >>> random.seed(987)
+        >>> Reservation.booking_numbers = []
+        >>> r1 = Room("Queen", 105, 80.0)
+        >>> r2 = Room("Twin", 101, 55.0)
+        >>> for r in [r1, r2]:
+        ...     r.set_up_room_availability(['May', 'Jun'], 2021)
+        >>> rsv1 = Reservation("Jack", r1, datetime.date(2021, 5, 3), datetime.date(2021, 5, 10))
+        >>> rsv2 = Reservation("Judy", r2, datetime.date(2021, 5, 3), datetime.date(2021, 6, 5))
+        >>> columns = ReservationColumns({rsv1.booking_number: rsv1, rsv2.booking_number: rsv2})
+        >>> columns.receipts([rsv1.booking_number, 123, rsv2.booking_number]).tolist()
+        [560.0, 0.0, 1815.0]
+        """
+        wanted = numpy.asarray(booking_num_list, dtype = numpy.int64)
+        amounts = numpy.zeros(len(wanted), dtype = float)
+        if len(self.booking_numbers) == 0:
+            return amounts
+
+        #find each booking number in the sorted column, keep the ones really found
+        positions = numpy.searchsorted(self.booking_numbers, wanted)
+        positions = numpy.minimum(positions, len(self.booking_numbers) - 1)
+        found = self.booking_numbers[positions] == wanted
+        rows = positions[found]
+        amounts[found] = self.prices[rows] * (self.check_out[rows] - self.check_in[rows])
+        return amounts
+
+
+
+    def selected_rows(self, room_type = None):
+        """ (str) -> numpy.ndarray
+        Returns a boolean array, True for the reservations of rooms of the given type,\
+        or for every reservation if no type is given.
+        """
+        if room_type == None:
+            return numpy.ones(len(self.prices), dtype = bool)
+        if room_type not in self.room_types:
+            return numpy.zeros(len(self.prices), dtype = bool)
+        return self.type_codes == self.room_types.index(room_type)
+
+
+
+    def revenue(self, room_type = None):
+        """ (str) -> float
+        Returns the total price of the reservations(of rooms of the given type).
+        """
+        rows = self.selected_rows(room_type)
+        return float(numpy.dot(self.prices[rows], self.nights()[rows]))
+
+
+
+    def revenue_by_type(self):
+        """ (None) -> dict
+        Returns a dictionary from each room type to the total price of its reservations.
+
+        >>> random.seed(987)
+        >>> Reservation.booking_numbers = []
+        >>> r1 = Room("Queen", 105, 80.0)
+        >>> r2 = Room("Twin", 101, 55.0)
+        >>> for r in [r1, r2]:
+        ...     r.set_up_room_availability(['May'], 2021)
+        >>> rsv1 = Reservation("Jack", r1, datetime.date(2021, 5, 3), datetime.date(2021, 5, 10))
+        >>> rsv2 = Reservation("Judy", r2, datetime.date(2021, 5, 3), datetime.date(2021, 5, 5))
+        >>> columns = ReservationColumns({rsv1.booking_number: rsv1, rsv2.booking_number: rsv2})
+        >>> sorted(columns.revenue_by_type().items())
+        [('Queen', 560.0), ('Twin', 110.0)]
+        """
+        amounts = numpy.bincount(self.type_codes, weights = self.prices * self.nights(),
+                                 minlength = len(self.room_types))
+        revenue = {}
+        for code in range(len(self.room_types)):
+            revenue[self.room_types[code]] = float(amounts[code])
+        return revenue
+
+
+
+    def nightly_revenue(self, room_type = None):
+        """ (str) -> int,numpy.ndarray
+        Returns the ordinal of the first night with a reservation and the revenue of\
+        each night from it to the last night with a reservation(of rooms of the given\
+        type). Each reservation adds its price to every night of the stay, which is\
+        done by adding the price on check-in and removing it on check-out, then taking\
+        the running sum.
+        """
+        rows = self.selected_rows(room_type)
+        if not rows.any():
+            return 0, numpy.zeros(0, dtype = float)
+
+        prices = self.prices[rows]
+        check_in = self.check_in[rows]
+        check_out = self.check_out[rows]
+        first_night = int(check_in.min())
+        num_nights = int(check_out.max()) - first_night
+
+        changes = numpy.bincount(check_in - first_night, weights = prices,
+                                 minlength = num_nights + 1)
+        changes -= numpy.bincount(check_out - first_night, weights = prices,
+                                  minlength = num_nights + 1)
+        return first_night, numpy.cumsum(changes[:num_nights])
+
+
+
+    def revenue_for_dates(self, date1, date2, room_type = None):
+        """ (date,date,str) -> float
+        Returns the revenue of the nights from date1(included) to date2(excluded), only\
+        counting the nights of each stay which fall between the dates.
+
+        >>> random.seed(987)
+        >>> Reservation.booking_numbers = []
+        >>> r1 = Room("Queen", 105, 80.0)
+        >>> r1.set_up_room_availability(['May', 'Jun'], 2021)
+        >>> rsv = Reservation("Jack", r1, datetime.date(2021, 5, 30), datetime.date(2021, 6, 3))
+        >>> columns = ReservationColumns({rsv.booking_number: rsv})
+        >>> columns.revenue_for_dates(datetime.date(2021, 6, 1), datetime.date(2021, 7, 1))
+        160.0
+        >>> columns.revenue_for_dates(datetime.date(2021, 5, 1), datetime.date(2021, 6, 1), 'Twin')
+        0.0
+        """
+        first_night, nightly = self.nightly_revenue(room_type)
+        start = max(date1.toordinal() - first_night, 0)
+        end = max(min(date2.toordinal() - first_night, len(nightly)), 0)
+        if start >= end:
+            return 0.0
+        return float(nightly[start:end].sum())
+
+
+
+    def revenue_by_month(self, room_type = None):
+        """ (str) -> dict
+        Returns a dictionary from each (year, month) with a reservation to the revenue\
+        of its nights. Stays crossing the end of a month are shared between the months\
+        by their nights.
+
+        >>> random.seed(987)
+        >>> Reservation.booking_numbers = []
+        >>> r1 = Room("Queen", 105, 80.0)
+        >>> r1.set_up_room_availability(['Dec'], 2021)
+        >>> r1.set_up_room_availability(['Jan'], 2022)
+        >>> rsv = Reservation("Jack", r1, datetime.date(2021, 12, 30), datetime.date(2022, 1, 2))
+        >>> ReservationColumns({rsv.booking_number: rsv}).revenue_by_month()
+        {(2021, 12): 160.0, (2022, 1): 80.0}
+        """
+        first_night, nightly = self.nightly_revenue(room_type)
+        revenue = {}
+        if len(nightly) == 0:
+            return revenue
+
+        #walk through the months from the first night, summing their nights
+        a_date = datetime.date.fromordinal(first_night)
+        year = a_date.year
+        month = a_date.month
+        start = 0
+        end = datetime.date(year, month, 1).toordinal() + days_in_month(year, month) - first_night
+        while start < len(nightly):
+            revenue[(year, month)] = float(nightly[start:end].sum())
+            month += 1
+            if month == 13:
+                year += 1
+                month = 1
+            start = end
+            end += days_in_month(year, month)
+
+        return revenue
+
+
+
+def revenue_by_hotel(hotels, date1 = None, date2 = None):
+    """ (list,date,date) -> dict
+    Returns a dictionary from the name of each hotel to its revenue, for the nights from\
+    date1(included) to date2(excluded) if they are given.
+
+    >>> random.seed(987)
+    >>> Reservation.booking_numbers = []
+    >>> from hotel import Hotel
+    >>> r1 = Room("Queen", 105, 80.0)
+    >>> r1.set_up_room_availability(['May'], 2021)
+    >>> h = Hotel("Secret Nugget Hotel", [r1])
+    >>> num = h.make_reservation("Jack", "Queen", datetime.date(2021, 5, 3), datetime.date(2021, 5, 10))
+    >>> revenue_by_hotel([h])
+    {'Secret Nugget Hotel': 560.0}
+    >>> revenue_by_hotel([h], datetime.date(2021, 5, 9), datetime.date(2021, 6, 1))
+    {'Secret Nugget Hotel': 80.0}
+    """
+    revenue = {}
+    for hotel in hotels:
+        columns = hotel.get_columns()
+        if date1 == None:
+            revenue[hotel.name] = columns.revenue()
+        else:
+            revenue[hotel.name] = columns.revenue_for_dates(date1, date2)
+    return revenue
+
+
+
+if __name__ == "__main__":
+    doctest.testmod()
@@ -1,7 +1,8 @@
 #The program simulates a booking system of hotels for its rooms.
 #Ziwei Hu 260889365
 import doctest
-import datetime
+import threading
+from availability import DictAvailability
 
 
 MONTHS = ['Jan','Feb','Mar','Apr','May','Jun','Jul','Aug','Sep','Oct','Nov','Dec']
@@ -11,12 +12,17 @@ DAYS_PER_MONTH = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
 class Room:
     """ Represents a room
 
-    Instance attributes: room_type(str), room_num(int), price(float), availability(dict)
-    Class attribute: TYPES_OF_ROOMS_AVAILABLE """
+    Instance attributes: room_type(str), room_num(int), price(float), availability(dict),
+                         backend, lock(threading.Lock)
+    Class attributes: TYPES_OF_ROOMS_AVAILABLE, AVAILABILITY_BACKEND """
     
     TYPES_OF_ROOMS_AVAILABLE = ['twin', 'double', 'queen', 'king']
+    AVAILABILITY_BACKEND = DictAvailability
     
-    def __init__(self, room_type, room_num, price):
+    #without a __dict__ per room, a hotel of thousands of rooms takes less memory
+    __slots__ = ('room_type', 'room_num', 'price', 'backend', 'lock')
+    
+    def __init__(self, room_type, room_num, price, backend = None):
         #raise AssertionError if the type of any of the inputs does not match as expected
         if type(room_type) != str or type(room_num) != int or type(price) != float:
             raise AssertionError("The type of input is not correct.")
@@ -38,7 +44,56 @@ class Room:
         self.room_type = room_type
         self.room_num = room_num
         self.price = price
-        self.availability = {}
+        
+        #the backend keeps the availability, the default one is the dictionary of lists
+        if backend == None:
+            backend = Room.AVAILABILITY_BACKEND
+        self.backend = backend()
+        
+        #the lock makes checking and reserving the nights of a stay one step
+        self.lock = threading.Lock()
+        
+        
+    def __getstate__(self):
+        #locks cannot be copied or pickled, the copy gets a new one
+        return {'room_type': self.room_type, 'room_num': self.room_num,
+                'price': self.price, 'backend': self.backend}
+    
+    
+    def __setstate__(self, state):
+        for name in state:
+            setattr(self, name, state[name])
+        self.lock = threading.Lock()
+        
+        
+        
+    @property
+    def availability(self):
+        """ Returns the availability of the room as a dictionary whose keys are tuples\
+        (year, month) and whose values are lists [None, True, False, ...] for each day.
+        
+        >>> import datetime
+        >>> from availability import IntervalAvailability, PackedAvailability
+        >>> r = Room("Queen", 105, 80.0, IntervalAvailability)
+        >>> r.set_up_room_availability(['May'], 2021)
+        >>> r.availability[(2021, 5)][8] = False
+        >>> r.is_available(datetime.date(2021, 5, 3), datetime.date(2021, 5, 10))
+        False
+        >>> r.availability[(2021, 5)][7:10]
+        [True, False, True]
+        >>> r = Room("Queen", 105, 80.0, PackedAvailability)
+        >>> r.set_up_room_availability(['May'], 2021)
+        >>> r.availability[(2021, 5)][8] = False
+        >>> r.availability[(2021, 5)][7:10]
+        [True, False, True]
+        """
+        return self.backend.view()
+    
+    
+    @availability.setter
+    def availability(self, availability_dict):
+        self.backend = type(self.backend)()
+        self.backend.view().update(availability_dict)
         
         
         
@@ -68,6 +123,7 @@ class Room:
         """ (list,int) -> None
         Updates the availability attribute of the room.
         
+        >>> from availability import SparseAvailability
         >>> r = Room("Queen", 105, 80.0)
         >>> r.set_up_room_availability(['May', 'Jun'], 2021)
         >>> len(r.availability)
@@ -92,30 +148,17 @@ class Room:
         4
         >>> len(r.availability[(1700, 2)])
         29
+        
+        >>> r = Room("Queen", 105, 80.0, SparseAvailability)
+        >>> r.set_up_room_availability(['May'], 2021)
+        >>> r.backend.months
+        {(2021, 5): 31}
+        >>> len(r.availability[(2021, 5)]), r.availability[(2021, 5)][5]
+        (32, True)
         """
         #iterate through the months_list, add a new item in availablity dict each time
         for month in months_list:
-            #create a tuple of integers represents year and month for the key
-            key = (year, MONTHS.index(month) + 1)
-            
-            #create a list of booleans for the value of the new item
-            value = [None]
-            #get the number of days of specific month
-            days_specific_month = DAYS_PER_MONTH[MONTHS.index(month)]
-            
-            #if leap year, change the days of February to 29
-            if month == 'Feb':
-                if year % 4 == 0:
-                    days_specific_month = 29
-                    if year % 100 == 0 and year % 400 != 0:
-                        days_specific_month = 28
-            
-            #Add True to value for days_specific_month times
-            for i in range(days_specific_month):
-                value.append(True)
-            
-            #add a new item in availablity dictionary 
-            self.availability[key] = value
+            self.backend.set_up_month(year, MONTHS.index(month) + 1)
          
          
            
@@ -123,6 +166,7 @@ class Room:
         """ (date) -> None
         Updates the availability of the room accordingly.
         
+        >>> import datetime
         >>> r = Room('Queen', 105, 80.0)
         >>> r.set_up_room_availability(['May', 'Jun'], 2021)
         >>> date1 = datetime.date(2021, 6, 20)
@@ -142,17 +186,8 @@ class Room:
         >>> r.availability[(2021, 6)][2]
         True
         """
-        #retrieve the year, month and day from the date object input
-        year = reserve_date.year
-        month = reserve_date.month
-        day = reserve_date.day
-        
         #raise AssertionError if the room is not available at the given date
-        if self.availability[(year, month)][day] == False:
-            raise AssertionError("The room is not available at the given date")
-        
-        #update the availability of the room for the given date, change to False
-        self.availability[(year, month)][day] = False
+        self.backend.reserve(reserve_date)
         
         
         
@@ -160,6 +195,7 @@ class Room:
         """ (date) -> None
         Updates the availability of the room at the given date to be True.
         
+        >>> import datetime
         >>> r = Room("Queen", 105, 80.0)
         >>> r.set_up_room_availability(['May', 'Jun'], 2021)
         >>> date1 = datetime.date(2021, 6, 20)
@@ -181,13 +217,8 @@ class Room:
         >>> r.availability[(2021, 6)][1]
         True
         """
-        #retrieve the year, month and day from the date object input
-        year = available_date.year
-        month = available_date.month
-        day = available_date.day
-        
         #update the availability of the room for the given date, change to True
-        self.availability[(year, month)][day] = True
+        self.backend.release(available_date)
         
     
     
@@ -196,6 +227,7 @@ class Room:
         Returns True if the room is available every night from the first date(included),\
         to the second date(excluded), returns False otherwise.
         
+        >>> import datetime
         >>> r = Room("King", 203, 100.0)
         >>> r.set_up_room_availability(['May', 'Jun'], 2021)
         >>> date1 = datetime.date(2021, 5, 25)
@@ -218,34 +250,94 @@ class Room:
         if first_date >= second_date:
             raise AssertionError("The first date is not earlier than the second date")
         
-        #get a timedelta object from the two given days
-        difference_day = second_date - first_date
-        #calculate the difference of days
-        num_days = difference_day.days
-        #generate a timedelta object represents one day
-        one_day = datetime.timedelta(days = 1)
-
-        date = first_date
-        date_list = []
+        #check whether the room is available every night from the first_date to the second
+        return self.backend.is_available(first_date, second_date)
+    
+    
+    
+    def reserve_stay(self, first_date, second_date):
+        """ (date,date) -> None
+        Updates the availability of the room to be False every night from the first\
+        date(included) to the second date(excluded).
         
-        #create a list contains all date between first_date and second_date
-        for i in range(num_days):
-            date_list.append(date)
-            date += one_day
+        >>> import datetime
+        >>> from availability import IntervalAvailability
+        >>> r = Room("King", 203, 100.0)
+        >>> r.set_up_room_availability(['May', 'Jun'], 2021)
+        >>> date1 = datetime.date(2021, 5, 30)
+        >>> date2 = datetime.date(2021, 6, 2)
+        >>> r.reserve_stay(date1, date2)
+        >>> r.availability[(2021, 5)][31], r.availability[(2021, 6)][1]
+        (False, False)
+        >>> r.availability[(2021, 6)][2]
+        True
+        >>> r.reserve_stay(datetime.date(2021, 6, 1), datetime.date(2021, 6, 5))
+        Traceback (most recent call last):
+        AssertionError: The room is not available at the given date
+        
+        >>> r = Room("King", 203, 100.0, IntervalAvailability)
+        >>> r.set_up_room_availability(['May', 'Jun'], 2021)
+        >>> r.reserve_stay(date1, date2)
+        >>> r.is_available(date1, date2)
+        False
+        """
+        #raise AssertionError if the first date is not earlier than the second date
+        if first_date >= second_date:
+            raise AssertionError("The first date is not earlier than the second date")
+        
+        with self.lock:
+            self.backend.reserve_stay(first_date, second_date)
             
-        #check whether the availability of the room has been set up
-        for date in date_list:
-            try:
-                self.availability[(date.year, date.month)][date.day]
-            except KeyError:
-                return False
             
-        #check whether the room is available every night from the first_date to the second
-        for date in date_list:
-            if self.availability[(date.year, date.month)][date.day] == False:
+            
+    def reserve_stay_if_available(self, first_date, second_date):
+        """ (date,date) -> bool
+        Reserves the room every night from the first date(included) to the second\
+        date(excluded) if it is available all those nights, returns whether it did.
+        No other thread can reserve the room between the check and the reservation.
+        
+        >>> import datetime
+        >>> r = Room("King", 203, 100.0)
+        >>> r.set_up_room_availability(['May'], 2021)
+        >>> date1 = datetime.date(2021, 5, 3)
+        >>> date2 = datetime.date(2021, 5, 10)
+        >>> r.reserve_stay_if_available(date1, date2)
+        True
+        >>> r.reserve_stay_if_available(datetime.date(2021, 5, 9), datetime.date(2021, 5, 12))
+        False
+        >>> r.availability[(2021, 5)][10:13]
+        [True, True, True]
+        """
+        #raise AssertionError if the first date is not earlier than the second date
+        if first_date >= second_date:
+            raise AssertionError("The first date is not earlier than the second date")
+        
+        with self.lock:
+            if not self.backend.is_available(first_date, second_date):
                 return False
+            self.backend.reserve_stay(first_date, second_date)
+            return True
+        
+        
         
-        return True
+    def release_stay(self, first_date, second_date):
+        """ (date,date) -> None
+        Updates the availability of the room to be True every night from the first\
+        date(included) to the second date(excluded).
+        
+        >>> import datetime
+        >>> from availability import IntervalAvailability
+        >>> r = Room("King", 203, 100.0, IntervalAvailability)
+        >>> r.set_up_room_availability(['May', 'Jun'], 2021)
+        >>> date1 = datetime.date(2021, 5, 30)
+        >>> date2 = datetime.date(2021, 6, 2)
+        >>> r.reserve_stay(date1, date2)
+        >>> r.release_stay(date1, datetime.date(2021, 6, 1))
+        >>> r.availability[(2021, 5)][30], r.availability[(2021, 6)][1]
+        (True, False)
+        """
+        with self.lock:
+            self.backend.release_stay(first_date, second_date)
         
         
     
@@ -255,6 +347,7 @@ class Room:
         Returns the first Room from the input list which happens to be available for\
         the specific dates and is of the correct room type. Returns None if no such room.
         
+        >>> import datetime
         >>> r1 = Room("Queen", 105, 80.0)
         >>> r2 = Room("Twin", 101, 55.0)
         >>> r3 = Room("Queen", 107, 80.0)
@@ -292,7 +385,7 @@ class Room:
         
         #iterate through each room in the input list to check availabiliy
         for room in room_list:
-            if room.is_available(date1, date2) and room.room_type == type_input:
+            if room.room_type == type_input and room.is_available(date1, date2):
                 return room
         
         #if there is no such room, return None
@@ -0,0 +1,351 @@
+#This program simulates a booking system of hotels for serving many clients at once.
+import doctest, datetime, random, asyncio, json, argparse, socket
+from concurrent.futures import ThreadPoolExecutor
+from room import Room
+from reservation import Reservation
+from hotel import Hotel
+from booking import Booking
+
+
+class BookingServer:
+    """ Represents a server answering requests against a Booking. Each request and each\
+    response is one line of JSON. Requests are handled one at a time on the event\
+    loop, so the hotels never see two of them at once, while saving the hotels runs\
+    in a thread of the executor on a snapshot.
+
+    A request is a dictionary with an "op" key:
+        {"op": "make", "hotel": str, "name": str, "room_type": str,
+         "check_in": "YYYY-MM-DD", "check_out": "YYYY-MM-DD"}
+        {"op": "cancel", "booking_number": int}
+        {"op": "lookup", "booking_number": int} or {"op": "lookup", "name": str}
+        {"op": "search", "hotel": str, "room_type": str, "check_in": str, "check_out": str}
+        (without "hotel", the search covers every hotel, see Booking.search)
+        {"op": "save"}
+    The response has "ok" set to True with the results, or to False with an "error".
+
+    Instance attributes: booking(Booking), hotels_by_name(dict), executor,
+                         save_locks(dict) """
+
+    def __init__(self, booking, executor = None):
+        """ (Booking,Executor) -> BookingServer
+        Initializes a server for the booking. Hotels are saved in the executor, a pool\
+        of one thread if none is given.
+        """
+        self.booking = booking
+        self.hotels_by_name = {}
+        for hotel in booking.hotels:
+            self.hotels_by_name[hotel.name] = hotel
+
+        if executor == None:
+            executor = ThreadPoolExecutor(1)
+        self.executor = executor
+        self.save_locks = {}
+
+
+
+    def get_hotel(self, request):
+        """ (dict) -> Hotel
+        Returns the hotel named in the request, raises AssertionError if there is none.
+        """
+        hotel = self.hotels_by_name.get(request.get('hotel'))
+        if hotel == None:
+            raise AssertionError("The hotel cannot be found.")
+        return hotel
+
+
+
+    @staticmethod
+    def get_dates(request):
+        """ (dict) -> date,date
+        Returns the check-in and check-out dates of the request.
+        """
+        date1 = datetime.date.fromisoformat(request['check_in'])
+        date2 = datetime.date.fromisoformat(request['check_out'])
+        return date1, date2
+
+
+
+    @staticmethod
+    def describe(hotel, rsv):
+        """ (Hotel,Reservation) -> dict
+        Returns a dictionary describing the reservation, to be sent as JSON.
+        """
+        room = rsv.room_reserved
+        return {'booking_number': rsv.booking_number, 'hotel': hotel.name,
+                'name': rsv.name, 'room_num': room.room_num, 'room_type': room.room_type,
+                'price': room.price, 'check_in': rsv.check_in.isoformat(),
+                'check_out': rsv.check_out.isoformat()}
+
+
+
+    def handle_request(self, request):
+        """ (dict) -> dict
+        Carries out a make, cancel, lookup or search request, returns the response.
+        Errors are returned in the response instead of being raised. Save requests\
+        are handled by handle_line, which can wait for the executor.
+
+        >>> random.seed(987)
+        >>> Reservation.booking_numbers = []
+        >>> r1 = Room("Queen", 105, 80.0)
+        >>> r2 = Room("Queen", 107, 80.0)
+        >>> for r in [r1, r2]:
+        ...     r.set_up_room_availability(['May'], 2021)
+        >>> server = BookingServer(Booking([Hotel("Secret Nugget Hotel", [r1, r2])]))
+        >>> request = {'op': 'make', 'hotel': 'Secret Nugget Hotel', 'name': 'Jack',\
+                       'room_type': 'Queen', 'check_in': '2021-05-03', 'check_out': '2021-05-10'}
+        >>> server.handle_request(request)
+        {'ok': True, 'booking_number': 1953400675629}
+        >>> server.handle_request({'op': 'lookup', 'name': 'Jack'})['reservations'][0]['room_num']
+        105
+        >>> request['op'] = 'search'
+        >>> server.handle_request(request)['rooms']
+        [{'room_num': 107, 'room_type': 'Queen', 'price': 80.0}]
+        >>> server.handle_request(dict(request, check_in = '2021-05-10'))
+        {'ok': False, 'error': 'The check in date does not happen to be earlier than the check out date.'}
+        >>> del request['hotel']
+        >>> server.handle_request(request)['hotels']
+        [{'hotel': 'Secret Nugget Hotel', 'free_rooms': 1, 'lowest_price': 560.0}]
+        >>> server.handle_request({'op': 'cancel', 'booking_number': 1953400675629})
+        {'ok': True}
+        >>> server.handle_request({'op': 'cancel', 'booking_number': 1953400675629})
+        {'ok': False, 'error': 'The booking number cannot be found.'}
+        >>> server.handle_request({'op': 'make', 'hotel': 'Overlook Hotel'})
+        {'ok': False, 'error': 'The hotel cannot be found.'}
+        >>> server.handle_request({'op': 'fly'})
+        {'ok': False, 'error': 'The operation is not supported.'}
+        """
+        try:
+            op = request.get('op')
+
+            if op == 'make':
+                hotel = self.get_hotel(request)
+                date1, date2 = BookingServer.get_dates(request)
+                booking_num = self.booking.make_reservation(hotel, request['name'],
+                                                            request['room_type'], date1, date2)
+                return {'ok': True, 'booking_number': booking_num}
+
+            if op == 'cancel':
+                if not self.booking.cancel_booking(int(request['booking_number'])):
+                    raise AssertionError("The booking number cannot be found.")
+                return {'ok': True}
+
+            if op == 'lookup':
+                found = []
+                if 'booking_number' in request:
+                    a_tuple = self.booking.get_reservation_for_booking_number(
+                        int(request['booking_number']))
+                    if a_tuple != None:
+                        found.append(BookingServer.describe(a_tuple[0], a_tuple[1]))
+                else:
+                    for hotel, rsv in self.booking.find_reservations(request['name']):
+                        found.append(BookingServer.describe(hotel, rsv))
+                return {'ok': True, 'reservations': found}
+
+            if op == 'search' and 'hotel' not in request:
+                date1, date2 = BookingServer.get_dates(request)
+                hotels = []
+                for hotel, free_rooms, price in self.booking.search(request['room_type'],
+                                                                    date1, date2):
+                    hotels.append({'hotel': hotel.name, 'free_rooms': free_rooms,
+                                   'lowest_price': price})
+                return {'ok': True, 'hotels': hotels}
+
+            if op == 'search':
+                hotel = self.get_hotel(request)
+                date1, date2 = BookingServer.get_dates(request)
+                rooms = []
+                for room in hotel.find_available_rooms(request['room_type'], date1, date2):
+                    rooms.append({'room_num': room.room_num, 'room_type': room.room_type,
+                                  'price': room.price})
+                return {'ok': True, 'rooms': rooms}
+
+            raise AssertionError("The operation is not supported.")
+
+        except (AssertionError, KeyError, ValueError, TypeError) as error:
+            #a missing field is reported by its name
+            if isinstance(error, KeyError):
+                return {'ok': False, 'error': "The request has no " + str(error) + "."}
+            return {'ok': False, 'error': str(error)}
+
+
+
+    async def save(self, hotel):
+        """ (Hotel) -> None
+        Saves the months of the hotel changed since its last save. A hotel with nothing\
+        to save is skipped. Otherwise a snapshot of the hotel(its lists of rooms and\
+        reservations, see Hotel.snapshot) is taken on the event loop, then written in\
+        the executor, so requests keep being answered while the files are written.\
+        Saves of one hotel never overlap.
+        """
+        lock = self.save_locks.setdefault(hotel.name, asyncio.Lock())
+        async with lock:
+            if not hotel.dirty_months and not hotel.info_dirty:
+                return
+
+            a_snapshot = hotel.snapshot()
+            dirty_months = set(a_snapshot.dirty_months)
+            info_dirty = a_snapshot.info_dirty
+
+            loop = asyncio.get_running_loop()
+            try:
+                await loop.run_in_executor(self.executor, a_snapshot.save_hotel, True)
+            except BaseException:
+                #the months were not written, save them next time
+                hotel.dirty_months.update(dirty_months)
+                hotel.info_dirty = hotel.info_dirty or info_dirty
+                raise
+
+
+
+    async def save_all(self):
+        """ (None) -> None
+        Saves every hotel of the booking in the executor.
+        """
+        await asyncio.gather(*[self.save(hotel) for hotel in self.booking.hotels])
+
+
+
+    async def handle_line(self, line):
+        """ (bytes) -> dict
+        Decodes one line of JSON, returns the response to the request.
+        """
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return {'ok': False, 'error': "The request is not valid JSON."}
+        if not isinstance(request, dict):
+            return {'ok': False, 'error': "The request is not a JSON object."}
+
+        if request.get('op') == 'save':
+            try:
+                await self.save_all()
+            except OSError as error:
+                return {'ok': False, 'error': str(error)}
+            return {'ok': True}
+
+        return self.handle_request(request)
+
+
+
+    async def handle_client(self, reader, writer):
+        """ (StreamReader,StreamWriter) -> None
+        Answers the requests of one client, one line each, until it disconnects.
+        """
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                response = await self.handle_line(line)
+                writer.write(json.dumps(response).encode('utf-8') + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+
+    async def autosave(self, interval):
+        """ (float) -> None
+        Saves the changed months of every hotel every interval seconds.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            await self.save_all()
+
+
+
+    async def start(self, host = '127.0.0.1', port = 0, path = None):
+        """ (str,int,str) -> Server
+        Starts listening on the TCP host and port, or on the Unix socket at path if\
+        given, returns the asyncio server.
+
+        >>> random.seed(987)
+        >>> Reservation.booking_numbers = []
+        >>> rooms = [Room("Queen", num, 80.0) for num in range(101, 151)]
+        >>> for r in rooms:
+        ...     r.set_up_room_availability(['May'], 2021)
+        >>> server = BookingServer(Booking([Hotel("Secret Nugget Hotel", rooms)]))
+        >>> async def client(port, i):
+        ...     reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        ...     request = {'op': 'make', 'hotel': 'Secret Nugget Hotel', 'name': str(i),\
+                           'room_type': 'Queen', 'check_in': '2021-05-03',\
+                           'check_out': '2021-05-10'}
+        ...     writer.write(json.dumps(request).encode('utf-8') + b"\\n")
+        ...     response = json.loads(await reader.readline())
+        ...     writer.close()
+        ...     return response['ok']
+        >>> async def main():
+        ...     a_server = await server.start()
+        ...     port = a_server.sockets[0].getsockname()[1]
+        ...     results = await asyncio.gather(*[client(port, i) for i in range(200)])
+        ...     a_server.close()
+        ...     await a_server.wait_closed()
+        ...     return results
+        >>> results = asyncio.run(main())
+        >>> results.count(True), results.count(False)
+        (50, 150)
+        """
+        if path != None:
+            return await asyncio.start_unix_server(self.handle_client, path)
+        return await asyncio.start_server(self.handle_client, host, port)
+
+
+
+    async def serve(self, host = '127.0.0.1', port = 8765, path = None, save_interval = None):
+        """ (str,int,str,float) -> None
+        Serves requests until cancelled, then saves the hotels one last time.
+        """
+        a_server = await self.start(host, port, path)
+        tasks = []
+        if save_interval:
+            tasks.append(asyncio.ensure_future(self.autosave(save_interval)))
+
+        try:
+            async with a_server:
+                await a_server.serve_forever()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await self.save_all()
+
+
+
+def send_request(request, host = '127.0.0.1', port = 8765, path = None):
+    """ (dict,str,int,str) -> dict
+    Sends one request to a running server and returns its response, for clients\
+    which do not use asyncio.
+    """
+    if path != None:
+        a_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        a_socket.connect(path)
+    else:
+        a_socket = socket.create_connection((host, port))
+
+    try:
+        a_socket.sendall(json.dumps(request).encode('utf-8') + b"\n")
+        file_object = a_socket.makefile('rb')
+        line = file_object.readline()
+        file_object.close()
+    finally:
+        a_socket.close()
+
+    return json.loads(line)
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Serves the hotels of the hotels folder.")
+    parser.add_argument('--host', default = '127.0.0.1')
+    parser.add_argument('--port', type = int, default = 8765)
+    parser.add_argument('--unix', help = "path of a Unix socket to listen on instead")
+    parser.add_argument('--save-interval', type = float, default = 60.0)
+    parser.add_argument('--workers', type = int, default = 1)
+    args = parser.parse_args()
+
+    server = BookingServer(Booking.load_system(args.workers))
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix, args.save_interval))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,575 @@
+#This program simulates a booking system of hotels for storing hotels in a SQLite database.
+import doctest, datetime, random, os, sqlite3, threading, shutil
+from room import Room, MONTHS
+from reservation import Reservation, BookingNumberRegistry
+from hotel import Hotel
+from availability import days_in_month, month_spans
+
+
+DATABASE_FILE = "hotels.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS hotels (
+    hotel_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    folder TEXT NOT NULL UNIQUE);
+
+CREATE TABLE IF NOT EXISTS rooms (
+    hotel_id INTEGER NOT NULL,
+    room_num INTEGER NOT NULL,
+    room_type TEXT NOT NULL,
+    price REAL NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (hotel_id, room_num));
+CREATE INDEX IF NOT EXISTS rooms_by_type ON rooms (hotel_id, room_type, position);
+
+CREATE TABLE IF NOT EXISTS room_months (
+    hotel_id INTEGER NOT NULL,
+    room_num INTEGER NOT NULL,
+    first_night INTEGER NOT NULL,
+    end_night INTEGER NOT NULL,
+    PRIMARY KEY (hotel_id, room_num, first_night)) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS reservations (
+    booking_number INTEGER PRIMARY KEY,
+    hotel_id INTEGER NOT NULL,
+    room_num INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    check_in INTEGER NOT NULL,
+    check_out INTEGER NOT NULL);
+CREATE INDEX IF NOT EXISTS reservations_by_name ON reservations (name);
+CREATE INDEX IF NOT EXISTS reservations_by_room ON reservations (hotel_id, room_num, check_in);
+CREATE INDEX IF NOT EXISTS reservations_by_dates ON reservations (hotel_id, check_in, check_out);
+"""
+
+#the stays of a room do not overlap, so the last stay starting before the check-out date
+#is the only one which can still be there on the check-in date
+LAST_STAY_QUERY = """
+SELECT check_out FROM reservations
+WHERE hotel_id = ? AND room_num = ? AND check_in < ?
+ORDER BY check_in DESC LIMIT 1"""
+
+MONTHS_SET_UP_QUERY = """
+SELECT COUNT(*) FROM room_months
+WHERE hotel_id = ? AND room_num = ? AND first_night < ? AND end_night > ?"""
+
+AVAILABLE_ROOM_QUERY = """
+SELECT room_num FROM rooms AS r
+WHERE r.hotel_id = ? AND r.room_type = ?
+AND (SELECT COUNT(*) FROM room_months AS m
+     WHERE m.hotel_id = r.hotel_id AND m.room_num = r.room_num
+     AND m.first_night < ? AND m.end_night > ?) = ?
+AND COALESCE((SELECT s.check_out FROM reservations AS s
+              WHERE s.hotel_id = r.hotel_id AND s.room_num = r.room_num AND s.check_in < ?
+              ORDER BY s.check_in DESC LIMIT 1), 0) <= ?
+ORDER BY r.position LIMIT 1"""
+
+
+class SQLiteStore:
+    """ Represents a SQLite database keeping the hotels, their rooms, the months set up\
+    for each room and the reservations, as an alternative to the CSV files of the\
+    hotels folder. The nights are kept as date ordinals. Every change is made in a\
+    transaction, and the availability of a room is answered by indexed queries\
+    without loading the hotel.
+
+    Instance attributes: path(str), connection(sqlite3.Connection), lock(threading.RLock) """
+
+    def __init__(self, path = DATABASE_FILE):
+        """ (str) -> SQLiteStore
+        Keeps the path of the database, which is opened and created on first use.
+        """
+        self.path = path
+        self.connection = None
+        self.lock = threading.RLock()
+
+
+
+    def connect(self):
+        """ (None) -> sqlite3.Connection
+        Returns the connection to the database, opening it and creating the tables\
+        and indexes the first time.
+        """
+        with self.lock:
+            if self.connection is None:
+                #transactions are begun explicitly, the connection is shared by threads
+                self.connection = sqlite3.connect(self.path, isolation_level = None,
+                                                  check_same_thread = False)
+                self.connection.executescript(SCHEMA)
+            return self.connection
+
+
+
+    def close(self):
+        """ (None) -> None
+        Closes the connection to the database if it is open.
+        """
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+
+
+
+    def execute(self, query, parameters = ()):
+        """ (str,tuple) -> list
+        Runs the query outside of any transaction, returns all the rows of its result.
+        """
+        with self.lock:
+            return self.connect().execute(query, parameters).fetchall()
+
+
+
+    def begin(self):
+        """ (None) -> sqlite3.Connection
+        Begins a transaction which takes the write lock of the database at once, so\
+        that the checks made in it still hold when it writes. Returns the connection.
+        The lock of the store must be held.
+        """
+        connection = self.connect()
+        connection.execute("BEGIN IMMEDIATE")
+        return connection
+
+
+
+    def hotel_folders(self):
+        """ (None) -> list
+        Returns the folder names of the hotels in the database, in the order they were\
+        first saved.
+        """
+        return [row[0] for row in self.execute("SELECT folder FROM hotels ORDER BY hotel_id")]
+
+
+
+    def get_hotel_id(self, folder_name):
+        """ (str) -> int
+        Returns the id of the hotel with the given folder name, raises AssertionError\
+        if it is not in the database.
+        """
+        rows = self.execute("SELECT hotel_id FROM hotels WHERE folder = ?", (folder_name,))
+        if len(rows) == 0:
+            raise AssertionError("The hotel cannot be found.")
+        return rows[0][0]
+
+
+
+    def save_hotel(self, hotel, connection = None):
+        """ (Hotel,sqlite3.Connection) -> None
+        Replaces the rooms, months and reservations of the hotel in the database with\
+        the ones of the given Hotel object, in one transaction. If the hotel was loaded\
+        for some nights only(see load_hotel), only the months and reservations of those\
+        nights are replaced. If a connection is given, its transaction is used instead.
+        """
+        folder_name = hotel.get_folder_name()
+        rooms = []
+        months = []
+        for position in range(len(hotel.rooms)):
+            room = hotel.rooms[position]
+            rooms.append((room.room_num, room.room_type, room.price, position))
+            for year, month in room.availability:
+                first = datetime.date(year, month, 1).toordinal()
+                months.append((room.room_num, first, first + days_in_month(year, month)))
+        stays = []
+        for rsv in hotel.reservations.values():
+            stays.append((rsv.booking_number, rsv.room_reserved.room_num, rsv.name,
+                          rsv.check_in.toordinal(), rsv.check_out.toordinal()))
+
+        with self.lock:
+            own_transaction = connection is None
+            if own_transaction:
+                connection = self.begin()
+            try:
+                connection.execute("INSERT OR IGNORE INTO hotels (name, folder) VALUES (?, ?)",
+                                   (hotel.name, folder_name))
+                connection.execute("UPDATE hotels SET name = ? WHERE folder = ?",
+                                   (hotel.name, folder_name))
+                hotel_id = connection.execute("SELECT hotel_id FROM hotels WHERE folder = ?",
+                                              (folder_name,)).fetchone()[0]
+
+                connection.execute("DELETE FROM rooms WHERE hotel_id = ?", (hotel_id,))
+                if hotel.loaded_nights == None:
+                    for table in ["room_months", "reservations"]:
+                        connection.execute("DELETE FROM " + table + " WHERE hotel_id = ?",
+                                           (hotel_id,))
+                else:
+                    first, end = hotel.loaded_nights
+                    connection.execute("DELETE FROM room_months WHERE hotel_id = ? AND " +
+                                       "first_night >= ? AND first_night < ?",
+                                       (hotel_id, first, end))
+                    connection.execute("DELETE FROM reservations WHERE hotel_id = ? AND " +
+                                       "check_in < ? AND check_out > ?", (hotel_id, end, first))
+                connection.executemany("INSERT INTO rooms VALUES (?, ?, ?, ?, ?)",
+                                       [(hotel_id,) + row for row in rooms])
+                connection.executemany("INSERT INTO room_months VALUES (?, ?, ?, ?)",
+                                       [(hotel_id,) + row for row in months])
+                connection.executemany("INSERT INTO reservations VALUES (?, ?, ?, ?, ?, ?)",
+                                       [(row[0], hotel_id) + row[1:] for row in stays])
+                if own_transaction:
+                    connection.execute("COMMIT")
+            except BaseException:
+                if own_transaction:
+                    connection.execute("ROLLBACK")
+                raise
+
+
+
+    def load_hotel(self, folder_name, backend = None, date1 = None, date2 = None):
+        """ (str,class,date,date) -> Hotel
+        Creates and returns a Hotel object with the rooms, months and reservations of\
+        the hotel with the given folder name in the database. The rooms keep their\
+        availability in the given backend. Reservations whose booking number is already\
+        in use are skipped, as with the CSV files.
+
+        Loading the whole hotel costs time and memory in proportion to all its months\
+        and reservations. With date1 and date2, only the months from the month of date1\
+        to the month of the night before date2 are loaded, widened by whole months until\
+        every stay they overlap is loaded too, and the hotel keeps these nights in\
+        loaded_nights. Such a hotel knows nothing of the other months: its rooms are not\
+        available then. Ask the store itself(is_available, find_available_room,\
+        make_reservation, find_reservations), which answers from its indexes without\
+        loading anything, about the other nights.
+
+        >>> random.seed(987)
+        >>> Reservation.booking_numbers = []
+        >>> r1 = Room("Double", 237, 99.99)
+        >>> r1.set_up_room_availability(['Oct', 'Nov', 'Dec'], 2021)
+        >>> h = Hotel("Queen Elizabeth Hotel", [r1], {})
+        >>> num = h.make_reservation("Jack", "Double", datetime.date(2021, 10, 30),\
+                                     datetime.date(2021, 12, 23))
+        >>> store = SQLiteStore(':memory:')
+        >>> store.save_hotel(h)
+        >>> Reservation.booking_numbers = []
+        >>> hotel = store.load_hotel('queen_elizabeth_hotel')
+        >>> print(hotel.reservations[1953400675629])
+        Booking number: 1953400675629
+        Name: Jack
+        Room reserved: Room 237,Double,99.99
+        Check-in date: 2021-10-30
+        Check-out date: 2021-12-23
+        >>> sorted(hotel.rooms[0].availability)
+        [(2021, 10), (2021, 11), (2021, 12)]
+        >>> hotel.rooms[0].is_available(datetime.date(2021, 12, 23), datetime.date(2022, 1, 1))
+        True
+
+        >>> h.rooms[0].set_up_room_availability(['Jan', 'Feb'], 2022)
+        >>> num2 = h.make_reservation("Jill", "Double", datetime.date(2022, 2, 3),\
+                                      datetime.date(2022, 2, 5))
+        >>> store.save_hotel(h)
+        >>> Reservation.booking_numbers = []
+        >>> hotel = store.load_hotel('queen_elizabeth_hotel', None, datetime.date(2022, 2, 1),\
+                                     datetime.date(2022, 3, 1))
+        >>> sorted(hotel.rooms[0].availability), list(hotel.reservations) == [num2]
+        ([(2022, 2)], True)
+        >>> hotel = store.load_hotel('queen_elizabeth_hotel', None, datetime.date(2021, 11, 5),\
+                                     datetime.date(2021, 11, 6))
+        >>> sorted(hotel.rooms[0].availability), list(hotel.reservations) == [num]
+        ([(2021, 10), (2021, 11), (2021, 12)], True)
+        >>> hotel.cancel_reservation(num)
+        >>> store.save_hotel(hotel)
+        >>> store.find_reservations('queen_elizabeth_hotel') == [num2]
+        True
+        >>> len(store.execute("SELECT * FROM room_months"))
+        5
+        """
+        hotel_id = self.get_hotel_id(folder_name)
+        hotel_name = self.execute("SELECT name FROM hotels WHERE hotel_id = ?", (hotel_id,))[0][0]
+
+        #find the nights to load, widened to whole months and to the stays they overlap
+        loaded_nights = None
+        if date1 != None:
+            first = datetime.date(date1.year, date1.month, 1).toordinal()
+            last_night = date2 - datetime.timedelta(days = 1)
+            end = datetime.date(last_night.year, last_night.month, 1).toordinal() + \
+                  days_in_month(last_night.year, last_night.month)
+            while True:
+                check_in, check_out = self.execute("SELECT MIN(check_in), MAX(check_out) " +
+                                                   "FROM reservations WHERE hotel_id = ? " +
+                                                   "AND check_in < ? AND check_out > ?",
+                                                   (hotel_id, end, first))[0]
+                if check_in == None or (check_in >= first and check_out <= end):
+                    break
+                first = min(first, datetime.date.fromordinal(check_in).replace(day = 1).toordinal())
+                last_night = datetime.date.fromordinal(max(end, check_out) - 1)
+                end = datetime.date(last_night.year, last_night.month, 1).toordinal() + \
+                      days_in_month(last_night.year, last_night.month)
+            loaded_nights = (first, end)
+
+        list_rooms = []
+        rooms_by_num = {}
+        for room_num, room_type, price in self.execute("SELECT room_num, room_type, price " +
+                                                       "FROM rooms WHERE hotel_id = ? " +
+                                                       "ORDER BY position", (hotel_id,)):
+            room = Room(room_type, room_num, price, backend)
+            list_rooms.append(room)
+            rooms_by_num[room_num] = room
+
+        months_query = "SELECT room_num, first_night FROM room_months WHERE hotel_id = ?"
+        stays_query = "SELECT booking_number, room_num, name, check_in, check_out " + \
+                      "FROM reservations WHERE hotel_id = ?"
+        parameters = (hotel_id,)
+        if loaded_nights != None:
+            months_query += " AND first_night >= ? AND first_night < ?"
+            stays_query += " AND check_in < ? AND check_out > ?"
+            parameters = (hotel_id, loaded_nights[0], loaded_nights[1])
+
+        for room_num, first_night in self.execute(months_query + " ORDER BY room_num, first_night",
+                                                  parameters):
+            first = datetime.date.fromordinal(first_night)
+            rooms_by_num[room_num].set_up_room_availability([MONTHS[first.month - 1]], first.year)
+
+        hotel = Hotel(hotel_name, list_rooms, shared = True)
+        hotel.loaded_nights = loaded_nights
+
+        registry = Reservation.get_registry()
+        stays_parameters = parameters
+        if loaded_nights != None:
+            stays_parameters = (hotel_id, loaded_nights[1], loaded_nights[0])
+        for booking_num, room_num, name, check_in, check_out in \
+            self.execute(stays_query, stays_parameters):
+            if booking_num in registry or room_num not in rooms_by_num:
+                continue
+            rsv = Reservation(name, rooms_by_num[room_num], datetime.date.fromordinal(check_in),
+                              datetime.date.fromordinal(check_out), booking_num)
+            hotel.reservations[booking_num] = rsv
+            hotel.add_to_indexes(rsv)
+
+        hotel.info_dirty = False
+        return hotel
+
+
+
+    def is_available(self, folder_name, room_num, date1, date2):
+        """ (str,int,date,date) -> bool
+        Returns True if every night from date1(included) to date2(excluded) has been\
+        set up for the room and is not booked, with two indexed queries.
+        """
+        hotel_id = self.get_hotel_id(folder_name)
+        first = date1.toordinal()
+        end = date2.toordinal()
+
+        months = self.execute(MONTHS_SET_UP_QUERY, (hotel_id, room_num, end, first))[0][0]
+        if months != len(month_spans(date1, date2)):
+            return False
+
+        last_stay = self.execute(LAST_STAY_QUERY, (hotel_id, room_num, end))
+        return len(last_stay) == 0 or last_stay[0][0] <= first
+
+
+
+    def find_available_room(self, folder_name, room_type, date1, date2, connection = None):
+        """ (str,str,date,date,sqlite3.Connection) -> int
+        Returns the number of the first room of the given type, in the order of the\
+        rooms of the hotel, which is available from date1(included) to date2(excluded),\
+        or None if there is none.
+        """
+        hotel_id = self.get_hotel_id(folder_name)
+        first = date1.toordinal()
+        end = date2.toordinal()
+        parameters = (hotel_id, room_type, end, first, len(month_spans(date1, date2)), end, first)
+
+        with self.lock:
+            if connection is None:
+                connection = self.connect()
+            row = connection.execute(AVAILABLE_ROOM_QUERY, parameters).fetchone()
+        if row == None:
+            return None
+        return row[0]
+
+
+
+    def make_reservation(self, folder_name, name, room_type, date1, date2):
+        """ (str,str,str,date,date) -> int
+        Books the first available room of the given type in the database, returns the\
+        booking number of the reservation. Finding the room and booking it are done in\
+        one transaction, so two processes sharing the database never book the same\
+        night of a room. Raises AssertionError if no room is available.
+
+        >>> random.seed(987)
+        >>> Reservation.booking_numbers = []
+        >>> rooms = [Room("Queen", 105, 80.0), Room("Queen", 107, 80.0)]
+        >>> for r in rooms:
+        ...     r.set_up_room_availability(['May'], 2021)
+        >>> store = SQLiteStore(':memory:')
+        >>> store.save_hotel(Hotel("Secret Nugget Hotel", rooms))
+        >>> num1 = store.make_reservation('secret_nugget_hotel', "Jack", "Queen",\
+                                          datetime.date(2021, 5, 3), datetime.date(2021, 5, 10))
+        >>> num2 = store.make_reservation('secret_nugget_hotel', "Judy", "Queen",\
+                                          datetime.date(2021, 5, 9), datetime.date(2021, 5, 12))
+        >>> store.get_reservation(num2)
+        ('secret_nugget_hotel', 107, 'Judy', datetime.date(2021, 5, 9), datetime.date(2021, 5, 12))
+        >>> store.make_reservation('secret_nugget_hotel', "Dale", "Queen",\
+                                   datetime.date(2021, 5, 9), datetime.date(2021, 5, 10))
+        Traceback (most recent call last):
+        AssertionError: No room of the given type is available.
+        >>> store.is_available('secret_nugget_hotel', 105, datetime.date(2021, 5, 10),\
+                               datetime.date(2021, 6, 1))
+        True
+        >>> store.is_available('secret_nugget_hotel', 105, datetime.date(2021, 5, 10),\
+                               datetime.date(2021, 6, 2))
+        False
+        >>> store.cancel_reservation(num1)
+        >>> store.find_available_room('secret_nugget_hotel', "Queen", datetime.date(2021, 5, 9),\
+                                      datetime.date(2021, 5, 10))
+        105
+
+        A number already in the database is given back before another is drawn.
+        >>> random.seed(987)
+        >>> Reservation.booking_numbers = []
+        >>> Reservation.get_registry().allocate() == num1
+        True
+        >>> num3 = store.make_reservation('secret_nugget_hotel', "Dale", "Queen",\
+                                          datetime.date(2021, 5, 20), datetime.date(2021, 5, 21))
+        >>> num3 != num2, num2 in Reservation.booking_numbers, len(Reservation.booking_numbers)
+        (True, False, 1)
+        """
+        if date1 >= date2:
+            raise AssertionError("The check in date does not happen to be earlier "+
+                                 "than the check out date.")
+        hotel_id = self.get_hotel_id(folder_name)
+        registry = Reservation.get_registry()
+
+        with self.lock:
+            connection = self.begin()
+            booking_num = None
+            try:
+                room_num = self.find_available_room(folder_name, room_type, date1, date2,
+                                                    connection)
+                if room_num == None:
+                    raise AssertionError("No room of the given type is available.")
+
+                #draw numbers until one is used neither in this process nor in the database,
+                #giving back each number already taken in the database
+                while True:
+                    booking_num = registry.add_new()
+                    try:
+                        connection.execute("INSERT INTO reservations VALUES (?, ?, ?, ?, ?, ?)",
+                                           (booking_num, hotel_id, room_num, name,
+                                            date1.toordinal(), date2.toordinal()))
+                        break
+                    except sqlite3.IntegrityError:
+                        registry.release(booking_num)
+                        booking_num = None
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                if booking_num != None:
+                    registry.release(booking_num)
+                raise
+
+        return booking_num
+
+
+
+    def cancel_reservation(self, booking_num):
+        """ (int) -> None
+        Deletes the reservation with the given booking number from the database, raises\
+        AssertionError if there is none.
+        """
+        with self.lock:
+            cursor = self.connect().execute("DELETE FROM reservations WHERE booking_number = ?",
+                                            (booking_num,))
+            if cursor.rowcount == 0:
+                raise AssertionError("The booking number cannot be found.")
+        Reservation.get_registry().release(booking_num)
+
+
+
+    def get_reservation(self, booking_num):
+        """ (int) -> tuple
+        Returns a tuple of the folder name of the hotel, the room number, the name, the\
+        check-in and check-out dates of the reservation, or None if there is none.
+        """
+        rows = self.execute("SELECT h.folder, r.room_num, r.name, r.check_in, r.check_out " +
+                            "FROM reservations AS r JOIN hotels AS h ON h.hotel_id = r.hotel_id " +
+                            "WHERE r.booking_number = ?", (booking_num,))
+        if len(rows) == 0:
+            return None
+        folder, room_num, name, check_in, check_out = rows[0]
+        return (folder, room_num, name, datetime.date.fromordinal(check_in),
+                datetime.date.fromordinal(check_out))
+
+
+
+    def find_reservations(self, folder_name, name = None, date1 = None, date2 = None):
+        """ (str,str,date,date) -> list
+        Returns the booking numbers of the reservations of the hotel made under the\
+        given name and staying at least one night from date1(included) to\
+        date2(excluded), the conditions not given being left out.
+
+        >>> random.seed(987)
+        >>> Reservation.booking_numbers = []
+        >>> r1 = Room("Queen", 105, 80.0)
+        >>> r1.set_up_room_availability(['May', 'Jun'], 2021)
+        >>> store = SQLiteStore(':memory:')
+        >>> store.save_hotel(Hotel("Secret Nugget Hotel", [r1]))
+        >>> num1 = store.make_reservation('secret_nugget_hotel', "Jack", "Queen",\
+                                          datetime.date(2021, 5, 3), datetime.date(2021, 5, 10))
+        >>> num2 = store.make_reservation('secret_nugget_hotel', "Judy", "Queen",\
+                                          datetime.date(2021, 6, 3), datetime.date(2021, 6, 5))
+        >>> store.find_reservations('secret_nugget_hotel', name = "Judy") == [num2]
+        True
+        >>> store.find_reservations('secret_nugget_hotel', date1 = datetime.date(2021, 5, 9),\
+                                    date2 = datetime.date(2021, 6, 4)) == [num1, num2]
+        True
+        """
+        query = "SELECT booking_number FROM reservations WHERE hotel_id = ?"
+        parameters = [self.get_hotel_id(folder_name)]
+        if name != None:
+            query += " AND name = ?"
+            parameters.append(name)
+        if date2 != None:
+            query += " AND check_in < ?"
+            parameters.append(date2.toordinal())
+        if date1 != None:
+            query += " AND check_out > ?"
+            parameters.append(date1.toordinal())
+        query += " ORDER BY check_in, booking_number"
+        return [row[0] for row in self.execute(query, tuple(parameters))]
+
+
+
+def migrate_csv_to_sqlite(store, folder_list = None):
+    """ (SQLiteStore,list) -> int
+    Loads every hotel of the hotels folder(or of the given folders) from its CSV files\
+    and saves them all in the database in one transaction. Returns the number of\
+    reservations saved. The booking numbers in use are left as they were.
+
+    >>> registry = Reservation.booking_numbers
+    >>> store = SQLiteStore(':memory:')
+    >>> migrate_csv_to_sqlite(store, ['overlook_hotel']) > 0
+    True
+    >>> Reservation.booking_numbers = []
+    >>> hotel = Hotel.load_hotel('overlook_hotel', store = store)
+    >>> print(hotel.reservations[9998701091820].room_reserved)
+    Room 237,Twin,99.99
+    >>> Reservation.booking_numbers = registry
+    """
+    if folder_list == None:
+        folder_list = []
+        for folder in os.listdir('hotels'):
+            if folder[0] != "." and os.path.isdir('hotels/' + folder):
+                folder_list.append(folder)
+
+    #each hotel is loaded with its own registry, as the database has the booking numbers
+    registry = Reservation.booking_numbers
+    count = 0
+    with store.lock:
+        connection = store.begin()
+        try:
+            for folder in folder_list:
+                Reservation.booking_numbers = BookingNumberRegistry()
+                hotel = Hotel.load_hotel(folder)
+                store.save_hotel(hotel, connection)
+                count += len(hotel.reservations)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        finally:
+            Reservation.booking_numbers = registry
+
+    return count
+
+
+
+if __name__ == "__main__":
+    doctest.testmod()
@@ -0,0 +1,475 @@
+#This program simulates a booking system of hotels for recording and replaying its operations.
+import doctest, datetime, random, os, time, csv, gzip, threading, functools, argparse, inspect
+from concurrent.futures import ProcessPoolExecutor
+from room import Room
+from reservation import Reservation, BookingNumberRegistry
+from hotel import Hotel
+from booking import Booking
+from instrumentation import Histogram
+
+#the kind of each record, and the operation type it is reported under
+MAKE = 'M'
+CANCEL = 'C'
+LOOKUP = 'L'
+LOOKUP_LIST = 'N'
+FIND = 'F'
+OPERATION_TYPES = {MAKE: 'make', CANCEL: 'cancel', LOOKUP: 'lookup', LOOKUP_LIST: 'lookup',
+                   FIND: 'find'}
+
+#the methods of Booking recorded, with the kind of their records
+RECORDED_METHODS = {'make_reservation': MAKE, 'cancel_booking': CANCEL,
+                    'get_reservation_for_booking_number': LOOKUP,
+                    'get_reservations_for_booking_numbers': LOOKUP_LIST,
+                    'find_reservations': FIND}
+
+
+def open_trace(path, mode):
+    """ (str,str) -> file
+    Opens the trace file at path for reading('r') or writing('w') as text, compressed\
+    with gzip if its name ends with .gz.
+    """
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', newline = '')
+    return open(path, mode, newline = '')
+
+
+
+def to_field(value):
+    """ (object) -> str
+    Returns the value as a field of a record, dates as their ordinal and None as an\
+    empty field.
+    """
+    if value is None:
+        return ''
+    if isinstance(value, datetime.date):
+        return str(value.toordinal())
+    return str(value)
+
+
+
+def to_date(field):
+    """ (str) -> date
+    Returns the date of a field written by to_field, None if the field is empty.
+    """
+    if field == '':
+        return None
+    return datetime.date.fromordinal(int(field))
+
+
+
+class TraceRecorder:
+    """ Represents the recording of the operations served by a Booking to a trace file,\
+    one tab separated record per operation with the time it started, in seconds from\
+    the start of the recording:
+        M time hotel name room_type check-in check-out booking number(empty if failed)
+        C time booking number
+        L time booking number
+        N time booking numbers separated by commas
+        F time name hotel_name room_num check-in check-out(empty fields if not given)
+    The dates are kept as ordinals. Only the outermost operation is recorded when one\
+    operation calls another.
+
+    Instance attributes: path(str), file_object, writer, start(float),
+                         lock(threading.Lock), depth(threading.local), booking(Booking) """
+
+    def __init__(self, path):
+        """ (str) -> TraceRecorder
+        Opens the trace file at path, compressed if its name ends with .gz.
+        """
+        self.path = path
+        self.file_object = open_trace(path, 'w')
+        self.writer = csv.writer(self.file_object, delimiter = '\t', lineterminator = '\n')
+        self.start = time.perf_counter()
+        self.lock = threading.Lock()
+        self.depth = threading.local()
+        self.booking = None
+
+
+
+    def write(self, kind, started, fields):
+        """ (str,float,list) -> None
+        Writes a record of the given kind with the time it started.
+        """
+        with self.lock:
+            self.writer.writerow([kind, "%.6f" % (started - self.start)] +
+                                 [to_field(field) for field in fields])
+
+
+
+    def wrap(self, method, kind):
+        """ (method,str) -> function
+        Returns a function which calls the bound method of the booking and records it.\
+        The arguments may be given by position or by keyword, they are recorded in the\
+        order of the parameters of the method, with the defaults of those not given.
+
+        >>> random.seed(987)
+        >>> Reservation.booking_numbers = []
+        >>> r1 = Room("Queen", 105, 80.0)
+        >>> r1.set_up_room_availability(['May'], 2021)
+        >>> booking = Booking([Hotel("Secret Nugget Hotel", [r1])])
+        >>> recorder = TraceRecorder('trace_test.tsv')
+        >>> recorder.attach(booking)
+        >>> found = booking.find_reservations(hotel_name = "Secret Nugget Hotel", name = "Jack")
+        >>> num = booking.make_reservation(booking.hotels[0], "Jack", "Queen",\
+                                           date2 = datetime.date(2021, 5, 10),\
+                                           date1 = datetime.date(2021, 5, 3))
+        >>> recorder.close()
+        >>> [record[:1] + record[2:] for record in read_trace('trace_test.tsv')]
+        [['F', 'Jack', 'Secret Nugget Hotel', '', '', ''], \
+['M', 'Secret Nugget Hotel', 'Jack', 'Queen', '737913', '737920', '1953400675629']]
+        >>> os.remove('trace_test.tsv')
+        """
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            depth = getattr(self.depth, 'value', 0)
+            started = time.perf_counter()
+            self.depth.value = depth + 1
+            result = None
+            try:
+                result = method(*args, **kwargs)
+                return result
+            finally:
+                self.depth.value = depth
+                if depth == 0:
+                    self.write(kind, started, self.fields(kind, tuple(bound.arguments.values()),
+                                                          result))
+
+        return wrapper
+
+
+
+    @staticmethod
+    def fields(kind, args, result):
+        """ (str,tuple,object) -> list
+        Returns the fields of the record of an operation of the given kind called with\
+        the given arguments.
+        """
+        if kind == MAKE:
+            hotel, name, room_type, date1, date2 = args
+            return [hotel.name, name, room_type, date1, date2, result]
+        if kind == LOOKUP_LIST:
+            return [",".join([str(booking_num) for booking_num in args[0]])]
+        if kind == FIND:
+            return list(args) + [None] * (5 - len(args))
+        return [args[0]]
+
+
+
+    def attach(self, booking):
+        """ (Booking) -> None
+        Records every operation served by the booking from now on.
+
+        >>> random.seed(987)
+        >>> Reservation.booking_numbers = []
+        >>> r1 = Room("Queen", 105, 80.0)
+        >>> r1.set_up_room_availability(['May'], 2021)
+        >>> booking = Booking([Hotel("Secret Nugget Hotel", [r1])])
+        >>> recorder = TraceRecorder('trace_test.tsv')
+        >>> recorder.attach(booking)
+        >>> num = booking.make_reservation(booking.hotels[0], "Jack", "Queen",\
+                                           datetime.date(2021, 5, 3), datetime.date(2021, 5, 10))
+        >>> found = booking.find_reservations("Jack")
+        >>> booking.cancel_booking(num)
+        True
+        >>> recorder.close()
+        >>> [record[:1] + record[2:] for record in read_trace('trace_test.tsv')]
+        [['M', 'Secret Nugget Hotel', 'Jack', 'Queen', '737913', '737920', '1953400675629'], \
+['F', 'Jack', '', '', '', ''], ['C', '1953400675629']]
+        >>> os.remove('trace_test.tsv')
+        """
+        self.booking = booking
+        for method_name, kind in RECORDED_METHODS.items():
+            setattr(booking, method_name, self.wrap(getattr(booking, method_name), kind))
+
+
+
+    def detach(self):
+        """ (None) -> None
+        Stops recording the operations of the booking.
+        """
+        if self.booking is not None:
+            for method_name in RECORDED_METHODS:
+                delattr(self.booking, method_name)
+            self.booking = None
+
+
+
+    def close(self):
+        """ (None) -> None
+        Stops recording and closes the trace file.
+        """
+        self.detach()
+        with self.lock:
+            self.file_object.close()
+
+
+
+def read_trace(path):
+    """ (str) -> list
+    Returns the records of the trace file at path, as lists of strings.
+    """
+    file_object = open_trace(path, 'r')
+    records = list(csv.reader(file_object, delimiter = '\t'))
+    file_object.close()
+    return records
+
+
+
+def replay_trace(booking, records, rate = None, speed = None):
+    """ (Booking,list,float,float) -> dict
+    Runs the operations of the records against the booking. By default they run one\
+    after the other at full speed. With a rate, they are started rate times a second,
+    and with a speed, at the times they were recorded divided by the speed. The\
+    latency of an operation is counted from the time it should have started, so the\
+    time spent waiting behind slower operations is counted too. Booking numbers given\
+    by the recorded reservations are replaced by the ones given in the replay.
+
+    Returns a dictionary with the 'elapsed' seconds, and for each operation type the\
+    list of 'latencies' in seconds and the number of 'errors'(operations raising an\
+    AssertionError and cancellations of unknown booking numbers).
+
+    >>> random.seed(987)
+    >>> Reservation.booking_numbers = []
+    >>> def new_booking():
+    ...     rooms = [Room("Queen", 105, 80.0), Room("Queen", 107, 80.0)]
+    ...     for r in rooms:
+    ...         r.set_up_room_availability(['May'], 2021)
+    ...     return Booking([Hotel("Secret Nugget Hotel", rooms)])
+    >>> booking = new_booking()
+    >>> recorder = TraceRecorder('trace_test.tsv.gz')
+    >>> recorder.attach(booking)
+    >>> for day in range(1, 6):
+    ...     num = booking.make_reservation(booking.hotels[0], "Guest " + str(day), "Queen",\
+                                           datetime.date(2021, 5, day), datetime.date(2021, 5, 8))
+    Traceback (most recent call last):
+    AssertionError: No room of the given type is available.
+    >>> found = booking.get_reservations_for_booking_numbers([num, 123])
+    >>> booking.cancel_booking(num)
+    True
+    >>> recorder.close()
+
+    The replay gets new booking numbers, yet cancels the reservation it made.
+    >>> Reservation.booking_numbers = []
+    >>> replayed = new_booking()
+    >>> results = replay_trace(replayed, read_trace('trace_test.tsv.gz'))
+    >>> [(op, len(results['latencies'][op]), results['errors'][op]) for op in sorted(results['errors'])]
+    [('cancel', 1, 0), ('lookup', 1, 0), ('make', 3, 1)]
+    >>> sorted(rsv.name for rsv in replayed.hotels[0].reservations.values())
+    ['Guest 1']
+    >>> os.remove('trace_test.tsv.gz')
+    """
+    hotels_by_name = {}
+    for hotel in booking.hotels:
+        hotels_by_name[hotel.name] = hotel
+
+    #the booking numbers recorded, to the ones given by the replay
+    numbers = {}
+    latencies = {}
+    errors = {}
+    start = time.perf_counter()
+
+    for i in range(len(records)):
+        record = records[i]
+        kind = record[0]
+        op = OPERATION_TYPES[kind]
+
+        #wait until the operation should start, unless running at full speed
+        if rate != None:
+            scheduled = start + i / rate
+        elif speed != None:
+            scheduled = start + float(record[1]) / speed
+        else:
+            scheduled = time.perf_counter()
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+        failed = False
+        try:
+            if kind == MAKE:
+                booking_num = booking.make_reservation(hotels_by_name[record[2]], record[3],
+                                                       record[4], to_date(record[5]),
+                                                       to_date(record[6]))
+                if record[7] != '':
+                    numbers[int(record[7])] = booking_num
+            elif kind == CANCEL:
+                booking_num = int(record[2])
+                failed = not booking.cancel_booking(numbers.get(booking_num, booking_num))
+            elif kind == LOOKUP:
+                booking_num = int(record[2])
+                booking.get_reservation_for_booking_number(numbers.get(booking_num, booking_num))
+            elif kind == LOOKUP_LIST:
+                booking_num_list = []
+                for field in record[2].split(','):
+                    if field != '':
+                        booking_num_list.append(numbers.get(int(field), int(field)))
+                booking.get_reservations_for_booking_numbers(booking_num_list)
+            else:
+                room_num = None
+                if record[4] != '':
+                    room_num = int(record[4])
+                booking.find_reservations(record[2] or None, record[3] or None, room_num,
+                                          to_date(record[5]), to_date(record[6]))
+        except AssertionError:
+            failed = True
+
+        latencies.setdefault(op, []).append(time.perf_counter() - scheduled)
+        errors[op] = errors.get(op, 0) + failed
+
+    return {'elapsed': time.perf_counter() - start, 'latencies': latencies, 'errors': errors}
+
+
+
+def split_trace(records, parts):
+    """ (list,int) -> list
+    Returns the records divided into the given number of lists, keeping their order.\
+    The records of a booking number(the reservation, and its cancellations and\
+    lookups) go in the same list, the others are dealt out in turn.
+
+    >>> records = [['M', '0.1', 'H', 'Jack', 'Queen', '1', '2', '111'],\
+                   ['M', '0.2', 'H', 'Judy', 'Queen', '1', '2', '222'],\
+                   ['F', '0.3', 'Jack', '', '', '', ''], ['C', '0.4', '111'],\
+                   ['L', '0.5', '222']]
+    >>> [[record[1] for record in part] for part in split_trace(records, 2)]
+    [['0.2', '0.3', '0.5'], ['0.1', '0.4']]
+    """
+    split = [[] for i in range(parts)]
+    for i in range(len(records)):
+        record = records[i]
+        key = i
+        if record[0] == MAKE and record[7] != '':
+            key = int(record[7])
+        elif record[0] in (CANCEL, LOOKUP):
+            key = int(record[2])
+        split[key % parts].append(record)
+    return split
+
+
+
+def replay_worker(path, rate = None, speed = None, store_path = None, part = None, parts = 1):
+    """ (str,float,float,str,int,int) -> dict
+    Loads the system, from the hotels folder or from the SQLite database at\
+    store_path, and replays the trace file at path against it, as done by each\
+    process of replay_in_processes. With a part, only that part of the trace divided\
+    by split_trace into the given number of parts is replayed, at its share of the\
+    rate. Returns the results of replay_trace.
+    """
+    Reservation.booking_numbers = BookingNumberRegistry()
+    store = None
+    if store_path != None:
+        from sqlite_store import SQLiteStore
+        store = SQLiteStore(store_path)
+    booking = Booking.load_system(store = store)
+    records = read_trace(path)
+    if part != None:
+        records = split_trace(records, parts)[part]
+        if rate != None:
+            rate = rate / parts
+    return replay_trace(booking, records, rate, speed)
+
+
+
+def replay_in_processes(path, processes = 2, rate = None, speed = None, store_path = None,
+                        split = False):
+    """ (str,int,float,float,str,bool) -> list
+    Replays the trace file at path in several processes at once, each against its own\
+    copy of the system loaded from the hotels folder or the SQLite database. Returns\
+    the list of the results of each process.
+
+    The processes share nothing, so no process waits for another and the results are\
+    those of independent copies of the system side by side(like shards), not of one\
+    system under concurrent load. By default each process replays the whole trace,\
+    which multiplies the load by the number of processes. With split, the trace is\
+    divided between them by split_trace, so together they replay it once at the\
+    recorded rate.
+    """
+    with ProcessPoolExecutor(max_workers = processes) as executor:
+        if split:
+            futures = [executor.submit(replay_worker, path, rate, speed, store_path, i,
+                                       processes) for i in range(processes)]
+        else:
+            futures = [executor.submit(replay_worker, path, rate, speed, store_path)
+                       for i in range(processes)]
+        return [future.result() for future in futures]
+
+
+
+def summarize(results_list):
+    """ (list) -> dict
+    Returns a dictionary from each operation type(and None for all of them) to the\
+    count, errors, throughput in operations per second, mean and p50, p95, p99 and\
+    maximum latency in seconds of the results of one or more replays run at the same\
+    time.
+
+    >>> results = {'elapsed': 2.0, 'latencies': {'make': [0.001, 0.002, 0.003, 0.004]},\
+                   'errors': {'make': 1}}
+    >>> summary = summarize([results, results])
+    >>> summary['make']['count'], summary['make']['errors'], summary['make']['throughput']
+    (8, 2, 4.0)
+    >>> summary['make']['max'] == summary[None]['max'] == 0.004
+    True
+    """
+    elapsed = max([results['elapsed'] for results in results_list] + [1e-9])
+    histograms = {None: Histogram()}
+    errors = {None: 0}
+    for results in results_list:
+        for op, latencies in results['latencies'].items():
+            histograms.setdefault(op, Histogram())
+            for latency in latencies:
+                histograms[op].add(latency)
+                histograms[None].add(latency)
+            errors[op] = errors.get(op, 0) + results['errors'][op]
+            errors[None] += results['errors'][op]
+
+    summary = {}
+    for op, histogram in histograms.items():
+        summary[op] = histogram.summary()
+        summary[op]['errors'] = errors[op]
+        summary[op]['throughput'] = histogram.count / elapsed
+    return summary
+
+
+
+def format_summary(summary):
+    """ (dict) -> str
+    Returns a table of the summary of summarize, the latencies in milliseconds.
+    """
+    lines = ["%-8s %8s %7s %10s %9s %9s %9s %9s" % ("op", "count", "errors", "ops/s",
+                                                    "p50", "p95", "p99", "max")]
+    ops = sorted([op for op in summary if op != None]) + [None]
+    for op in ops:
+        row = summary[op]
+        lines.append("%-8s %8d %7d %10.1f %9.3f %9.3f %9.3f %9.3f" % (op or "all",
+                     row['count'], row['errors'], row['throughput'], row['p50'] * 1000,
+                     row['p95'] * 1000, row['p99'] * 1000, row['max'] * 1000))
+    return "\n".join(lines)
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Replays a trace of booking operations.")
+    parser.add_argument('trace', nargs = '?', help = "trace file recorded by TraceRecorder")
+    pacing = parser.add_mutually_exclusive_group()
+    pacing.add_argument('--rate', type = float, help = "operations started per second")
+    pacing.add_argument('--speed', type = float,
+                        help = "replay at the recorded times divided by this factor")
+    parser.add_argument('--processes', type = int, default = 1)
+    parser.add_argument('--store', help = "SQLite database to load the system from")
+    parser.add_argument('--split', action = 'store_true',
+                        help = "divide the trace between the processes instead of "
+                               "replaying all of it in each")
+    args = parser.parse_args()
+
+    if args.trace == None:
+        doctest.testmod()
+    else:
+        if args.processes > 1:
+            results_list = replay_in_processes(args.trace, args.processes, args.rate,
+                                               args.speed, args.store, args.split)
+        else:
+            results_list = [replay_worker(args.trace, args.rate, args.speed, args.store)]
+        print(format_summary(summarize(results_list)))